@@ -2,24 +2,28 @@
 # -*- coding: utf-8 -*-
 """
 应用初始化文件
+只提供应用工厂，导入本包不会创建应用或连接数据库；
+视图、命令行工具在create_app中才导入，数据库表由 flask db init 创建
 """
 
+import os
 from flask import Flask
-from app.config import Config
+from app.config import config
 from app.models import db
-import math
 
 # 创建应用实例
-def create_app(config_name='default'):
+def create_app(config_name=None):
     """
     创建应用实例
-    :param config_name: 配置名称
+    :param config_name: 配置名称（见app.config.config），为空时取环境变量FINANCE_CONFIG，未知名称使用默认配置
     :return: Flask应用实例
     """
     app = Flask(__name__)
     
     # 加载配置
-    app.config.from_object(Config)
+    if config_name is None:
+        config_name = os.environ.get('FINANCE_CONFIG', 'default')
+    app.config.from_object(config.get(config_name, config['default']))
     
     # 初始化数据库
     db.init_app(app)
@@ -28,14 +32,36 @@ def create_app(config_name='default'):
     from app.views import main_bp
     app.register_blueprint(main_bp)
     
+    # 初始化缓存
+    from app.utils.cache import init_cache
+    init_cache(app)
+
+    # 报表结果缓存（按报表日期范围内的总账版本失效）
+    from app.utils.report_cache import init_report_cache
+    init_report_cache(app)
+
+    # 进程内科目表缓存（按数据库中的科目表版本号失效）
+    from app.utils.chart import init_chart
+    init_chart(app)
+
+    # 记录每个请求的SQL语句、耗时，慢请求日志和路由耗时统计
+    from app.utils.profiler import init_profiler
+    init_profiler(app)
+    
+    # 报表后台任务队列
+    from app.utils.report_jobs import init_report_jobs
+    init_report_jobs(app)
+    
+    # 试算平衡定时校验
+    from app.utils.verifier import init_verifier
+    init_verifier(app)
+    
+    # 注册命令行工具
+    from app.cli import db_cli, ledger_cli
+    app.cli.add_command(db_cli)
+    app.cli.add_command(ledger_cli)
+    
     # 注册模板全局函数
     app.jinja_env.globals.update(abs=abs)
     
-    # 创建数据库表
-    with app.app_context():
-        db.create_all()
-    
     return app
-
-# 创建默认应用实例
-app = create_app()
\ No newline at end of file
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+命令行工具
+通过 flask ledger <命令> 调用
+"""
+
+import json
+import time
+from datetime import date
+from decimal import Decimal
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from app.models import db, Voucher
+from app.utils.ledger import (rebuild_period_balances, post_vouchers, period_of, balance_drift,
+                              rebuild_account_balances, period_balance_drift, has_period_balances)
+from app.utils.cash_flow import rebuild_cash_flow_entries
+from app.utils.checks import CHECKS, run_checks, json_default
+from app.utils.profiler import count_queries
+from app.utils.verifier import verify_trial_balance
+from app.utils.datagen import PROFILES, generate_dataset
+from app.utils.schema import upgrade_schema
+
+# 数据库维护命令组
+db_cli = AppGroup('db', help='数据库维护命令')
+
+# 总账维护命令组
+ledger_cli = AppGroup('ledger', help='总账维护命令')
+
+
+@ledger_cli.command('rebuild-periods')
+def rebuild_periods_command():
+    """按已过账凭证重新生成科目期间余额"""
+    try:
+        count = rebuild_period_balances()
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    click.echo(f'已生成 {count} 条科目期间余额记录')
+
+
+@ledger_cli.command('rebuild')
+@click.option('--from-account', 'code_from', help='科目编码起（含），如 1001')
+@click.option('--to-account', 'code_to', help='科目编码止（含），如 1999')
+@click.option('--start-date', type=click.DateTime(formats=['%Y-%m-%d']), help='只重建该日期所在月份及以后的期间余额')
+@click.option('--end-date', type=click.DateTime(formats=['%Y-%m-%d']), help='只重建该日期所在月份及以前的期间余额')
+@click.option('--dry-run', is_flag=True, help='只列出余额不一致的科目，不修改数据')
+def rebuild_command(code_from, code_to, start_date, end_date, dry_run):
+    """
+    按已过账凭证重算科目余额和科目期间余额
+    科目余额始终按全部已过账凭证计算；日期范围只限定重建哪些月份的期间余额
+    """
+    started = time.perf_counter()
+    start_period = period_of(start_date) if start_date else None
+    end_period = period_of(end_date) if end_date else None
+    try:
+        if dry_run:
+            drift = balance_drift(code_from, code_to)
+            periods = period_balance_drift(code_from, code_to, start_period, end_period)
+        else:
+            drift = rebuild_account_balances(code_from, code_to)
+            periods = rebuild_period_balances(code_from, code_to, start_period, end_period)
+            db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    for code, name, stored, computed in drift:
+        click.echo(f'{code} {name}: 存储余额 {stored} -> 凭证汇总 {computed}（差额 {computed - stored}）')
+    seconds = time.perf_counter() - started
+    if dry_run:
+        click.echo(f'试运行：{len(drift)} 个科目余额不一致，{periods} 条期间余额需要更新，未修改数据'
+                   f'（用时 {seconds:.2f} 秒）')
+    else:
+        click.echo(f'已修正 {len(drift)} 个科目余额，重新生成 {periods} 条期间余额记录（用时 {seconds:.2f} 秒）')
+
+
+@ledger_cli.command('rebuild-cash-flow')
+@click.option('--start-date', type=click.DateTime(formats=['%Y-%m-%d']), help='凭证日期起（含）')
+@click.option('--end-date', type=click.DateTime(formats=['%Y-%m-%d']), help='凭证日期止（含）')
+def rebuild_cash_flow_command(start_date, end_date):
+    """按已过账凭证重新生成现金流量分类记录"""
+    try:
+        count = rebuild_cash_flow_entries(
+            start_date=start_date.date() if start_date else None,
+            end_date=end_date.date() if end_date else None
+        )
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    click.echo(f'已生成 {count} 条现金流量分类记录')
+
+
+@ledger_cli.command('post')
+@click.option('--id', 'voucher_ids', type=int, multiple=True, help='凭证ID，可重复指定')
+@click.option('--start-date', type=click.DateTime(formats=['%Y-%m-%d']), help='凭证日期起（含）')
+@click.option('--end-date', type=click.DateTime(formats=['%Y-%m-%d']), help='凭证日期止（含）')
+def post_command(voucher_ids, start_date, end_date):
+    """批量过账审核通过的凭证（单个事务）"""
+    try:
+        result = post_vouchers(
+            voucher_ids=list(voucher_ids) or None,
+            start_date=start_date.date() if start_date else None,
+            end_date=end_date.date() if end_date else None
+        )
+        db.session.commit()
+    except ValueError as e:
+        db.session.rollback()
+        raise click.ClickException(str(e))
+    except Exception:
+        db.session.rollback()
+        raise
+    click.echo(f'已过账 {result.count} 张凭证，更新 {result.account_count} 个科目，'
+               f'用时 {result.seconds:.2f} 秒（{result.rate:.0f} 张/秒）')
+
+
+@db_cli.command('init')
+def init_command():
+    """创建数据库表（已存在的表不受影响），首次部署时执行"""
+    db.create_all()
+    click.echo(f'数据库初始化完成，共 {len(db.metadata.tables)} 张表')
+
+
+@db_cli.command('upgrade')
+def upgrade_command():
+    """为已有数据库补建新增的表、列和索引"""
+    created = upgrade_schema()
+    for name in created:
+        click.echo(f"已创建{'列' if '.' in name else '索引'} {name}")
+    click.echo(f'数据库升级完成，新建 {len(created)} 个列或索引')
+
+    # 已有已过账凭证但尚未生成期间余额快照时补建，之后过账只累加增量
+    if not has_period_balances() and Voucher.query.filter_by(status='posted').first() is not None:
+        try:
+            count = rebuild_period_balances()
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        click.echo(f'已生成 {count} 条科目期间余额记录')
+
+
+@db_cli.command('generate')
+@click.option('--profile', type=click.Choice(list(PROFILES)), default='small', show_default=True,
+              help='数据规模：small 1万张凭证/1年，medium 10万张/2年，large 100万张/3年')
+@click.option('--seed', type=int, default=42, show_default=True, help='随机种子，相同种子生成相同数据')
+@click.option('--end-date', type=click.DateTime(formats=['%Y-%m-%d']), help='数据截止日期，默认今天')
+@click.option('--vouchers', type=int, help='覆盖档位中的凭证数')
+def generate_command(profile, seed, end_date, vouchers):
+    """生成压测数据（往来单位、订单、报销单、凭证），需先完成企业初始化"""
+    try:
+        stats = generate_dataset(profile, seed=seed, end_date=end_date.date() if end_date else None,
+                                 vouchers=vouchers, progress=click.echo)
+    except ValueError as e:
+        db.session.rollback()
+        raise click.ClickException(str(e))
+    except Exception:
+        db.session.rollback()
+        raise
+    click.echo(f"已生成 {stats['start_date']} 至 {stats['end_date']} 的数据：凭证 {stats['vouchers']} 张，"
+               f"分录 {stats['entries']} 条，现金流量分类 {stats['cash_flow_entries']} 条，"
+               f"订单 {stats['orders']} 张，报销单 {stats['expenses']} 张（用时 {stats['seconds']:.1f} 秒）")
+
+
+def _format_value(value):
+    if isinstance(value, (Decimal, date)):
+        return json_default(value)
+    return value
+
+
+@ledger_cli.command('check')
+@click.option('--only', 'names', type=click.Choice(list(CHECKS)), multiple=True, help='只执行指定检查，可重复指定')
+@click.option('--format', 'output_format', type=click.Choice(['text', 'json']), default='text', show_default=True,
+              help='输出格式')
+def check_command(names, output_format):
+    """
+    检查总账数据：凭证借贷平衡、科目设置、余额与凭证一致、现金余额非负、期末结转、试算平衡
+    发现问题时退出码为1
+    """
+    started = time.perf_counter()
+    with count_queries() as counter:
+        results = run_checks(list(names) or None)
+    seconds = time.perf_counter() - started
+    ok = all(result.ok for result in results)
+
+    if output_format == 'json':
+        click.echo(json.dumps({
+            'ok': ok,
+            'queries': counter.count,
+            'seconds': round(seconds, 3),
+            'checks': [result.as_dict() for result in results],
+        }, ensure_ascii=False, indent=2, default=json_default))
+    else:
+        for result in results:
+            click.echo(f"[{'通过' if result.ok else '失败'}] {result.title}")
+            for issue in result.issues:
+                click.echo('    ' + '，'.join(f'{key}={_format_value(value)}' for key, value in issue.items()))
+        click.echo(f'共 {len(results)} 项检查，{sum(not result.ok for result in results)} 项发现问题'
+                   f'（{counter.count} 条SQL，用时 {seconds:.2f} 秒）')
+    if not ok:
+        click.get_current_context().exit(1)
+
+
+@ledger_cli.command('verify')
+def verify_command():
+    """执行一次试算平衡校验并保存结果（与应用中的定时校验相同），余额不一致时退出码为1"""
+    run = verify_trial_balance('manual', keep=current_app.config.get('TRIAL_BALANCE_HISTORY'))
+    for item in run.drift_accounts:
+        click.echo(f"{item['account_code']} {item['account_name']}: 存储余额 {item['stored']}，凭证汇总 {item['computed']}")
+    click.echo(f"试算平衡{'通过' if run.ok else '未通过'}：借方合计 {run.total_debit}，贷方合计 {run.total_credit}，"
+               f"{run.account_count} 个科目中 {run.drift_count} 个余额不一致（用时 {run.duration_ms:.0f} 毫秒）")
+    if not run.ok:
+        click.get_current_context().exit(1)
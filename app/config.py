@@ -4,19 +4,47 @@ class Config:
     # 项目基础目录
     BASE_DIR = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
     
-    # 数据库配置 - 使用SQLite
-    SQLALCHEMY_DATABASE_URI = f'sqlite:///{os.path.join(BASE_DIR, "finance.db")}'
+    # 数据库配置 - 默认使用SQLite，设置环境变量DATABASE_URL可改用服务器数据库，
+    # 如 mysql+pymysql://用户:密码@主机/finance?charset=utf8mb4 或 postgresql://用户:密码@主机/finance
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or f'sqlite:///{os.path.join(BASE_DIR, "finance.db")}'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLITE_PRAGMAS = {}  # SQLite连接建立时执行的PRAGMA，见ProductionConfig
     
     # 安全配置
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'hard to guess string'
     
     # 系统配置
     PER_PAGE = 10  # 分页大小
+    QUERY_BUDGET = 30  # 单个请求的SQL语句数上限，超出时记录警告日志
+    
+    # 性能分析配置
+    PROFILER_PANEL = False  # 在HTML页面底部显示本次请求的SQL、模板渲染耗时面板（仅调试时开启）
+    SLOW_REQUEST_THRESHOLD = 0.5  # 慢请求阈值（秒）
+    SLOW_REQUEST_LOG = os.path.join(BASE_DIR, 'logs', 'slow_requests.log')  # 慢请求日志（每行一个JSON），为None时不记录
+    METRICS_WINDOW = 1000  # 每个路由保留最近多少次请求的耗时用于计算分位数
+    
+    # 试算平衡定时校验：应用运行时每隔多少秒比对一次科目余额与已过账凭证，0表示不校验
+    TRIAL_BALANCE_INTERVAL = 300
+    TRIAL_BALANCE_HISTORY = 2016  # 保留最近多少条校验记录（每5分钟一次约为一周）
+    
+    # 报表后台任务：大范围的资产负债表、利润表可提交到后台线程池生成，页面轮询任务状态
+    REPORT_JOB_WORKERS = 2  # 每个工作进程的报表线程数，0表示在提交的请求中直接生成
+    REPORT_JOB_QUEUE_SIZE = 20  # 每个工作进程最多排队的任务数，超出时拒绝提交
+    REPORT_JOB_TIMEOUT = 300  # 单个任务的最长运行秒数，超时后中断查询并标记为超时
+    REPORT_JOB_RETENTION = 86400  # 已结束任务及其结果的保留秒数
+    
+    # 报表结果缓存：每个工作进程最多缓存的报表数和字节数（按报表数据JSON编码后的长度估算），0表示不缓存
+    REPORT_CACHE_SIZE = 128
+    REPORT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+    
+    # 缓存配置：默认进程内缓存，多进程部署时可替换为共享缓存后端的类路径
+    CACHE_BACKEND = 'app.utils.cache.SimpleCache'
+    CACHE_DEFAULT_TIMEOUT = 300  # 过期秒数，也是脚本直接修改数据后缓存的最长滞后时间
+    CACHE_OPTIONS = {}
     
     # 模板配置
-    TEMPLATES_AUTO_RELOAD = True
-    DEBUG = True
+    TEMPLATES_AUTO_RELOAD = False
+    DEBUG = False
     
     # 会计科目默认模板
     DEFAULT_ACCOUNT_TEMPLATE = [
@@ -42,3 +70,58 @@ class Config:
         {'code': '6602', 'name': '管理费用', 'type': 'expense', 'parent_code': ''},
         {'code': '6603', 'name': '财务费用', 'type': 'expense', 'parent_code': ''},
     ]
+
+
+class DevelopmentConfig(Config):
+    """开发环境配置：调试模式，模板修改后自动重新加载"""
+    DEBUG = True
+    TEMPLATES_AUTO_RELOAD = True
+
+
+class TestingConfig(Config):
+    """测试配置：默认使用内存SQLite数据库，不写慢请求日志"""
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = os.environ.get('TEST_DATABASE_URL') or 'sqlite://'
+    SLOW_REQUEST_LOG = None
+    SECRET_KEY = 'testing'
+    TRIAL_BALANCE_INTERVAL = 0
+
+
+class ProductionConfig(Config):
+    """
+    生产环境配置
+    SQLite使用WAL日志模式：读请求读取快照，不被过账等写事务阻塞；
+    写事务冲突时按busy_timeout等待，不再立即报“database is locked”。
+    使用MySQL/MariaDB、PostgreSQL时只有连接池配置生效
+    """
+    DEBUG = False
+    TEMPLATES_AUTO_RELOAD = False
+
+    # 按顺序执行；journal_mode写入数据库文件，其余每个连接单独设置
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',  # WAL模式下只在检查点同步，断电最多丢失最近提交的事务，不会损坏数据库
+        'busy_timeout': 10000,  # 等待其他写事务的毫秒数
+        'cache_size': -65536,  # 页缓存，负数单位为KB（64MB）
+        'mmap_size': 268435456,  # 内存映射读取（256MB）
+        'temp_store': 'MEMORY',
+    }
+
+    # 连接池：每个gunicorn工作进程各有一个连接池，
+    # 数据库的最大连接数应不小于 工作进程数 ×（pool_size + max_overflow）
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 5)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': 30,  # 等待空闲连接的秒数
+        'pool_recycle': 1800,  # 连接使用超过该秒数后重建，避免被MySQL的wait_timeout断开
+        'pool_pre_ping': True,  # 取出连接时先检测，数据库重启后自动重连
+    }
+
+
+# 配置名称 -> 配置类，环境变量FINANCE_CONFIG选择其一
+config = {
+    'development': DevelopmentConfig,
+    'testing': TestingConfig,
+    'production': ProductionConfig,
+    'default': DevelopmentConfig,
+}
@@ -1,9 +1,9 @@
-from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
 import json
+from app.utils.database import FinanceSQLAlchemy
 
-# 创建数据库实例
-db = SQLAlchemy()
+# 创建数据库实例（SQLite连接按配置执行PRAGMA）
+db = FinanceSQLAlchemy()
 
 # 基础模型类
 class BaseModel(db.Model):
@@ -13,6 +13,12 @@ class BaseModel(db.Model):
     update_time = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now, comment='更新时间')
     is_deleted = db.Column(db.Boolean, default=False, comment='是否删除')
 
+# 只包含未删除记录的部分索引（SQLite、PostgreSQL支持部分索引，其他数据库创建普通索引）
+def live_index(name, *columns):
+    return db.Index(name, *columns,
+                    sqlite_where=db.text('is_deleted = 0'),
+                    postgresql_where=db.text('is_deleted = false'))
+
 # 企业信息模型
 class Company(BaseModel):
     __tablename__ = 'company'
@@ -52,6 +58,8 @@ class Account(BaseModel):
     parent_code = db.Column(db.String(20), nullable=True, comment='父科目编码')
     description = db.Column(db.Text, nullable=True, comment='科目描述')
     balance = db.Column(db.DECIMAL(15, 2), nullable=False, default=0.0, comment='当前余额')
+    opening_balance = db.Column(db.DECIMAL(15, 2), nullable=False, default=0.0, server_default='0',
+                                comment='初始余额: 不经凭证录入，当前余额 = 初始余额 + 已过账凭证发生额')
 
 # 供应商模型
 class Supplier(BaseModel):
@@ -63,6 +71,9 @@ class Supplier(BaseModel):
     address = db.Column(db.String(200), nullable=True, comment='地址')
     tax_number = db.Column(db.String(50), nullable=True, comment='纳税人识别号')
     bank_account = db.Column(db.String(50), nullable=True, comment='银行账号')
+    
+    # 索引：列表按创建时间分页
+    __table_args__ = (live_index('ix_supplier_create_time', 'create_time', 'id'),)
 
 # 客户模型
 class Customer(BaseModel):
@@ -74,6 +85,9 @@ class Customer(BaseModel):
     address = db.Column(db.String(200), nullable=True, comment='地址')
     tax_number = db.Column(db.String(50), nullable=True, comment='纳税人识别号')
     credit_limit = db.Column(db.DECIMAL(15, 2), nullable=False, default=0.0, comment='信用额度')
+    
+    # 索引：列表按创建时间分页
+    __table_args__ = (live_index('ix_customer_create_time', 'create_time', 'id'),)
 
 # 采购订单模型
 class PurchaseOrder(BaseModel):
@@ -92,7 +106,13 @@ class PurchaseOrder(BaseModel):
     
     # 关系
     supplier = db.relationship('Supplier', backref=db.backref('purchase_orders', lazy='dynamic'))
-    items = db.relationship('PurchaseOrderItem', backref='order', lazy='dynamic', cascade='all, delete-orphan')
+    items = db.relationship('PurchaseOrderItem', backref='order', lazy='select', cascade='all, delete-orphan')
+    
+    # 索引：仪表盘待审批订单计数、列表按创建时间分页
+    __table_args__ = (
+        live_index('ix_purchase_order_status', 'status', 'create_time'),
+        live_index('ix_purchase_order_create_time', 'create_time', 'id'),
+    )
 
 # 采购订单项模型
 class PurchaseOrderItem(BaseModel):
@@ -120,7 +140,13 @@ class SalesOrder(BaseModel):
     
     # 关系
     customer = db.relationship('Customer', backref=db.backref('sales_orders', lazy='dynamic'))
-    items = db.relationship('SalesOrderItem', backref='order', lazy='dynamic', cascade='all, delete-orphan')
+    items = db.relationship('SalesOrderItem', backref='order', lazy='select', cascade='all, delete-orphan')
+    
+    # 索引：仪表盘待审批订单计数、列表按创建时间分页
+    __table_args__ = (
+        live_index('ix_sales_order_status', 'status', 'create_time'),
+        live_index('ix_sales_order_create_time', 'create_time', 'id'),
+    )
 
 # 销售订单项模型
 class SalesOrderItem(BaseModel):
@@ -147,6 +173,12 @@ class Expense(BaseModel):
     # 关系
     user = db.relationship('User', foreign_keys=[user_id], backref=db.backref('expenses', lazy='dynamic'))
     approver = db.relationship('User', foreign_keys=[approval_id])
+    
+    # 索引：仪表盘待审批计数、最近报销记录、列表按创建时间分页
+    __table_args__ = (
+        live_index('ix_expense_status', 'status', 'create_time'),
+        live_index('ix_expense_create_time', 'create_time', 'id'),
+    )
 
 # 凭证模型
 class Voucher(BaseModel):
@@ -164,6 +196,13 @@ class Voucher(BaseModel):
     user = db.relationship('User', foreign_keys=[user_id], backref=db.backref('vouchers', lazy='dynamic'))
     approver = db.relationship('User', foreign_keys=[approval_id])
     entries = db.relationship('VoucherEntry', backref='voucher', lazy='select', cascade='all, delete-orphan')
+    
+    # 索引：报表按状态和日期筛选已过账凭证、仪表盘草稿计数和最近凭证、列表按日期分页
+    __table_args__ = (
+        live_index('ix_voucher_status_date', 'status', 'date', 'id'),
+        live_index('ix_voucher_date', 'date', 'id'),
+        live_index('ix_voucher_create_time', 'create_time'),
+    )
 
 # 凭证分录模型
 class VoucherEntry(BaseModel):
@@ -176,6 +215,95 @@ class VoucherEntry(BaseModel):
     
     # 关系
     account = db.relationship('Account')
+    
+    # 索引：按凭证关联分录并汇总借贷方（覆盖索引）、按科目查找分录
+    __table_args__ = (
+        db.Index('ix_voucher_entry_voucher_account', 'voucher_id', 'account_code', 'debit', 'credit'),
+        db.Index('ix_voucher_entry_account_voucher', 'account_code', 'voucher_id'),
+    )
+
+# 现金流量分类模型（过账时将现金分录按对方科目拆分并归类）
+class CashFlowEntry(BaseModel):
+    __tablename__ = 'cash_flow_entry'
+    voucher_id = db.Column(db.Integer, db.ForeignKey('voucher.id'), nullable=False, comment='凭证ID')
+    voucher_entry_id = db.Column(db.Integer, db.ForeignKey('voucher_entry.id'), nullable=False, comment='现金分录ID')
+    date = db.Column(db.Date, nullable=False, comment='凭证日期')
+    cash_account_code = db.Column(db.String(20), nullable=False, comment='现金科目编码')
+    counterpart_code = db.Column(db.String(20), nullable=False, comment='对方科目编码')
+    activity = db.Column(db.String(20), nullable=False, comment='活动类别: operating, investing, financing')
+    item = db.Column(db.String(30), nullable=False, comment='现金流量项目')
+    amount = db.Column(db.DECIMAL(15, 2), nullable=False, comment='金额: 流入为正，流出为负')
+
+    # 索引：现金流量表按日期范围分组汇总（覆盖索引）、按凭证重建
+    __table_args__ = (
+        db.Index('ix_cash_flow_entry_date_item', 'date', 'item', 'amount'),
+        db.Index('ix_cash_flow_entry_voucher', 'voucher_id'),
+    )
+
+# 科目期间余额模型（按月快照）
+class AccountPeriodBalance(BaseModel):
+    __tablename__ = 'account_period_balance'
+    account_code = db.Column(db.String(20), db.ForeignKey('account.code'), nullable=False, comment='科目编码')
+    period = db.Column(db.String(6), nullable=False, comment='会计期间: YYYYMM')
+    opening_balance = db.Column(db.DECIMAL(15, 2), nullable=False, default=0.0, comment='期初余额')
+    debit_total = db.Column(db.DECIMAL(15, 2), nullable=False, default=0.0, comment='本期借方发生额')
+    credit_total = db.Column(db.DECIMAL(15, 2), nullable=False, default=0.0, comment='本期贷方发生额')
+    closing_balance = db.Column(db.DECIMAL(15, 2), nullable=False, default=0.0, comment='期末余额')
+
+    # 联合唯一约束
+    __table_args__ = (db.UniqueConstraint('account_code', 'period', name='_account_period_uc'),)
+
+# 试算平衡校验记录模型（定时比对科目余额与已过账凭证）
+class TrialBalanceRun(BaseModel):
+    __tablename__ = 'trial_balance_run'
+    trigger = db.Column(db.String(20), nullable=False, default='schedule', comment='触发方式: schedule, manual')
+    ok = db.Column(db.Boolean, nullable=False, comment='是否通过')
+    total_debit = db.Column(db.DECIMAL(18, 2), nullable=False, comment='已过账借方发生额合计')
+    total_credit = db.Column(db.DECIMAL(18, 2), nullable=False, comment='已过账贷方发生额合计')
+    account_count = db.Column(db.Integer, nullable=False, comment='校验的科目数')
+    drift_count = db.Column(db.Integer, nullable=False, default=0, comment='余额不一致的科目数')
+    drift = db.Column(db.Text, nullable=True, comment='余额不一致的科目明细（JSON）')
+    duration_ms = db.Column(db.Float, nullable=False, comment='校验用时（毫秒）')
+
+    # 索引：按时间查看最近的校验结果
+    __table_args__ = (
+        db.Index('ix_trial_balance_run_create_time', 'create_time'),
+    )
+
+    @property
+    def drift_accounts(self):
+        if self.drift:
+            return json.loads(self.drift)
+        return []
+
+    @drift_accounts.setter
+    def drift_accounts(self, value):
+        self.drift = json.dumps(value, ensure_ascii=False) if value else None
+
+# 总账版本号模型（科目表等数据变化时递增，各工作进程据此判断进程内缓存是否过期）
+class LedgerVersion(BaseModel):
+    __tablename__ = 'ledger_version'
+    name = db.Column(db.String(50), nullable=False, unique=True, comment='名称，如chart表示科目表')
+    version = db.Column(db.Integer, nullable=False, default=0, comment='版本号')
+
+# 报表后台任务模型
+class ReportJob(BaseModel):
+    __tablename__ = 'report_job'
+    report = db.Column(db.String(50), nullable=False, comment='报表名称，如balance_sheet')
+    params = db.Column(db.Text, nullable=False, comment='报表参数（JSON）')
+    status = db.Column(db.String(20), nullable=False, default='queued',
+                       comment='状态: queued, running, done, failed, cancelled, timeout')
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True, comment='提交人ID')
+    start_time = db.Column(db.DateTime, nullable=True, comment='开始时间')
+    finish_time = db.Column(db.DateTime, nullable=True, comment='结束时间')
+    duration_ms = db.Column(db.Float, nullable=True, comment='生成用时（毫秒）')
+    result = db.Column(db.Text, nullable=True, comment='报表数据（JSON）')
+    error = db.Column(db.String(500), nullable=True, comment='失败原因')
+
+    # 索引：清理过期任务、查找未结束的任务
+    __table_args__ = (
+        db.Index('ix_report_job_status_create_time', 'status', 'create_time'),
+    )
 
 # 预算模型
 class Budget(BaseModel):
@@ -198,5 +326,9 @@ class Tax(BaseModel):
     status = db.Column(db.String(20), nullable=False, default='pending', comment='状态: pending, submitted, approved')
     submit_time = db.Column(db.DateTime, nullable=True, comment='申报时间')
     approval_time = db.Column(db.DateTime, nullable=True, comment='审批时间')
-
-
+    
+    # 索引：列表按申报期分页
+    __table_args__ = (
+        live_index('ix_tax_period', 'tax_period', 'id'),
+        live_index('ix_tax_status', 'status', 'tax_period', 'id'),
+    )
\ No newline at end of file
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+缓存模块
+默认使用进程内带过期时间的缓存；通过配置CACHE_BACKEND指定类路径可替换为共享缓存
+（如多进程部署时的Redis），后端需实现get/set/delete/update/clear方法
+"""
+
+import threading
+import time
+
+from flask import current_app
+from werkzeug.utils import import_string
+
+
+class SimpleCache:
+    """
+    进程内缓存
+    每个键带过期时间，过期后视为不存在；所有操作加锁，可在多线程下使用
+    """
+
+    def __init__(self, default_timeout=300):
+        self.default_timeout = default_timeout
+        self._data = {}
+        self._lock = threading.RLock()
+
+    def _get_live(self, key):
+        item = self._data.get(key)
+        if item is None:
+            return None
+        value, expires_at = item
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        return item
+
+    def get(self, key):
+        """读取缓存，不存在或已过期返回None"""
+        with self._lock:
+            item = self._get_live(key)
+            return item[0] if item else None
+
+    def set(self, key, value, timeout=None):
+        """
+        写入缓存
+        :param timeout: 过期秒数，默认使用default_timeout，0表示不过期
+        """
+        timeout = self.default_timeout if timeout is None else timeout
+        expires_at = time.monotonic() + timeout if timeout else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+
+    def update(self, key, func):
+        """
+        原子地修改已缓存的值：新值为func(旧值)，过期时间不变
+        键不存在时不做任何操作（下次读取时重新计算）
+        :return: 修改后的值，键不存在时返回None
+        """
+        with self._lock:
+            item = self._get_live(key)
+            if item is None:
+                return None
+            value = func(item[0])
+            self._data[key] = (value, item[1])
+            return value
+
+    def delete(self, key):
+        """删除缓存"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._data.clear()
+
+
+def init_cache(app):
+    """
+    按配置创建缓存后端
+    CACHE_BACKEND: 后端类路径；CACHE_DEFAULT_TIMEOUT: 默认过期秒数；CACHE_OPTIONS: 传给后端的其他参数
+    """
+    backend = import_string(app.config.get('CACHE_BACKEND', 'app.utils.cache.SimpleCache'))
+    app.extensions['cache'] = backend(
+        default_timeout=app.config.get('CACHE_DEFAULT_TIMEOUT', 300),
+        **app.config.get('CACHE_OPTIONS', {})
+    )
+    return app.extensions['cache']
+
+
+def get_cache():
+    """当前应用的缓存后端"""
+    return current_app.extensions['cache']
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+现金流量分类模块
+凭证过账时将现金分录按对方科目拆分，归入经营、投资、筹资活动的现金流量项目，
+写入现金流量分类表；现金流量表（直接法）只需按项目分组汇总该表
+"""
+
+from decimal import Decimal
+from itertools import groupby
+from app.models import db, CashFlowEntry, Voucher, VoucherEntry
+from app.utils.chart import get_chart
+from app.utils.money import CENT, ROUNDING, money_sum
+from app.utils.report_cache import touch_ledger
+
+# 现金及现金等价物科目（含下级明细科目：编码以其开头，或在科目树中位于其下）
+CASH_ACCOUNT_PREFIXES = ('1001', '1002')
+
+# 活动类别
+CASH_FLOW_ACTIVITIES = (
+    ('operating', '经营活动'),
+    ('investing', '投资活动'),
+    ('financing', '筹资活动'),
+)
+
+# 现金流量项目：(项目, 活动类别, 方向, 名称)，按报表顺序排列
+CASH_FLOW_ITEMS = (
+    ('sales_receipts', 'operating', 'in', '销售商品、提供劳务收到的现金'),
+    ('other_operating_receipts', 'operating', 'in', '收到其他与经营活动有关的现金'),
+    ('purchase_payments', 'operating', 'out', '购买商品、接受劳务支付的现金'),
+    ('employee_payments', 'operating', 'out', '支付给职工以及为职工支付的现金'),
+    ('tax_payments', 'operating', 'out', '支付的各项税费'),
+    ('other_operating_payments', 'operating', 'out', '支付其他与经营活动有关的现金'),
+    ('investing_receipts', 'investing', 'in', '处置长期资产收回的现金'),
+    ('investing_payments', 'investing', 'out', '购建长期资产支付的现金'),
+    ('financing_receipts', 'financing', 'in', '吸收投资、取得借款收到的现金'),
+    ('financing_payments', 'financing', 'out', '偿还债务、分配利润支付的现金'),
+)
+
+ITEM_ACTIVITY = {item: activity for item, activity, _, _ in CASH_FLOW_ITEMS}
+
+# 对方科目编码前缀 -> 活动类别（未列出的按经营活动处理，所有者权益类科目均为筹资活动）
+INVESTING_PREFIXES = ('15', '16', '17')
+FINANCING_PREFIXES = ('2001', '2231', '2232', '25')
+
+# 经营活动中按对方科目细分的项目
+SALES_PREFIXES = ('1122', '2203', '2221')
+PURCHASE_PREFIXES = ('14', '1123', '2202', '6401', '6402')
+EMPLOYEE_PREFIXES = ('2211',)
+TAX_PREFIXES = ('2221', '6403', '6801')
+
+
+def is_cash_account(code):
+    return code.startswith(CASH_ACCOUNT_PREFIXES)
+
+
+def cash_account_codes(chart=None):
+    """现金科目编码：编码以现金科目开头的科目，以及科目树中现金科目的全部下级科目（不含已删除科目）"""
+    chart = chart or get_chart()
+    codes = {account.code for account in chart.accounts if is_cash_account(account.code)}
+    for code in CASH_ACCOUNT_PREFIXES:
+        codes.update(account.code for account in chart.subtree(code))
+    return codes
+
+
+def classify(counterpart_code, counterpart_type, inflow):
+    """
+    按对方科目确定现金流量项目
+    :param inflow: True为现金流入（现金科目借方），False为流出
+    :return: 现金流量项目
+    """
+    if counterpart_code.startswith(INVESTING_PREFIXES):
+        return 'investing_receipts' if inflow else 'investing_payments'
+    if counterpart_type == 'equity' or counterpart_code.startswith(FINANCING_PREFIXES):
+        return 'financing_receipts' if inflow else 'financing_payments'
+    if inflow:
+        if counterpart_type == 'income' or counterpart_code.startswith(SALES_PREFIXES):
+            return 'sales_receipts'
+        return 'other_operating_receipts'
+    if counterpart_code.startswith(TAX_PREFIXES):
+        return 'tax_payments'
+    if counterpart_code.startswith(EMPLOYEE_PREFIXES):
+        return 'employee_payments'
+    if counterpart_type == 'cost' or counterpart_code.startswith(PURCHASE_PREFIXES):
+        return 'purchase_payments'
+    return 'other_operating_payments'
+
+
+def _allocate(amount, weights):
+    """
+    按权重拆分金额，尾差计入最后一项，保证拆分结果之和等于原金额
+    """
+    total = sum(weights)
+    parts = [(amount * weight / total).quantize(CENT, rounding=ROUNDING) for weight in weights[:-1]]
+    parts.append(amount - sum(parts))
+    return parts
+
+
+def voucher_cash_flows(entries, cash_codes=None):
+    """
+    拆分一张凭证中的现金分录
+    每笔现金分录按对方方向非现金分录的金额比例分摊到各对方科目；
+    只在现金科目之间划转的分录不产生现金流量
+    :param entries: [(分录ID, 科目编码, 科目类型, 借方, 贷方)]
+    :param cash_codes: 现金科目编码集合（cash_account_codes），为空时按编码前缀判断
+    :return: [(分录ID, 现金科目编码, 对方科目编码, 项目, 金额)]，流入为正，流出为负
+    """
+    is_cash = cash_codes.__contains__ if cash_codes is not None else is_cash_account
+    flows = []
+    debits = [(code, account_type, debit) for _, code, account_type, debit, _ in entries
+              if debit > 0 and not is_cash(code)]
+    credits = [(code, account_type, credit) for _, code, account_type, _, credit in entries
+               if credit > 0 and not is_cash(code)]
+
+    for entry_id, code, _, debit, credit in entries:
+        if not is_cash(code):
+            continue
+        for amount, inflow, counterparts in ((debit, True, credits), (credit, False, debits)):
+            if amount <= 0 or not counterparts:
+                continue
+            parts = _allocate(amount, [weight for _, _, weight in counterparts])
+            for (counterpart_code, counterpart_type, _), part in zip(counterparts, parts):
+                flows.append((entry_id, code, counterpart_code,
+                              classify(counterpart_code, counterpart_type, inflow),
+                              part if inflow else -part))
+    return flows
+
+
+def classify_vouchers(voucher_ids):
+    """
+    为已过账凭证生成现金流量分类记录（不提交事务）
+    已有的分类记录先删除，可重复执行
+    :param voucher_ids: 凭证ID列表（调用方负责分批）
+    :return: 生成的记录数
+    """
+    CashFlowEntry.query.filter(CashFlowEntry.voucher_id.in_(voucher_ids)).delete(synchronize_session=False)
+
+    # 只读取包含现金分录的凭证，科目类型取自科目表缓存
+    chart = get_chart()
+    account_types = chart.types
+    cash_codes = cash_account_codes(chart)
+    has_cash = db.session.query(VoucherEntry.voucher_id).filter(
+        VoucherEntry.voucher_id.in_(voucher_ids),
+        VoucherEntry.account_code.in_(cash_codes)
+    )
+    rows = db.session.query(
+        VoucherEntry.voucher_id, Voucher.date, VoucherEntry.id, VoucherEntry.account_code,
+        VoucherEntry.debit, VoucherEntry.credit
+    ).join(Voucher, Voucher.id == VoucherEntry.voucher_id).filter(
+        VoucherEntry.voucher_id.in_(has_cash)
+    ).order_by(VoucherEntry.voucher_id, VoucherEntry.id)
+
+    mappings = []
+    for (voucher_id, voucher_date), lines in groupby(rows, key=lambda row: (row[0], row[1])):
+        entries = [(entry_id, code, account_types.get(code), Decimal(debit), Decimal(credit))
+                   for _, _, entry_id, code, debit, credit in lines]
+        for entry_id, cash_code, counterpart_code, item, amount in voucher_cash_flows(entries, cash_codes):
+            mappings.append({
+                'voucher_id': voucher_id,
+                'voucher_entry_id': entry_id,
+                'date': voucher_date,
+                'cash_account_code': cash_code,
+                'counterpart_code': counterpart_code,
+                'activity': ITEM_ACTIVITY[item],
+                'item': item,
+                'amount': amount,
+            })
+    db.session.bulk_insert_mappings(CashFlowEntry, mappings)
+    return len(mappings)
+
+
+def rebuild_cash_flow_entries(start_date=None, end_date=None, chunk_size=500):
+    """
+    按已过账凭证重新生成现金流量分类记录（不提交事务），用于已有数据或分类规则调整后
+    :return: 生成的记录数
+    """
+    query = db.session.query(Voucher.id).filter(
+        Voucher.status == 'posted',
+        Voucher.is_deleted == False
+    )
+    if start_date is not None:
+        query = query.filter(Voucher.date >= start_date)
+    if end_date is not None:
+        query = query.filter(Voucher.date <= end_date)
+    ids = [voucher_id for voucher_id, in query.order_by(Voucher.id)]
+
+    count = 0
+    for start in range(0, len(ids), chunk_size):
+        count += classify_vouchers(ids[start:start + chunk_size])
+    # 现金流量表的缓存全部失效
+    touch_ledger(db.session.connection())
+    return count
+
+
+def cash_flow_totals(start_date, end_date):
+    """
+    期间内各现金流量项目的金额（按项目分组汇总分类表）
+    分类表只包含已过账凭证，已过账凭证不能删除，无需再关联凭证表
+    :return: {项目: 金额}，流入为正，流出为负
+    """
+    rows = db.session.query(
+        CashFlowEntry.item,
+        money_sum(CashFlowEntry.amount)
+    ).filter(
+        CashFlowEntry.date >= start_date,
+        CashFlowEntry.date <= end_date
+    ).group_by(CashFlowEntry.item)
+    return {item: Decimal(amount) for item, amount in rows}
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+科目表缓存模块
+整张科目表在进程内缓存一份（按编码、类型、上级科目建立索引），凭证校验、过账和报表直接查找，
+不再每次查询科目表；科目新增、修改、删除时在同一事务中递增数据库中的科目表版本号，
+每个请求只查询一次版本号，版本变化时重新加载，多个工作进程的缓存保持一致。
+科目余额随过账变化，不在缓存中，需要余额时仍查询科目表。
+加载时按上级科目物化科目树（路径、级次），报表据此一次遍历得到各级科目的合计
+"""
+
+import threading
+from collections import namedtuple
+
+from flask import current_app, g, has_app_context
+from sqlalchemy import event, inspect
+
+from app.models import db, Account, LedgerVersion
+from app.utils.money import ZERO
+
+CHART_VERSION = 'chart'
+
+# 变化时需要递增版本号的科目字段（余额除外）
+CHART_FIELDS = ('code', 'name', 'type', 'parent_code', 'description', 'is_deleted')
+
+# 科目树路径的分隔符，路径为从一级科目到本科目的编码，如 1002/100201
+PATH_SEPARATOR = '/'
+
+# path: 科目树路径；level: 级次，一级科目为1
+ChartAccount = namedtuple('ChartAccount', 'id code name type parent_code description is_deleted path level')
+
+
+def tree_paths(parents):
+    """
+    按上级科目计算每个科目的路径
+    上级科目不存在或出现循环引用时，该科目作为一级科目
+    :param parents: {科目编码: 上级科目编码}
+    :return: {科目编码: 路径}
+    """
+    paths = {}
+
+    def path_of(code, visiting):
+        if code in paths:
+            return paths[code]
+        parent = parents.get(code)
+        if not parent or parent not in parents or parent in visiting:
+            paths[code] = code
+        else:
+            visiting.add(code)
+            paths[code] = path_of(parent, visiting) + PATH_SEPARATOR + code
+        return paths[code]
+
+    for code in parents:
+        path_of(code, set())
+    return paths
+
+
+class Chart:
+    """
+    某一版本的科目表（只读，多线程共享）
+    accounts: 未删除的科目，按科目树顺序（上级科目在前，同级按编码）排列
+    """
+
+    def __init__(self, version, accounts):
+        self.version = version
+        self.all_accounts = sorted(accounts, key=lambda account: account.path.split(PATH_SEPARATOR))
+        self.accounts = [account for account in self.all_accounts if not account.is_deleted]
+        self.max_level = max((account.level for account in self.accounts), default=0)
+        self.by_code = {account.code: account for account in self.all_accounts}
+        self.types = {account.code: account.type for account in self.all_accounts}
+        self.by_type = {}
+        self.children = {}
+        for account in self.accounts:
+            self.by_type.setdefault(account.type, []).append(account)
+            if account.parent_code:
+                self.children.setdefault(account.parent_code, []).append(account)
+
+    def get(self, code, include_deleted=False):
+        """按编码查找科目，不存在（或已删除）时返回None"""
+        account = self.by_code.get(code)
+        if account is None or (account.is_deleted and not include_deleted):
+            return None
+        return account
+
+    def of_type(self, *types):
+        """指定类型的未删除科目，按编码排序"""
+        if len(types) == 1:
+            return list(self.by_type.get(types[0], []))
+        return [account for account in self.accounts if account.type in types]
+
+    def children_of(self, code):
+        """下级科目"""
+        return list(self.children.get(code, []))
+
+    def subtree(self, code):
+        """科目及其全部下级科目（未删除），科目不存在时为空"""
+        account = self.get(code)
+        if account is None:
+            return []
+        prefix = account.path + PATH_SEPARATOR
+        return [item for item in self.accounts if item.path == account.path or item.path.startswith(prefix)]
+
+    def rollup(self, amounts):
+        """
+        按科目树逐级汇总：每个科目的合计为本科目金额加全部下级科目的金额，
+        每个金额沿路径累加到各级上级科目，一次遍历完成
+        :param amounts: {科目编码: 金额}
+        :return: {科目编码: 合计}，包含全部未删除科目
+        """
+        totals = {account.code: ZERO for account in self.accounts}
+        for code, amount in amounts.items():
+            account = self.by_code.get(code)
+            for ancestor in (account.path.split(PATH_SEPARATOR) if account else (code,)):
+                if ancestor in totals:
+                    totals[ancestor] += amount
+        return totals
+
+    def validate_parent(self, code, parent_code, account_type):
+        """
+        检查新增或修改的科目的上级科目：上级科目存在、类型相同，且不是本科目或其下级科目
+        :raises ValueError: 不符合要求
+        """
+        if not parent_code:
+            return
+        parent = self.get(parent_code)
+        if parent is None:
+            raise ValueError(f'上级科目 {parent_code} 不存在')
+        if parent.type != account_type:
+            raise ValueError(f'上级科目 {parent_code} 的类型与本科目不同')
+        if code in parent.path.split(PATH_SEPARATOR):
+            raise ValueError('上级科目不能是本科目或其下级科目')
+
+
+def chart_version():
+    """数据库中的科目表版本号，尚未修改过科目表时为0"""
+    return db.session.query(LedgerVersion.version).filter(
+        LedgerVersion.name == CHART_VERSION).scalar() or 0
+
+
+def load_chart(version):
+    """查询整张科目表（含已删除科目），已删除的上级科目不计入科目树"""
+    rows = db.session.query(Account.id, Account.code, Account.name, Account.type, Account.parent_code,
+                            Account.description, Account.is_deleted).all()
+    paths = tree_paths({code: parent_code for _, code, _, _, parent_code, _, is_deleted in rows if not is_deleted})
+    accounts = []
+    for row in rows:
+        path = paths.get(row[1], row[1])
+        accounts.append(ChartAccount(*row[:6], bool(row[6]), path, path.count(PATH_SEPARATOR) + 1))
+    return Chart(version, accounts)
+
+
+def bump_version(connection, name):
+    """在当前事务中递增版本号（不存在时创建）"""
+    table = LedgerVersion.__table__
+    updated = connection.execute(
+        table.update().where(table.c.name == name).values(version=table.c.version + 1)
+    ).rowcount
+    if not updated:
+        connection.execute(table.insert().values(name=name, version=1))
+
+
+class ChartCache:
+    """进程内的科目表缓存，保存在app.extensions['chart']"""
+
+    def __init__(self):
+        self._chart = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        # 同一请求（应用上下文）内只检查一次版本号
+        chart = g.get('chart')
+        if chart is not None:
+            return chart
+        version = chart_version()
+        if db.session.info.get('chart_changed'):
+            # 当前事务修改了科目但尚未提交：按事务内的数据加载，不放入进程缓存
+            chart = load_chart(version)
+            g.chart = chart
+            return chart
+        chart = self._chart
+        if chart is None or chart.version != version:
+            with self._lock:
+                chart = self._chart
+                if chart is None or chart.version != version:
+                    chart = load_chart(version)
+                    self._chart = chart
+        g.chart = chart
+        return chart
+
+    def invalidate(self):
+        self._chart = None
+        if has_app_context():
+            g.pop('chart', None)
+
+
+def get_chart():
+    """当前应用的科目表"""
+    return current_app.extensions['chart'].get()
+
+
+def init_chart(app):
+    app.extensions['chart'] = ChartCache()
+
+
+def _chart_changed(session):
+    for obj in session.new:
+        if isinstance(obj, Account):
+            return True
+    for obj in session.deleted:
+        if isinstance(obj, Account):
+            return True
+    for obj in session.dirty:
+        if isinstance(obj, Account):
+            state = inspect(obj)
+            if any(state.attrs[field].history.has_changes() for field in CHART_FIELDS):
+                return True
+    return False
+
+
+@event.listens_for(db.session, 'before_flush')
+def _bump_chart_version(session, flush_context, instances):
+    """通过ORM新增、修改、删除科目时递增科目表版本号（与科目的修改在同一事务中提交）"""
+    if _chart_changed(session):
+        bump_version(session.connection(), CHART_VERSION)
+        session.info['chart_changed'] = True
+        # 本请求已加载的科目表不含这些修改，之后重新加载
+        if has_app_context():
+            g.pop('chart', None)
+
+
+@event.listens_for(db.session, 'after_commit')
+def _invalidate_chart(session):
+    if session.info.pop('chart_changed', False) and has_app_context():
+        chart_cache = current_app.extensions.get('chart')
+        if chart_cache is not None:
+            chart_cache.invalidate()
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_chart_change(session):
+    if session.info.pop('chart_changed', None) and has_app_context():
+        g.pop('chart', None)
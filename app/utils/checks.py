@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+总账数据检查模块
+凭证借贷平衡、科目余额与凭证是否一致、现金余额是否出现负数、期末结转是否结平损益、
+试算平衡等检查，每项只执行少量分组查询，结果可输出为文本或JSON（flask ledger check）
+"""
+
+from collections import OrderedDict
+from datetime import date
+from decimal import Decimal
+from sqlalchemy import func
+from app.models import db, Account, Voucher, VoucherEntry
+from app.utils.cash_flow import cash_account_codes
+from app.utils.money import money_sum
+from app.utils.ledger import (ZERO, DEBIT_BALANCE_TYPES, signed_amount, unbalanced_vouchers,
+                              balance_drift, period_balance_drift, period_of)
+
+# 有效的科目类型
+ACCOUNT_TYPES = ('asset', 'liability', 'equity', 'cost', 'income', 'expense')
+
+# 期末结转时需要结平的损益类科目
+PROFIT_LOSS_TYPES = ('income', 'expense', 'cost')
+
+TOLERANCE = Decimal('0.01')
+
+
+class CheckResult:
+    """
+    一项检查的结果
+    name: 检查名称
+    title: 中文说明
+    issues: 发现的问题，每项为一个字典
+    details: 汇总数据（如试算平衡的借贷合计）
+    """
+
+    def __init__(self, name, title, issues=None, details=None):
+        self.name = name
+        self.title = title
+        self.issues = issues or []
+        self.details = details or {}
+
+    @property
+    def ok(self):
+        return not self.issues
+
+    def as_dict(self):
+        return {
+            'name': self.name,
+            'title': self.title,
+            'ok': self.ok,
+            'issues': self.issues,
+            'details': self.details,
+        }
+
+
+def _posted_entries():
+    """已过账凭证分录查询（关联凭证表）"""
+    return db.session.query().select_from(VoucherEntry).join(
+        Voucher, Voucher.id == VoucherEntry.voucher_id
+    ).filter(
+        Voucher.status == 'posted',
+        Voucher.is_deleted == False
+    )
+
+
+def check_unbalanced_vouchers():
+    """借贷不平衡的已过账凭证"""
+    issues = [{'voucher_id': voucher_id, 'voucher_number': number, 'debit': debit, 'credit': credit,
+               'difference': debit - credit}
+              for voucher_id, number, debit, credit in unbalanced_vouchers(TOLERANCE)]
+    return CheckResult('unbalanced', '凭证借贷平衡', issues)
+
+
+def check_accounts():
+    """科目类型无效，以及分录引用了不存在的科目"""
+    issues = [{'account_code': code, 'account_name': name, 'message': f'无效的科目类型 {account_type}'}
+              for code, name, account_type in db.session.query(Account.code, Account.name, Account.type).filter(
+                  ~Account.type.in_(ACCOUNT_TYPES)).order_by(Account.code)]
+
+    missing = db.session.query(VoucherEntry.account_code, func.count(VoucherEntry.id)).outerjoin(
+        Account, Account.code == VoucherEntry.account_code
+    ).filter(Account.id.is_(None)).group_by(VoucherEntry.account_code).order_by(VoucherEntry.account_code)
+    issues += [{'account_code': code, 'entries': count, 'message': '分录引用的科目不存在'}
+               for code, count in missing]
+    return CheckResult('accounts', '科目设置', issues)
+
+
+def check_balance_drift():
+    """科目余额、科目期间余额与按已过账凭证汇总的结果不一致"""
+    issues = [{'account_code': code, 'account_name': name, 'stored': stored, 'computed': computed,
+               'difference': computed - stored}
+              for code, name, stored, computed in balance_drift()]
+    periods = period_balance_drift()
+    if periods:
+        issues.append({'message': f'{periods} 条科目期间余额与凭证不一致', 'periods': periods})
+    return CheckResult('balance_drift', '科目余额与凭证一致', issues,
+                       {'hint': '执行 flask ledger rebuild 修正'} if issues else None)
+
+
+def check_negative_cash():
+    """
+    现金科目（库存现金、银行存款）按日累计的余额出现负数
+    单条查询按科目、日期汇总，在内存中累计
+    """
+    rows = _posted_entries().add_columns(
+        VoucherEntry.account_code,
+        Voucher.date,
+        money_sum(VoucherEntry.debit - VoucherEntry.credit)
+    ).filter(
+        VoucherEntry.account_code.in_(cash_account_codes())
+    ).group_by(VoucherEntry.account_code, Voucher.date).order_by(VoucherEntry.account_code, Voucher.date)
+
+    issues = []
+    balances = OrderedDict()
+    current_code, balance, first_negative, lowest = None, ZERO, None, None
+
+    def close_account():
+        balances[current_code] = balance
+        if first_negative is not None:
+            issues.append({'account_code': current_code, 'first_negative_date': first_negative,
+                           'lowest_balance': lowest[1], 'lowest_date': lowest[0], 'balance': balance})
+
+    for code, voucher_date, amount in rows:
+        if code != current_code:
+            if current_code is not None:
+                close_account()
+            current_code, balance, first_negative, lowest = code, ZERO, None, None
+        balance += Decimal(amount).quantize(ZERO)
+        if balance < 0:
+            if first_negative is None:
+                first_negative = voucher_date
+            if lowest is None or balance < lowest[1]:
+                lowest = (voucher_date, balance)
+    if current_code is not None:
+        close_account()
+    return CheckResult('negative_cash', '现金余额非负', issues, {'balances': balances})
+
+
+def check_closing_vouchers():
+    """
+    期末损益结转：结转凭证日期的损益类科目累计余额应为零，每月至多一张已过账的结转凭证
+    """
+    closing = db.session.query(Voucher.voucher_number, Voucher.date).filter(
+        Voucher.voucher_number.like('CLOS%'),
+        Voucher.status == 'posted',
+        Voucher.is_deleted == False
+    ).order_by(Voucher.date, Voucher.voucher_number).all()
+    if not closing:
+        return CheckResult('closing', '期末损益结转', details={'closing_vouchers': 0})
+
+    issues = []
+    by_period = {}
+    for number, voucher_date in closing:
+        by_period.setdefault(period_of(voucher_date), []).append(number)
+    for period, numbers in sorted(by_period.items()):
+        if len(numbers) > 1:
+            issues.append({'period': period, 'voucher_numbers': numbers, 'message': '同一期间有多张结转凭证'})
+
+    # 损益类科目按日期汇总，累计到每个结转日期
+    closing_dates = sorted({voucher_date for _, voucher_date in closing})
+    rows = _posted_entries().add_columns(
+        Account.code,
+        Account.type,
+        Voucher.date,
+        money_sum(VoucherEntry.debit),
+        money_sum(VoucherEntry.credit)
+    ).join(Account, Account.code == VoucherEntry.account_code).filter(
+        Account.type.in_(PROFIT_LOSS_TYPES),
+        Voucher.date <= closing_dates[-1]
+    ).group_by(Account.code, Account.type, Voucher.date).order_by(Voucher.date)
+
+    balances = {}
+    remaining = list(closing_dates)
+    numbers_by_date = {}
+    for number, voucher_date in closing:
+        numbers_by_date.setdefault(voucher_date, []).append(number)
+
+    def check_date(closing_date):
+        for code, balance in sorted(balances.items()):
+            if abs(balance) >= TOLERANCE:
+                issues.append({'date': closing_date, 'voucher_numbers': numbers_by_date[closing_date],
+                               'account_code': code, 'balance': balance, 'message': '结转后损益类科目余额不为零'})
+
+    for code, account_type, voucher_date, debit, credit in rows:
+        while remaining and remaining[0] < voucher_date:
+            check_date(remaining.pop(0))
+        balances[code] = balances.get(code, ZERO) + signed_amount(
+            account_type, Decimal(debit).quantize(ZERO), Decimal(credit).quantize(ZERO))
+    for closing_date in remaining:
+        check_date(closing_date)
+    return CheckResult('closing', '期末损益结转', issues, {'closing_vouchers': len(closing)})
+
+
+def check_trial_balance(as_of=None):
+    """
+    试算平衡：已过账分录借方合计等于贷方合计，
+    借方余额类科目（资产、成本、费用）余额合计等于贷方余额类科目（负债、所有者权益、收入）余额合计
+    """
+    query = _posted_entries().add_columns(
+        Account.type,
+        money_sum(VoucherEntry.debit),
+        money_sum(VoucherEntry.credit)
+    ).outerjoin(Account, Account.code == VoucherEntry.account_code)
+    if as_of is not None:
+        query = query.filter(Voucher.date <= as_of)
+
+    total_debit = total_credit = debit_balances = credit_balances = ZERO
+    by_type = {}
+    for account_type, debit, credit in query.group_by(Account.type):
+        debit, credit = Decimal(debit).quantize(ZERO), Decimal(credit).quantize(ZERO)
+        total_debit += debit
+        total_credit += credit
+        balance = signed_amount(account_type, debit, credit)
+        by_type[account_type or 'unknown'] = balance
+        if account_type in DEBIT_BALANCE_TYPES:
+            debit_balances += balance
+        else:
+            credit_balances += balance
+
+    issues = []
+    if abs(total_debit - total_credit) >= TOLERANCE:
+        issues.append({'message': '借方发生额合计不等于贷方发生额合计', 'debit': total_debit, 'credit': total_credit,
+                       'difference': total_debit - total_credit})
+    elif abs(debit_balances - credit_balances) >= TOLERANCE:
+        issues.append({'message': '借方余额合计不等于贷方余额合计', 'debit_balances': debit_balances,
+                       'credit_balances': credit_balances, 'difference': debit_balances - credit_balances})
+    details = {
+        'as_of': as_of,
+        'total_debit': total_debit,
+        'total_credit': total_credit,
+        'debit_balances': debit_balances,
+        'credit_balances': credit_balances,
+        'balances_by_type': by_type,
+    }
+    return CheckResult('trial_balance', '试算平衡', issues, details)
+
+
+# 检查名称 -> 检查函数，按执行顺序排列
+CHECKS = OrderedDict([
+    ('unbalanced', check_unbalanced_vouchers),
+    ('accounts', check_accounts),
+    ('balance_drift', check_balance_drift),
+    ('negative_cash', check_negative_cash),
+    ('closing', check_closing_vouchers),
+    ('trial_balance', check_trial_balance),
+])
+
+
+def run_checks(names=None):
+    """
+    执行检查
+    :param names: 检查名称列表，为空表示全部
+    :return: [CheckResult]，按CHECKS中的顺序
+    """
+    return [check() for name, check in CHECKS.items() if not names or name in names]
+
+
+def json_default(value):
+    """json.dumps的default：金额输出为字符串，日期输出为ISO格式"""
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} 不能转换为JSON')
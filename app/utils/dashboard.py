@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+仪表盘指标模块
+本月收支、待处理事项数、最近交易分别缓存；过账和单据状态变更时增量更新缓存，
+仪表盘读取时不再扫描凭证
+"""
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+from sqlalchemy import func
+from sqlalchemy.orm import selectinload
+
+from app.models import db, Expense, PurchaseOrder, SalesOrder, Voucher, VoucherEntry
+from app.utils.cache import get_cache
+from app.utils.chart import get_chart
+from app.utils.ledger import ZERO, period_of
+from app.utils.money import money_sum
+
+MONTH_KEY = 'dashboard:month:{period}'
+PENDING_KEY = 'dashboard:pending'
+RECENT_KEY = 'dashboard:recent'
+
+# 各类单据计入"待处理事项"的状态
+PENDING_STATUS = {
+    'orders': 'pending',
+    'expenses': 'pending',
+    'vouchers': 'draft',
+}
+
+# 出现在最近交易中的单据类型，状态变化或新增时需要刷新
+RECENT_KINDS = ('vouchers', 'expenses')
+
+
+def _month_range(day):
+    start = day.replace(day=1)
+    end = (start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    return start, end
+
+
+def _income_expense(lines):
+    """
+    按科目类型计算收入和支出
+    :param lines: [(科目类型, 借方, 贷方)]
+    """
+    income = expense = ZERO
+    for account_type, debit, credit in lines:
+        if account_type == 'income':
+            income += credit  # 收入类账户增加记在贷方
+        elif account_type in ('expense', 'cost'):
+            expense += debit
+    return income, expense
+
+
+def month_totals(day):
+    """
+    指定日期所在月份已过账凭证的收入、支出合计（按科目分组汇总，科目类型取自科目表缓存）
+    :return: {'income': Decimal, 'expense': Decimal}
+    """
+    cache = get_cache()
+    key = MONTH_KEY.format(period=period_of(day))
+    totals = cache.get(key)
+    if totals is None:
+        start, end = _month_range(day)
+        rows = db.session.query(
+            VoucherEntry.account_code,
+            money_sum(VoucherEntry.debit),
+            money_sum(VoucherEntry.credit)
+        ).join(Voucher, Voucher.id == VoucherEntry.voucher_id).filter(
+            Voucher.date >= start,
+            Voucher.date <= end,
+            Voucher.status == 'posted',
+            Voucher.is_deleted == False
+        ).group_by(VoucherEntry.account_code).all()
+        account_types = get_chart().types
+        income, expense = _income_expense((account_types.get(code), Decimal(d), Decimal(c)) for code, d, c in rows)
+        totals = {'income': income, 'expense': expense}
+        cache.set(key, totals)
+    return totals
+
+
+def pending_counts():
+    """
+    待处理的订单、费用报销、凭证数（一次查询）
+    :return: {'orders': int, 'expenses': int, 'vouchers': int}
+    """
+    cache = get_cache()
+    counts = cache.get(PENDING_KEY)
+    if counts is None:
+        def count(model, status):
+            return db.session.query(func.count(model.id)).filter(
+                model.status == status, model.is_deleted == False
+            ).scalar_subquery()
+
+        purchase, sales, expenses, vouchers = db.session.query(
+            count(PurchaseOrder, PENDING_STATUS['orders']),
+            count(SalesOrder, PENDING_STATUS['orders']),
+            count(Expense, PENDING_STATUS['expenses']),
+            count(Voucher, PENDING_STATUS['vouchers'])
+        ).one()
+        counts = {'orders': purchase + sales, 'expenses': expenses, 'vouchers': vouchers}
+        cache.set(PENDING_KEY, counts)
+    return counts
+
+
+def recent_transactions(limit=10):
+    """
+    最近的凭证和费用报销记录
+    """
+    cache = get_cache()
+    transactions = cache.get(RECENT_KEY)
+    if transactions is None:
+        transactions = []
+        recent_vouchers = Voucher.query.options(selectinload(Voucher.entries)).filter_by(
+            is_deleted=False).order_by(Voucher.create_time.desc()).limit(5).all()
+        for voucher in recent_vouchers:
+            transactions.append({
+                'date': voucher.date.strftime('%Y-%m-%d'),
+                'type': '凭证',
+                'description': voucher.summary,
+                'amount': sum(entry.debit for entry in voucher.entries),
+                'status': voucher.status
+            })
+
+        recent_expenses = Expense.query.filter_by(is_deleted=False).order_by(
+            Expense.create_time.desc()).limit(5).all()
+        for expense in recent_expenses:
+            transactions.append({
+                'date': expense.create_time.strftime('%Y-%m-%d'),
+                'type': '费用报销',
+                'description': expense.description,
+                'amount': expense.amount,
+                'status': expense.status
+            })
+
+        # 按日期排序
+        transactions.sort(key=lambda x: x['date'], reverse=True)
+        transactions = transactions[:limit]
+        cache.set(RECENT_KEY, transactions)
+    return transactions
+
+
+def dashboard_metrics(today=None):
+    """
+    仪表盘指标：本月收入、支出、利润，待处理事项数，最近交易
+    """
+    today = today or date.today()
+    totals = month_totals(today)
+    counts = pending_counts()
+    return {
+        'total_income': totals['income'],
+        'total_expense': totals['expense'],
+        'total_profit': totals['income'] - totals['expense'],
+        'total_pending': counts['orders'] + counts['expenses'] + counts['vouchers'],
+        'recent_transactions': recent_transactions(),
+    }
+
+
+# 增量更新：均在事务提交之后调用，缓存中没有对应的键时不做处理
+
+def movements_posted(movements):
+    """
+    凭证过账后，将发生额计入对应月份的缓存
+    :param movements: {(科目编码, 期间): (借方发生额, 贷方发生额)}，即PostingResult.movements
+    """
+    cache = get_cache()
+    by_period = {}
+    for (code, period), amounts in movements.items():
+        if cache.get(MONTH_KEY.format(period=period)) is not None:
+            by_period.setdefault(period, []).append((code, amounts))
+
+    if by_period:
+        types = get_chart().types
+        for period, lines in by_period.items():
+            income, expense = _income_expense(
+                (types.get(code), debit, credit) for code, (debit, credit) in lines
+            )
+            cache.update(MONTH_KEY.format(period=period),
+                         lambda totals: {'income': totals['income'] + income,
+                                         'expense': totals['expense'] + expense})
+    cache.delete(RECENT_KEY)
+
+
+def status_changed(kind, old_status, new_status):
+    """
+    单据状态变更后调整待处理事项数
+    :param kind: 'orders'、'expenses' 或 'vouchers'
+    :param old_status: 原状态，新建单据为None
+    :param new_status: 新状态，删除单据为None
+    """
+    cache = get_cache()
+    pending = PENDING_STATUS[kind]
+    delta = (new_status == pending) - (old_status == pending)
+    if delta:
+        cache.update(PENDING_KEY, lambda counts: dict(counts, **{kind: counts[kind] + delta}))
+    if kind in RECENT_KINDS:
+        cache.delete(RECENT_KEY)
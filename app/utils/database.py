@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据库引擎配置模块
+SQLite连接建立时按配置SQLITE_PRAGMAS执行PRAGMA（WAL日志模式、busy_timeout、页缓存等），
+使读请求不被过账等写事务阻塞，并发写入时等待而不是立即报“database is locked”；
+SQLALCHEMY_ENGINE_OPTIONS中的连接池配置同样适用于SQLite文件数据库和服务器数据库
+"""
+
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool, StaticPool
+
+# 只对可以排队的连接池有意义的参数
+QUEUE_POOL_OPTIONS = ('pool_size', 'max_overflow', 'pool_timeout')
+
+
+def set_sqlite_pragmas(dbapi_connection, pragmas):
+    """
+    在SQLite连接上依次执行PRAGMA
+    :param pragmas: {名称: 值}，按字典顺序执行
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+    finally:
+        cursor.close()
+
+
+def sqlite_pragmas(dbapi_connection):
+    """读取连接当前的PRAGMA取值，用于检查配置是否生效"""
+    cursor = dbapi_connection.cursor()
+    try:
+        return {name: cursor.execute(f'PRAGMA {name}').fetchone()[0]
+                for name in ('journal_mode', 'synchronous', 'busy_timeout', 'cache_size', 'mmap_size')}
+    finally:
+        cursor.close()
+
+
+class FinanceSQLAlchemy(SQLAlchemy):
+    """
+    在Flask-SQLAlchemy创建引擎时为SQLite引擎注册connect事件
+    引擎按应用配置创建（数据库地址变化时会重建），PRAGMA随引擎注册，不影响其他应用和数据库
+    """
+
+    def apply_driver_hacks(self, app, sa_url, options):
+        sa_url, options = super().apply_driver_hacks(app, sa_url, options)
+        if sa_url.drivername.startswith('sqlite'):
+            pragmas = app.config.get('SQLITE_PRAGMAS')
+            if pragmas:
+                options['_sqlite_pragmas'] = dict(pragmas)
+        return sa_url, options
+
+    def create_engine(self, sa_url, engine_opts):
+        # engine_opts已合并SQLALCHEMY_ENGINE_OPTIONS
+        pragmas = engine_opts.pop('_sqlite_pragmas', None)
+        if sa_url.drivername.startswith('sqlite'):
+            if engine_opts.get('poolclass') is StaticPool:
+                # 内存数据库只有一个连接
+                for name in QUEUE_POOL_OPTIONS:
+                    engine_opts.pop(name, None)
+            elif engine_opts.get('pool_size'):
+                # SQLite文件数据库默认不复用连接（NullPool），每次都要重新打开文件并执行PRAGMA；
+                # 配置了pool_size时改用连接池。连接在线程间复用，但同一时刻只被一个线程使用
+                engine_opts['poolclass'] = QueuePool
+                engine_opts['connect_args'] = dict(engine_opts.get('connect_args', {}), check_same_thread=False)
+
+        engine = super().create_engine(sa_url, engine_opts)
+        if pragmas:
+            @event.listens_for(engine, 'connect')
+            def _on_connect(dbapi_connection, connection_record):
+                set_sqlite_pragmas(dbapi_connection, pragmas)
+        return engine
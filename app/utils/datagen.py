@@ -0,0 +1,452 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+压测数据生成模块
+按规模档位生成多年的往来单位、订单、报销单和已过账凭证，用于性能测试和基准测试
+- 固定随机种子：种子、档位和截止日期相同时生成的数据完全相同
+- 按块批量插入（Core executemany），主键预先分配，百万级凭证无需逐行创建ORM对象
+- 单据编号由日期和主键组成，保证唯一
+- 每张凭证按业务模板生成，借贷平衡，科目搭配接近真实账簿（平均每张约5条分录）
+- 生成后按集合汇总重算科目余额和期间余额，并同时写入现金流量分类记录
+"""
+
+import random
+import time
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import func
+from werkzeug.security import generate_password_hash
+
+from app.models import (db, CashFlowEntry, Customer, Expense, PurchaseOrder, PurchaseOrderItem,
+                        SalesOrder, SalesOrderItem, Supplier, User, Voucher, VoucherEntry)
+from app.utils.cash_flow import ITEM_ACTIVITY, voucher_cash_flows
+from app.utils.chart import get_chart
+from app.utils.ledger import rebuild_account_balances, rebuild_period_balances
+
+# 规模档位
+DatasetProfile = namedtuple('DatasetProfile', 'vouchers years users suppliers customers orders expenses')
+
+PROFILES = {
+    'small': DatasetProfile(vouchers=10_000, years=1, users=10, suppliers=50, customers=100,
+                            orders=2_000, expenses=1_000),
+    'medium': DatasetProfile(vouchers=100_000, years=2, users=30, suppliers=200, customers=500,
+                             orders=20_000, expenses=10_000),
+    'large': DatasetProfile(vouchers=1_000_000, years=3, users=100, suppliers=1_000, customers=3_000,
+                            orders=200_000, expenses=100_000),
+}
+
+# 每批插入的凭证数
+CHUNK_SIZE = 5_000
+
+# 截止日前几天内的凭证、单据保留未过账/待审批状态
+OPEN_DAYS = 3
+
+CENT = Decimal('0.01')
+VAT_RATE = Decimal('0.13')
+
+CITIES = ['北京', '上海', '广州', '深圳', '杭州', '南京', '成都', '武汉', '西安', '重庆']
+COMPANY_SUFFIXES = ['科技有限公司', '贸易有限公司', '实业有限公司', '发展有限公司', '商贸有限公司']
+SURNAMES = ['张', '王', '李', '赵', '刘', '陈', '杨', '黄', '周', '吴']
+GIVEN_NAMES = ['明', '华', '强', '芳', '秀英', '娜', '敏', '静', '丽', '伟']
+PURCHASE_ITEMS = ['原材料', '包装材料', '设备配件', '电子元件', '办公用品', '维修工具']
+SALES_ITEMS = ['产品A', '产品B', '产品C', '技术服务', '配件', '套装产品']
+EXPENSE_TYPES = ['差旅费', '办公费', '招待费', '交通费', '通讯费', '培训费']
+
+
+def _money(rng, low, high):
+    """[low, high] 之间的随机金额（精确到分）"""
+    return Decimal(rng.randint(low * 100, high * 100)) * CENT
+
+
+def _tax(amount):
+    return (amount * VAT_RATE).quantize(CENT)
+
+
+def _split(rng, count, low, high):
+    return [_money(rng, low, high) for _ in range(count)]
+
+
+# 凭证模板：返回 (摘要, [(科目编码, 借方, 贷方)])
+
+def _cash_sale(rng):
+    amounts = _split(rng, rng.randint(1, 6), 500, 20_000)
+    tax = _tax(sum(amounts))
+    lines = [('1002', sum(amounts) + tax, None)]
+    lines += [(rng.choice(('6001', '6001', '6001', '6051')), None, amount) for amount in amounts]
+    return '销售商品收款', lines + [('2221', None, tax)]
+
+
+def _credit_sale(rng):
+    amounts = _split(rng, rng.randint(2, 8), 1_000, 50_000)
+    tax = _tax(sum(amounts))
+    lines = [('1122', sum(amounts) + tax, None)]
+    lines += [('6001', None, amount) for amount in amounts]
+    return '赊销商品', lines + [('2221', None, tax)]
+
+
+def _collection(rng):
+    amounts = _split(rng, rng.randint(1, 6), 1_000, 60_000)
+    return '收回应收账款', [('1002', sum(amounts), None)] + [('1122', None, amount) for amount in amounts]
+
+
+def _purchase(rng):
+    amounts = _split(rng, rng.randint(2, 8), 500, 30_000)
+    tax = _tax(sum(amounts))
+    lines = [(rng.choice(('1403', '1405')), amount, None) for amount in amounts]
+    return '采购入库', lines + [('2221', tax, None), ('2202', None, sum(amounts) + tax)]
+
+
+def _supplier_payment(rng):
+    amounts = _split(rng, rng.randint(1, 5), 1_000, 40_000)
+    return '支付货款', [('2202', amount, None) for amount in amounts] + [('1002', None, sum(amounts))]
+
+
+def _expense_claim(rng):
+    amounts = _split(rng, rng.randint(2, 7), 50, 3_000)
+    lines = [(rng.choice(('6601', '6602', '6602')), amount, None) for amount in amounts]
+    return '费用报销', lines + [(rng.choice(('1001', '1002')), None, sum(amounts))]
+
+
+def _payroll_accrual(rng):
+    amounts = _split(rng, 4, 20_000, 200_000)
+    lines = [(code, amount, None) for code, amount in zip(('5001', '5101', '6601', '6602'), amounts)]
+    return '计提工资', lines + [('2211', None, sum(amounts))]
+
+
+def _payroll_payment(rng):
+    gross = _money(rng, 100_000, 600_000)
+    withheld = (gross * Decimal('0.05')).quantize(CENT)
+    return '发放工资', [('2211', gross, None), ('1002', None, gross - withheld), ('2221', None, withheld)]
+
+
+def _cost_transfer(rng):
+    main_cost, other_cost = _money(rng, 5_000, 80_000), _money(rng, 500, 8_000)
+    return '结转销售成本', [('6401', main_cost, None), ('6402', other_cost, None),
+                         ('1405', None, main_cost), ('1403', None, other_cost)]
+
+
+def _tax_payment(rng):
+    vat, surtax = _money(rng, 2_000, 50_000), _money(rng, 100, 5_000)
+    return '缴纳税费', [('2221', vat, None), ('6403', surtax, None), ('1002', None, vat + surtax)]
+
+
+def _fixed_asset(rng):
+    amount = _money(rng, 5_000, 300_000)
+    tax = _tax(amount)
+    return '购置固定资产', [('1601', amount, None), ('2221', tax, None), ('1002', None, amount + tax)]
+
+
+def _depreciation(rng):
+    factory, office = _money(rng, 1_000, 20_000), _money(rng, 200, 5_000)
+    return '计提折旧', [('5101', factory, None), ('6602', office, None), ('1602', None, factory + office)]
+
+
+def _loan(rng):
+    amount = _money(rng, 100_000, 2_000_000)
+    return '取得短期借款', [('1002', amount, None), ('2001', None, amount)]
+
+
+def _loan_repayment(rng):
+    principal, interest = _money(rng, 50_000, 1_000_000), _money(rng, 500, 20_000)
+    return '归还借款及利息', [('2001', principal, None), ('6603', interest, None), ('1002', None, principal + interest)]
+
+
+def _cash_withdrawal(rng):
+    amount = _money(rng, 1_000, 20_000)
+    return '提取备用金', [('1001', amount, None), ('1002', None, amount)]
+
+
+# 凭证模板用到的会计科目（均在默认科目表中）
+REQUIRED_ACCOUNTS = ('1001', '1002', '1122', '1403', '1405', '1601', '1602', '2001', '2202', '2211', '2221',
+                     '4001', '5001', '5101', '6001', '6051', '6401', '6402', '6403', '6601', '6602', '6603')
+
+# (权重, 模板)
+VOUCHER_TEMPLATES = [
+    (16, _cash_sale),
+    (14, _credit_sale),
+    (12, _collection),
+    (14, _purchase),
+    (10, _supplier_payment),
+    (18, _expense_claim),
+    (2, _payroll_accrual),
+    (2, _payroll_payment),
+    (5, _cost_transfer),
+    (2, _tax_payment),
+    (1, _fixed_asset),
+    (1, _depreciation),
+    (1, _loan),
+    (1, _loan_repayment),
+    (1, _cash_withdrawal),
+]
+
+
+class _IdAllocator:
+    """按表预先分配主键，插入前即可建立关联"""
+
+    def __init__(self):
+        self._next = {}
+
+    def take(self, model, count=1):
+        if model not in self._next:
+            self._next[model] = (db.session.query(func.max(model.id)).scalar() or 0) + 1
+        first = self._next[model]
+        self._next[model] += count
+        return first
+
+
+def _insert(model, rows):
+    if rows:
+        db.session.execute(model.__table__.insert(), rows)
+
+
+def _stamp(created):
+    return {'create_time': created, 'update_time': created, 'is_deleted': False}
+
+
+def _base_row(row_id, created):
+    return dict(_stamp(created), id=row_id)
+
+
+def _day(start_date, span_days, index, total):
+    """第index条（共total条）记录的日期：在区间内均匀分布且递增"""
+    return start_date + timedelta(days=index * span_days // max(total, 1))
+
+
+def _name(rng):
+    return rng.choice(SURNAMES) + rng.choice(GIVEN_NAMES)
+
+
+def _phone(rng):
+    return f'13{rng.randint(0, 999_999_999):09d}'
+
+
+def _generate_parties(rng, ids, profile, start_date):
+    """用户、供应商、客户；返回各自的ID列表"""
+    created = datetime.combine(start_date, datetime.min.time())
+    password = generate_password_hash('123456')
+
+    first = ids.take(User, profile.users)
+    users = []
+    for offset in range(profile.users):
+        row = _base_row(first + offset, created)
+        row.update(username=f'loaduser{first + offset}', password=password, real_name=_name(rng),
+                   role=rng.choice(('admin', 'manager', 'user', 'user')), email=None, phone=_phone(rng))
+        users.append(row)
+    _insert(User, users)
+
+    parties = {}
+    for model, count in ((Supplier, profile.suppliers), (Customer, profile.customers)):
+        first = ids.take(model, count)
+        rows = []
+        for offset in range(count):
+            row_id = first + offset
+            row = _base_row(row_id, created)
+            row.update(name=f'{rng.choice(CITIES)}{row_id:06d}{rng.choice(COMPANY_SUFFIXES)}',
+                       contact=_name(rng), phone=_phone(rng), email=None, address=None,
+                       tax_number=f'{rng.randint(0, 10 ** 15 - 1):015d}')
+            if model is Supplier:
+                row['bank_account'] = f'{rng.randint(0, 10 ** 19 - 1):019d}'
+            else:
+                row['credit_limit'] = _money(rng, 100_000, 500_000)
+            rows.append(row)
+        _insert(model, rows)
+        parties[model] = list(range(first, first + count))
+    return [row['id'] for row in users], parties[Supplier], parties[Customer]
+
+
+def _generate_orders(rng, ids, profile, start_date, end_date, user_ids, supplier_ids, customer_ids):
+    """采购、销售订单及明细，约各占一半"""
+    span = (end_date - start_date).days + 1
+    counts = {PurchaseOrder: profile.orders // 2, SalesOrder: profile.orders - profile.orders // 2}
+    specs = {
+        PurchaseOrder: ('PO', PurchaseOrderItem, PURCHASE_ITEMS, 'supplier_id', supplier_ids),
+        SalesOrder: ('SO', SalesOrderItem, SALES_ITEMS, 'customer_id', customer_ids),
+    }
+    for model, count in counts.items():
+        prefix, item_model, item_names, party_column, party_ids = specs[model]
+        for chunk_start in range(0, count, CHUNK_SIZE):
+            orders, items = [], []
+            chunk_count = min(CHUNK_SIZE, count - chunk_start)
+            first = ids.take(model, chunk_count)
+            for offset in range(chunk_count):
+                order_id = first + offset
+                day = _day(start_date, span, chunk_start + offset, count)
+                created = datetime.combine(day, datetime.min.time()) + timedelta(seconds=rng.randint(0, 86_399))
+                is_open = (end_date - day).days < OPEN_DAYS
+                status = rng.choice(('pending', 'approved')) if is_open else rng.choice(
+                    ('completed', 'completed', 'completed', 'cancelled'))
+
+                lines = []
+                for _ in range(rng.randint(1, 4)):
+                    quantity = Decimal(rng.randint(1, 100))
+                    unit_price = _money(rng, 10, 2_000)
+                    lines.append((rng.choice(item_names), quantity, unit_price, quantity * unit_price))
+                total = sum(line[3] for line in lines)
+                tax = _tax(total)
+
+                row = _base_row(order_id, created)
+                row.update(order_number=f'{prefix}{day:%Y%m%d}G{order_id:09d}',
+                           total_amount=total + tax, tax_rate=Decimal('13'), tax_amount=tax,
+                           payment_method=rng.choice(('bank', 'cash', 'credit')), status=status,
+                           user_id=rng.choice(user_ids), approval_id=None,
+                           approval_time=None if status == 'pending' else created,
+                           payment_time=created if status == 'completed' else None)
+                row[party_column] = rng.choice(party_ids)
+                orders.append(row)
+
+                first_item = ids.take(item_model, len(lines))
+                for index, (name, quantity, unit_price, amount) in enumerate(lines):
+                    item = _base_row(first_item + index, created)
+                    item.update(order_id=order_id, item_name=name, quantity=quantity,
+                                unit_price=unit_price, amount=amount)
+                    items.append(item)
+            _insert(model, orders)
+            _insert(item_model, items)
+            db.session.commit()
+
+
+def _generate_expenses(rng, ids, profile, start_date, end_date, user_ids):
+    span = (end_date - start_date).days + 1
+    count = profile.expenses
+    for chunk_start in range(0, count, CHUNK_SIZE):
+        chunk_count = min(CHUNK_SIZE, count - chunk_start)
+        first = ids.take(Expense, chunk_count)
+        rows = []
+        for offset in range(chunk_count):
+            expense_id = first + offset
+            day = _day(start_date, span, chunk_start + offset, count)
+            created = datetime.combine(day, datetime.min.time()) + timedelta(seconds=rng.randint(0, 86_399))
+            is_open = (end_date - day).days < OPEN_DAYS
+            status = rng.choice(('pending', 'approved')) if is_open else rng.choice(('paid', 'paid', 'paid', 'rejected'))
+            expense_type = rng.choice(EXPENSE_TYPES)
+            row = _base_row(expense_id, created)
+            row.update(expense_number=f'EXP{day:%Y%m%d}G{expense_id:09d}', user_id=rng.choice(user_ids),
+                       amount=_money(rng, 50, 5_000), expense_type=expense_type, description=expense_type,
+                       status=status, approval_id=None, approval_time=None if status == 'pending' else created,
+                       payment_time=created if status == 'paid' else None)
+            rows.append(row)
+        _insert(Expense, rows)
+        db.session.commit()
+
+
+def _generate_vouchers(rng, ids, profile, start_date, end_date, user_ids, account_types, progress):
+    """凭证、分录及已过账凭证的现金流量分类记录；返回 (分录数, 分类记录数)"""
+    span = (end_date - start_date).days + 1
+    templates = [template for _, template in VOUCHER_TEMPLATES]
+    weights = [weight for weight, _ in VOUCHER_TEMPLATES]
+    total = profile.vouchers
+    entry_count = flow_count = 0
+
+    for chunk_start in range(0, total, CHUNK_SIZE):
+        chunk_count = min(CHUNK_SIZE, total - chunk_start)
+        first = ids.take(Voucher, chunk_count)
+        vouchers, entries, flows = [], [], []
+        for offset in range(chunk_count):
+            index = chunk_start + offset
+            voucher_id = first + offset
+            day = _day(start_date, span, index, total)
+            created = datetime.combine(day, datetime.min.time()) + timedelta(seconds=rng.randint(0, 86_399))
+            if index == 0:
+                # 第一张凭证为股东投入资本，保证账面资金充足
+                summary, lines = '收到投资款', [('1002', Decimal('50000000.00'), None), ('4001', None, Decimal('50000000.00'))]
+            else:
+                summary, lines = rng.choices(templates, weights)[0](rng)
+            is_open = (end_date - day).days < OPEN_DAYS
+            status = rng.choice(('draft', 'approved', 'posted')) if is_open else 'posted'
+
+            row = _base_row(voucher_id, created)
+            row.update(voucher_number=f'VOU{day:%Y%m%d}G{voucher_id:09d}', date=day, summary=summary,
+                       status=status, user_id=rng.choice(user_ids),
+                       approval_id=None if status == 'draft' else rng.choice(user_ids),
+                       approval_time=None if status == 'draft' else created,
+                       post_time=created if status == 'posted' else None)
+            vouchers.append(row)
+
+            first_entry = ids.take(VoucherEntry, len(lines))
+            voucher_entries = []
+            for position, (code, debit, credit) in enumerate(lines):
+                entry = _base_row(first_entry + position, created)
+                entry.update(voucher_id=voucher_id, account_code=code, debit=debit or Decimal('0.00'),
+                             credit=credit or Decimal('0.00'), description=summary)
+                entries.append(entry)
+                voucher_entries.append((entry['id'], code, account_types[code], entry['debit'], entry['credit']))
+
+            if status == 'posted':
+                for entry_id, cash_code, counterpart_code, item, amount in voucher_cash_flows(voucher_entries):
+                    flows.append(dict(_stamp(created), voucher_id=voucher_id, voucher_entry_id=entry_id,
+                                      date=day, cash_account_code=cash_code, counterpart_code=counterpart_code,
+                                      activity=ITEM_ACTIVITY[item], item=item, amount=amount))
+
+        _insert(Voucher, vouchers)
+        _insert(VoucherEntry, entries)
+        _insert(CashFlowEntry, flows)
+        db.session.commit()
+        entry_count += len(entries)
+        flow_count += len(flows)
+        progress(f'凭证 {chunk_start + chunk_count}/{total}，分录 {entry_count}')
+    return entry_count, flow_count
+
+
+def generate_dataset(profile='small', seed=42, end_date=None, vouchers=None, progress=None):
+    """
+    生成压测数据（分块提交）
+    需要先有会计科目（企业初始化或 generate_default_accounts）
+    :param profile: 规模档位 small/medium/large，或DatasetProfile
+    :param seed: 随机种子
+    :param end_date: 数据截止日期，默认今天；起始日期为截止日期往前profile.years年
+    :param vouchers: 覆盖档位中的凭证数
+    :param progress: 进度回调，参数为进度说明文字
+    :return: 各类记录的生成数量及用时
+    :raises ValueError: 档位不存在或缺少模板需要的会计科目
+    """
+    started = time.perf_counter()
+    if not isinstance(profile, DatasetProfile):
+        if profile not in PROFILES:
+            raise ValueError(f"未知的数据规模：{profile}，可选 {'/'.join(PROFILES)}")
+        profile = PROFILES[profile]
+    if vouchers is not None:
+        profile = profile._replace(vouchers=vouchers)
+    progress = progress or (lambda message: None)
+
+    account_types = {account.code: account.type for account in get_chart().accounts}
+    missing = sorted(set(REQUIRED_ACCOUNTS) - set(account_types))
+    if missing:
+        raise ValueError(f"缺少会计科目：{'、'.join(missing)}，请先完成企业初始化")
+
+    end_date = end_date or date.today()
+    start_date = end_date - timedelta(days=365 * profile.years - 1)
+    rng = random.Random(seed)
+    ids = _IdAllocator()
+
+    user_ids, supplier_ids, customer_ids = _generate_parties(rng, ids, profile, start_date)
+    db.session.commit()
+    progress(f'用户 {len(user_ids)}，供应商 {len(supplier_ids)}，客户 {len(customer_ids)}')
+
+    _generate_orders(rng, ids, profile, start_date, end_date, user_ids, supplier_ids, customer_ids)
+    _generate_expenses(rng, ids, profile, start_date, end_date, user_ids)
+    progress(f'订单 {profile.orders}，报销单 {profile.expenses}')
+
+    entry_count, flow_count = _generate_vouchers(rng, ids, profile, start_date, end_date,
+                                                 user_ids, account_types, progress)
+
+    # 按已过账凭证重算科目余额和期间余额
+    rebuild_account_balances()
+    period_count = rebuild_period_balances()
+    db.session.commit()
+
+    return {
+        'start_date': start_date,
+        'end_date': end_date,
+        'users': len(user_ids),
+        'suppliers': len(supplier_ids),
+        'customers': len(customer_ids),
+        'orders': profile.orders,
+        'expenses': profile.expenses,
+        'vouchers': profile.vouchers,
+        'entries': entry_count,
+        'cash_flow_entries': flow_count,
+        'period_balances': period_count,
+        'seconds': time.perf_counter() - started,
+    }
@@ -0,0 +1,672 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+总账余额计算模块
+在数据库端按科目分组汇总已过账分录，统一处理科目余额方向，
+维护按月的科目期间余额快照，提供批量过账（同时生成现金流量分类记录）和分页的科目明细账
+"""
+
+import time
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from flask import current_app
+from sqlalchemy import func, extract, and_, bindparam, tuple_
+from app.models import db, Account, AccountPeriodBalance, Voucher, VoucherEntry
+from app.utils.cash_flow import classify_vouchers
+from app.utils.chart import get_chart
+from app.utils.money import ZERO, money_sum, to_cents
+from app.utils.pagination import KeysetPage, decode_cursor, encode_cursor
+from app.utils.report_cache import touch_ledger
+
+# 资产、费用、成本类科目：借方增加，贷方减少
+# 负债、所有者权益、收入类科目：贷方增加，借方减少
+DEBIT_BALANCE_TYPES = ('asset', 'expense', 'cost')
+
+
+def signed_amount(account_type, debit, credit):
+    """
+    按科目类型计算借贷发生额对余额的影响
+    """
+    if account_type in DEBIT_BALANCE_TYPES:
+        return debit - credit
+    return credit - debit
+
+
+def posted_entry_totals(end_date=None, start_date=None, account_codes=None, exclude_closing=False):
+    """
+    按科目汇总已过账凭证分录的借贷方发生额（单条分组查询）
+    :param end_date: 截止日期（含），为空表示不限
+    :param start_date: 起始日期（含），为空表示从第一张凭证开始
+    :param account_codes: 只汇总指定科目，为空表示全部科目
+    :param exclude_closing: 是否排除期末结转凭证（CLOS开头）
+    :return: {科目编码: (借方合计, 贷方合计)}
+    """
+    query = db.session.query(
+        VoucherEntry.account_code,
+        money_sum(VoucherEntry.debit),
+        money_sum(VoucherEntry.credit)
+    ).join(Voucher, Voucher.id == VoucherEntry.voucher_id).filter(
+        Voucher.status == 'posted',
+        Voucher.is_deleted == False
+    )
+
+    if start_date is not None:
+        query = query.filter(Voucher.date >= start_date)
+    if end_date is not None:
+        query = query.filter(Voucher.date <= end_date)
+    if account_codes is not None:
+        query = query.filter(VoucherEntry.account_code.in_(list(account_codes)))
+    if exclude_closing:
+        query = query.filter(~Voucher.voucher_number.like('CLOS%'))
+
+    totals = {}
+    for code, debit, credit in query.group_by(VoucherEntry.account_code):
+        totals[code] = (Decimal(debit), Decimal(credit))
+    return totals
+
+
+def monthly_entry_totals(start_date=None, end_date=None, account_codes=None, exclude_closing=False):
+    """
+    按科目和月份汇总已过账凭证分录的借贷方发生额（单条分组查询）
+    参数含义同posted_entry_totals
+    :return: {(科目编码, 期间YYYYMM): (借方合计, 贷方合计)}
+    """
+    year = extract('year', Voucher.date)
+    month = extract('month', Voucher.date)
+    query = db.session.query(
+        VoucherEntry.account_code,
+        year,
+        month,
+        money_sum(VoucherEntry.debit),
+        money_sum(VoucherEntry.credit)
+    ).join(Voucher, Voucher.id == VoucherEntry.voucher_id).filter(
+        Voucher.status == 'posted',
+        Voucher.is_deleted == False
+    )
+
+    if start_date is not None:
+        query = query.filter(Voucher.date >= start_date)
+    if end_date is not None:
+        query = query.filter(Voucher.date <= end_date)
+    if account_codes is not None:
+        query = query.filter(VoucherEntry.account_code.in_(list(account_codes)))
+    if exclude_closing:
+        query = query.filter(~Voucher.voucher_number.like('CLOS%'))
+
+    totals = {}
+    for code, voucher_year, voucher_month, debit, credit in query.group_by(VoucherEntry.account_code, year, month):
+        totals[(code, f"{int(voucher_year):04d}{int(voucher_month):02d}")] = (Decimal(debit), Decimal(credit))
+    return totals
+
+
+def compute_balances(accounts, end_date=None, start_date=None):
+    """
+    计算科目在指定日期的余额
+    :param accounts: 科目对象列表（需要code和type属性）
+    :return: {科目编码: 余额}，没有发生额的科目余额为0
+    """
+    totals = posted_entry_totals(end_date=end_date, start_date=start_date)
+
+    balances = {}
+    for account in accounts:
+        debit, credit = totals.get(account.code, (ZERO, ZERO))
+        balances[account.code] = signed_amount(account.type, debit, credit)
+    return balances
+
+
+def unbalanced_vouchers(tolerance=Decimal('0.01')):
+    """
+    查找借贷不平衡的已过账凭证
+    :return: [(凭证ID, 凭证编号, 借方合计, 贷方合计)]
+    """
+    total_debit = money_sum(VoucherEntry.debit)
+    total_credit = money_sum(VoucherEntry.credit)
+
+    rows = db.session.query(
+        Voucher.id,
+        Voucher.voucher_number,
+        total_debit,
+        total_credit
+    ).join(VoucherEntry, VoucherEntry.voucher_id == Voucher.id).filter(
+        Voucher.status == 'posted',
+        Voucher.is_deleted == False
+    ).group_by(Voucher.id, Voucher.voucher_number).having(
+        func.abs(total_debit - total_credit) > to_cents(tolerance)
+    ).all()
+
+    return [(voucher_id, number, Decimal(debit), Decimal(credit))
+            for voucher_id, number, debit, credit in rows]
+
+
+# 科目期间余额快照
+
+def period_of(day):
+    """
+    日期所属的会计期间（YYYYMM）
+    """
+    return f"{day.year:04d}{day.month:02d}"
+
+
+def month_periods(start_date, end_date):
+    """
+    日期范围覆盖的会计期间列表，如 2024-01-15 至 2024-03-01 -> ['202401', '202402', '202403']
+    """
+    periods = []
+    year, month = start_date.year, start_date.month
+    while (year, month) <= (end_date.year, end_date.month):
+        periods.append(f"{year:04d}{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return periods
+
+
+def has_period_balances():
+    """
+    是否已生成科目期间余额
+    """
+    return db.session.query(AccountPeriodBalance.id).first() is not None
+
+
+def _code_range_filter(query, column, code_from=None, code_to=None):
+    """按科目编码范围（含两端）筛选"""
+    if code_from:
+        query = query.filter(column >= code_from)
+    if code_to:
+        query = query.filter(column <= code_to)
+    return query
+
+
+def _period_range_filter(query, column, start_period=None, end_period=None):
+    """按会计期间范围（含两端）筛选"""
+    if start_period:
+        query = query.filter(column >= start_period)
+    if end_period:
+        query = query.filter(column <= end_period)
+    return query
+
+
+def period_balance_rows(code_from=None, code_to=None, start_period=None, end_period=None):
+    """
+    按已过账凭证计算科目期间余额（按科目、年、月分组汇总）
+    期初余额始终从第一张凭证累计，范围只决定返回哪些期间
+    :return: [{account_code, period, opening_balance, debit_total, credit_total, closing_balance}]
+    """
+    year = extract('year', Voucher.date)
+    month = extract('month', Voucher.date)
+    query = db.session.query(
+        VoucherEntry.account_code,
+        year,
+        month,
+        money_sum(VoucherEntry.debit),
+        money_sum(VoucherEntry.credit)
+    ).join(Voucher, Voucher.id == VoucherEntry.voucher_id).filter(
+        Voucher.status == 'posted',
+        Voucher.is_deleted == False
+    )
+    query = _code_range_filter(query, VoucherEntry.account_code, code_from, code_to)
+    rows = query.group_by(VoucherEntry.account_code, year, month).order_by(
+        VoucherEntry.account_code, year, month
+    ).all()
+
+    account_types = get_chart().types
+
+    closing_balances = {}
+    mappings = []
+    for code, voucher_year, voucher_month, debit, credit in rows:
+        debit, credit = Decimal(debit), Decimal(credit)
+        period = f"{int(voucher_year):04d}{int(voucher_month):02d}"
+        opening = closing_balances.get(code, ZERO)
+        closing = opening + signed_amount(account_types.get(code), debit, credit)
+        closing_balances[code] = closing
+        if (start_period and period < start_period) or (end_period and period > end_period):
+            continue
+        mappings.append({
+            'account_code': code,
+            'period': period,
+            'opening_balance': opening,
+            'debit_total': debit,
+            'credit_total': credit,
+            'closing_balance': closing
+        })
+    return mappings
+
+
+def rebuild_period_balances(code_from=None, code_to=None, start_period=None, end_period=None):
+    """
+    按已过账凭证重新生成科目期间余额（不提交事务）
+    可只重建指定科目编码范围、期间范围内的记录
+    :return: 生成的记录数
+    """
+    mappings = period_balance_rows(code_from, code_to, start_period, end_period)
+
+    query = _code_range_filter(AccountPeriodBalance.query, AccountPeriodBalance.account_code, code_from, code_to)
+    query = _period_range_filter(query, AccountPeriodBalance.period, start_period, end_period)
+    query.delete(synchronize_session=False)
+
+    db.session.bulk_insert_mappings(AccountPeriodBalance, mappings)
+    # 报表读取期间余额快照，缓存全部失效
+    touch_ledger(db.session.connection())
+    return len(mappings)
+
+
+def period_balance_drift(code_from=None, code_to=None, start_period=None, end_period=None):
+    """
+    科目期间余额与按凭证重新计算的结果不一致的记录数（含缺失和多余的记录）
+    """
+    fields = ('opening_balance', 'debit_total', 'credit_total', 'closing_balance')
+    expected = {(row['account_code'], row['period']): tuple(row[field] for field in fields)
+                for row in period_balance_rows(code_from, code_to, start_period, end_period)}
+
+    query = _code_range_filter(db.session.query(
+        AccountPeriodBalance.account_code,
+        AccountPeriodBalance.period,
+        *[getattr(AccountPeriodBalance, field) for field in fields]
+    ), AccountPeriodBalance.account_code, code_from, code_to)
+    query = _period_range_filter(query, AccountPeriodBalance.period, start_period, end_period)
+
+    drift = 0
+    for code, period, *values in query:
+        if expected.pop((code, period), None) != tuple(values):
+            drift += 1
+    return drift + len(expected)
+
+
+def apply_period_movements(movements):
+    """
+    将过账发生额累加到科目期间余额（不提交事务）
+    :param movements: {(科目编码, 期间): (借方发生额, 贷方发生额)}
+    """
+    account_types = get_chart().types
+
+    for (code, period), (debit, credit) in sorted(movements.items()):
+        delta = signed_amount(account_types.get(code), debit, credit)
+
+        # 在数据库端累加，多个进程同时过账时不会覆盖彼此的发生额
+        updated = AccountPeriodBalance.query.filter_by(account_code=code, period=period).update({
+            AccountPeriodBalance.debit_total: AccountPeriodBalance.debit_total + debit,
+            AccountPeriodBalance.credit_total: AccountPeriodBalance.credit_total + credit,
+            AccountPeriodBalance.closing_balance: AccountPeriodBalance.closing_balance + delta
+        }, synchronize_session=False)
+        if not updated:
+            # 新期间的期初余额取该科目最近一个期间的期末余额
+            previous = db.session.query(AccountPeriodBalance.closing_balance).filter(
+                AccountPeriodBalance.account_code == code,
+                AccountPeriodBalance.period < period
+            ).order_by(AccountPeriodBalance.period.desc()).first()
+            opening = previous[0] if previous else ZERO
+            db.session.add(AccountPeriodBalance(
+                account_code=code,
+                period=period,
+                opening_balance=opening,
+                debit_total=debit,
+                credit_total=credit,
+                closing_balance=opening + delta
+            ))
+            db.session.flush()
+
+        # 补记以前期间的凭证时，后续期间的期初、期末余额一并调整
+        AccountPeriodBalance.query.filter(
+            AccountPeriodBalance.account_code == code,
+            AccountPeriodBalance.period > period
+        ).update({
+            AccountPeriodBalance.opening_balance: AccountPeriodBalance.opening_balance + delta,
+            AccountPeriodBalance.closing_balance: AccountPeriodBalance.closing_balance + delta
+        }, synchronize_session=False)
+
+
+# 批量过账
+
+# 每批IN条件中的凭证ID数，避免超出数据库的参数个数限制
+POSTING_CHUNK_SIZE = 500
+
+
+class PostingResult:
+    """
+    批量过账结果
+    voucher_ids: 已过账的凭证ID
+    account_count: 更新余额的科目数
+    movements: {(科目编码, 期间): (借方发生额, 贷方发生额)}
+    seconds: 用时（秒）
+    """
+
+    def __init__(self, voucher_ids, account_count, movements, seconds):
+        self.voucher_ids = voucher_ids
+        self.account_count = account_count
+        self.movements = movements
+        self.seconds = seconds
+
+    @property
+    def count(self):
+        return len(self.voucher_ids)
+
+    @property
+    def rate(self):
+        """每秒过账凭证数"""
+        return self.count / self.seconds if self.seconds > 0 else float(self.count)
+
+
+def _chunks(items, size=POSTING_CHUNK_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def post_vouchers(voucher_ids=None, start_date=None, end_date=None, tolerance=Decimal('0.01')):
+    """
+    批量过账审核通过的凭证（不提交事务，调用方统一提交或回滚）
+    先在内存中按科目汇总全部凭证的借贷发生额，批量修改凭证状态并生成现金流量分类记录，
+    再每个科目执行一次余额更新，最后更新科目期间余额；余额均在数据库端累加
+    :param voucher_ids: 凭证ID列表，只过账其中审核通过的凭证
+    :param start_date: 凭证日期起（含）
+    :param end_date: 凭证日期止（含）
+    :return: PostingResult
+    :raises ValueError: 未指定凭证范围、所选凭证借贷不平衡或过账期间凭证状态被修改
+    """
+    started = time.perf_counter()
+    if voucher_ids is None and start_date is None and end_date is None:
+        raise ValueError('请指定要过账的凭证或日期范围')
+
+    query = db.session.query(Voucher.id).filter(
+        Voucher.status == 'approved',
+        Voucher.is_deleted == False
+    )
+    if voucher_ids is not None:
+        query = query.filter(Voucher.id.in_(list(voucher_ids)))
+    if start_date is not None:
+        query = query.filter(Voucher.date >= start_date)
+    if end_date is not None:
+        query = query.filter(Voucher.date <= end_date)
+    ids = [voucher_id for voucher_id, in query.order_by(Voucher.id)]
+
+    year = extract('year', Voucher.date)
+    month = extract('month', Voucher.date)
+    total_debit = money_sum(VoucherEntry.debit)
+    total_credit = money_sum(VoucherEntry.credit)
+
+    movements = {}
+    unbalanced = []
+    days = set()
+    for chunk in _chunks(ids):
+        days.update(day for day, in db.session.query(Voucher.date).filter(Voucher.id.in_(chunk)).distinct())
+        unbalanced += [number for number, in db.session.query(Voucher.voucher_number).join(
+            VoucherEntry, VoucherEntry.voucher_id == Voucher.id
+        ).filter(Voucher.id.in_(chunk)).group_by(Voucher.id, Voucher.voucher_number).having(
+            func.abs(total_debit - total_credit) > to_cents(tolerance)
+        )]
+
+        rows = db.session.query(
+            VoucherEntry.account_code, year, month, total_debit, total_credit
+        ).join(Voucher, Voucher.id == VoucherEntry.voucher_id).filter(
+            Voucher.id.in_(chunk)
+        ).group_by(VoucherEntry.account_code, year, month)
+        for code, voucher_year, voucher_month, debit, credit in rows:
+            key = (code, f"{int(voucher_year):04d}{int(voucher_month):02d}")
+            old_debit, old_credit = movements.get(key, (ZERO, ZERO))
+            movements[key] = (old_debit + Decimal(debit), old_credit + Decimal(credit))
+    if unbalanced:
+        raise ValueError(f"凭证借贷不平衡：{'、'.join(unbalanced)}")
+
+    # 先修改凭证状态：同一凭证被并发过账时，后到的事务在这里等待并失败，不会重复累加余额
+    post_time = datetime.now()
+    for chunk in _chunks(ids):
+        updated = Voucher.query.filter(
+            Voucher.id.in_(chunk),
+            Voucher.status == 'approved'
+        ).update({Voucher.status: 'posted', Voucher.post_time: post_time}, synchronize_session=False)
+        if updated != len(chunk):
+            raise ValueError('过账期间凭证状态已被修改，请重试')
+        classify_vouchers(chunk)
+
+    # 每个科目一条余额增量（按科目编码顺序更新，多个进程并发过账时加锁顺序一致，避免死锁）
+    account_types = get_chart().types
+    deltas = {}
+    for (code, _), (debit, credit) in movements.items():
+        deltas[code] = deltas.get(code, ZERO) + signed_amount(account_types.get(code), debit, credit)
+
+    if deltas:
+        account_table = Account.__table__
+        db.session.execute(
+            account_table.update().where(
+                account_table.c.code == bindparam('account_code')
+            ).values(balance=account_table.c.balance + bindparam('delta')),
+            [{'account_code': code, 'delta': delta} for code, delta in sorted(deltas.items())]
+        )
+
+    if ids:
+        # 只有日期范围包含这些凭证日期的报表缓存失效
+        touch_ledger(db.session.connection(), days)
+        # 期间余额快照在升级时生成（flask db upgrade / ledger rebuild-periods），过账只累加增量
+        apply_period_movements(movements)
+
+    return PostingResult(ids, len(deltas), movements, time.perf_counter() - started)
+
+
+def balances_as_of(accounts, as_of):
+    """
+    计算科目在指定日期的余额：读取上月及以前最近一期快照的期末余额，
+    再加上本月1日至指定日期的已过账发生额
+    :param accounts: 科目对象列表（需要code和type属性）
+    :return: {科目编码: 余额}
+    """
+    if not has_period_balances():
+        return compute_balances(accounts, end_date=as_of)
+
+    period = period_of(as_of)
+    latest = db.session.query(
+        AccountPeriodBalance.account_code.label('account_code'),
+        func.max(AccountPeriodBalance.period).label('period')
+    ).filter(
+        AccountPeriodBalance.period < period
+    ).group_by(AccountPeriodBalance.account_code).subquery()
+
+    snapshot = dict(db.session.query(
+        AccountPeriodBalance.account_code,
+        AccountPeriodBalance.closing_balance
+    ).join(latest, and_(
+        AccountPeriodBalance.account_code == latest.c.account_code,
+        AccountPeriodBalance.period == latest.c.period
+    )))
+
+    totals = posted_entry_totals(start_date=date(as_of.year, as_of.month, 1), end_date=as_of)
+
+    balances = {}
+    for account in accounts:
+        debit, credit = totals.get(account.code, (ZERO, ZERO))
+        opening = Decimal(snapshot.get(account.code, ZERO))
+        balances[account.code] = opening + signed_amount(account.type, debit, credit)
+    return balances
+
+
+# 明细账排序键：凭证日期、凭证ID、分录ID
+LEDGER_ORDER = (Voucher.date, Voucher.id, VoucherEntry.id)
+
+def _ledger_query(codes, *columns):
+    """科目（可含下级科目）已过账分录的查询"""
+    return db.session.query(*columns).join(Voucher, Voucher.id == VoucherEntry.voucher_id).filter(
+        VoucherEntry.account_code.in_(list(codes)),
+        Voucher.status == 'posted',
+        Voucher.is_deleted == False
+    )
+
+
+def general_ledger_entries(account, start_date=None, end_date=None, batch_size=1000):
+    """
+    科目明细账：按凭证日期顺序逐行返回科目在期间内的已过账分录和逐笔余额
+    分录按batch_size分批从数据库读取（yield_per），内存占用与分录数无关
+    :param account: 科目对象（需要code和type属性）
+    :return: 生成器，首行为期初余额，末行为本期合计，
+             每行为 (日期, 凭证编号, 摘要, 分录说明, 借方, 贷方, 余额)
+    """
+    if start_date is not None:
+        balance = balances_as_of([account], start_date - timedelta(days=1))[account.code]
+    else:
+        balance = ZERO
+    yield (start_date, '', '期初余额', '', None, None, balance)
+
+    query = _ledger_query(
+        [account.code],
+        Voucher.date,
+        Voucher.voucher_number,
+        Voucher.summary,
+        VoucherEntry.description,
+        VoucherEntry.debit,
+        VoucherEntry.credit
+    )
+    if start_date is not None:
+        query = query.filter(Voucher.date >= start_date)
+    if end_date is not None:
+        query = query.filter(Voucher.date <= end_date)
+    query = query.order_by(*LEDGER_ORDER).yield_per(batch_size)
+
+    total_debit = total_credit = ZERO
+    for voucher_date, number, summary, description, debit, credit in query:
+        debit, credit = Decimal(debit or 0).quantize(ZERO), Decimal(credit or 0).quantize(ZERO)
+        total_debit += debit
+        total_credit += credit
+        balance += signed_amount(account.type, debit, credit)
+        yield (voucher_date, number, summary, description, debit, credit, balance)
+
+    yield (end_date, '', '本期合计', '', total_debit, total_credit, balance)
+
+
+# 明细账分页
+
+# 明细账的一行，balance为该笔分录后的余额
+LedgerLine = namedtuple('LedgerLine', 'date voucher_id entry_id voucher_number summary description '
+                                      'account_code debit credit balance')
+
+
+def ledger_accounts(account, include_children=False):
+    """明细账包含的科目：科目本身，include_children为True时加上全部下级科目"""
+    if include_children:
+        return get_chart().subtree(account.code) or [account]
+    return [account]
+
+
+def ledger_balance(accounts, as_of):
+    """科目（含所列下级科目）在指定日期的余额合计"""
+    return sum(balances_as_of(accounts, as_of).values(), ZERO)
+
+
+def balance_before(accounts, key):
+    """
+    排在明细账某一位置之前的全部已过账分录形成的余额：
+    前一日余额（期间余额快照加本月发生额）加上当日排在该位置之前的分录，
+    查询量只与当月分录数有关，与科目的历史分录总数无关
+    :param key: (凭证日期, 凭证ID, 分录ID)
+    """
+    day, voucher_id, entry_id = key
+    debit, credit = _ledger_query(
+        [account.code for account in accounts],
+        money_sum(VoucherEntry.debit),
+        money_sum(VoucherEntry.credit)
+    ).filter(
+        Voucher.date == day,
+        tuple_(Voucher.id, VoucherEntry.id) < tuple_(voucher_id, entry_id)
+    ).one()
+    return ledger_balance(accounts, day - timedelta(days=1)) + signed_amount(accounts[0].type, debit, credit)
+
+
+def ledger_page(account, start_date=None, end_date=None, after=None, before=None, per_page=None,
+                include_children=False):
+    """
+    明细账的一页：按凭证日期顺序的游标分页，翻到任意一页的开销与科目分录总数无关
+    本页第一笔分录之前的余额由balance_before计算，页内逐笔累加得到每行余额
+    :param after: 下一页游标（取排在该位置之后的分录）
+    :param before: 上一页游标（取排在该位置之前的分录）
+    :param per_page: 每页分录数，默认使用配置PER_PAGE
+    :return: KeysetPage，items为LedgerLine列表
+    :raises ValueError: 游标格式错误
+    """
+    per_page = per_page or current_app.config['PER_PAGE']
+    accounts = ledger_accounts(account, include_children)
+    key = tuple_(*LEDGER_ORDER)
+
+    query = _ledger_query(
+        [item.code for item in accounts],
+        Voucher.date,
+        Voucher.id,
+        VoucherEntry.id,
+        Voucher.voucher_number,
+        Voucher.summary,
+        VoucherEntry.description,
+        VoucherEntry.account_code,
+        VoucherEntry.debit,
+        VoucherEntry.credit
+    )
+    if start_date is not None:
+        query = query.filter(Voucher.date >= start_date)
+    if end_date is not None:
+        query = query.filter(Voucher.date <= end_date)
+
+    if before:
+        values = decode_cursor(before, LEDGER_ORDER)
+        rows = query.filter(key < tuple_(*values)).order_by(
+            *[column.desc() for column in LEDGER_ORDER]
+        ).limit(per_page + 1).all()
+        has_prev = len(rows) > per_page
+        rows = list(reversed(rows[:per_page]))
+        has_next = True
+    else:
+        if after:
+            values = decode_cursor(after, LEDGER_ORDER)
+            query = query.filter(key > tuple_(*values))
+        rows = query.order_by(*LEDGER_ORDER).limit(per_page + 1).all()
+        has_prev, has_next = bool(after), len(rows) > per_page
+        rows = rows[:per_page]
+
+    items = []
+    if rows:
+        balance = balance_before(accounts, rows[0][:3])
+        for row in rows:
+            debit, credit = Decimal(row[-2] or 0).quantize(ZERO), Decimal(row[-1] or 0).quantize(ZERO)
+            balance += signed_amount(account.type, debit, credit)
+            items.append(LedgerLine(*row[:-2], debit, credit, balance))
+
+    return KeysetPage(
+        items,
+        next_cursor=encode_cursor(items[-1][:3]) if items and has_next else None,
+        prev_cursor=encode_cursor(items[0][:3]) if items and has_prev else None
+    )
+
+
+# 科目余额重建
+
+def balance_drift(code_from=None, code_to=None):
+    """
+    科目表中存储的余额与初始余额加已过账凭证汇总的余额不一致的科目
+    :return: [(科目编码, 科目名称, 存储余额, 汇总余额)]
+    """
+    query = _code_range_filter(
+        db.session.query(Account.code, Account.name, Account.type, Account.balance, Account.opening_balance),
+        Account.code, code_from, code_to
+    )
+    accounts = query.order_by(Account.code).all()
+    account_codes = [code for code, _, _, _, _ in accounts] if (code_from or code_to) else None
+    totals = posted_entry_totals(account_codes=account_codes)
+
+    drift = []
+    for code, name, account_type, stored, opening in accounts:
+        debit, credit = totals.get(code, (ZERO, ZERO))
+        computed = Decimal(opening or 0).quantize(ZERO) + signed_amount(account_type, debit, credit)
+        stored = Decimal(stored or 0).quantize(ZERO)
+        if stored != computed:
+            drift.append((code, name, stored, computed))
+    return drift
+
+
+def rebuild_account_balances(code_from=None, code_to=None):
+    """
+    按初始余额和已过账凭证重算科目余额（不提交事务）
+    一条分组查询汇总全部分录，只更新余额不一致的科目
+    :return: 被修正的科目，格式同balance_drift
+    """
+    drift = balance_drift(code_from, code_to)
+    if drift:
+        account_table = Account.__table__
+        db.session.execute(
+            account_table.update().where(
+                account_table.c.code == bindparam('account_code')
+            ).values(balance=bindparam('computed')),
+            [{'account_code': code, 'computed': computed} for code, _, _, computed in drift]
+        )
+    return drift
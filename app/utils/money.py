@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+金额处理模块
+表单输入在进入系统时解析为Decimal并按“分”四舍五入，之后的累加、比较都使用Decimal，不再经过float；
+SQL汇总金额时先把每条金额换算为整数分再求和（money_sum），
+SQLite把DECIMAL列存为浮点数，直接SUM在百万级分录上会累积误差，按整数分求和结果是精确的
+"""
+
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from sqlalchemy import BigInteger, cast, func, type_coerce
+from sqlalchemy.types import TypeDecorator
+
+CENT = Decimal('0.01')
+
+ZERO = Decimal('0.00')
+
+# 统一的舍入规则：四舍五入到分
+ROUNDING = ROUND_HALF_UP
+
+
+def to_money(value, places=CENT):
+    """
+    转换为Decimal并四舍五入（默认到分）
+    float先转为字符串再转换，避免二进制误差进入Decimal
+    """
+    if value is None:
+        return ZERO
+    if isinstance(value, float):
+        value = repr(value)
+    return Decimal(value).quantize(places, rounding=ROUNDING)
+
+
+def parse_decimal(text, field='金额', places=CENT, allow_negative=False):
+    """
+    解析表单输入的数值（可带千分位逗号），空值为0
+    :param field: 字段名称，用于错误提示
+    :param places: 保留的精度，如Decimal('0.01')
+    :raises ValueError: 格式不正确、不是有限数值或不允许的负数
+    """
+    if text is None:
+        return to_money(0, places)
+    text = str(text).strip().replace(',', '')
+    if not text:
+        return to_money(0, places)
+    try:
+        value = Decimal(text)
+    except InvalidOperation:
+        raise ValueError(f'{field}格式不正确：{text}')
+    if not value.is_finite():
+        raise ValueError(f'{field}格式不正确：{text}')
+    if value < 0 and not allow_negative:
+        raise ValueError(f'{field}不能为负数')
+    return value.quantize(places, rounding=ROUNDING)
+
+
+def parse_money(text, field='金额', allow_negative=False):
+    """解析表单输入的金额，四舍五入到分"""
+    return parse_decimal(text, field, CENT, allow_negative)
+
+
+def multiply(amount, factor):
+    """金额乘以数量或税率，结果四舍五入到分（每一行单独舍入，合计等于各行之和）"""
+    return to_money(Decimal(amount) * Decimal(factor))
+
+
+def to_cents(value):
+    """金额换算为整数分"""
+    return int(to_money(value) * 100)
+
+
+def from_cents(cents):
+    """整数分换算为金额"""
+    if cents is None:
+        return ZERO
+    return (Decimal(cents) / 100).quantize(CENT, rounding=ROUNDING)
+
+
+class Cents(TypeDecorator):
+    """
+    以整数分存储、以Decimal金额读写的类型
+    用作money_sum的结果类型；新增的金额列也可以声明为 db.Column(Cents) 以整数存储
+    """
+    impl = BigInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else to_cents(value)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else from_cents(value)
+
+
+def money_sum(column):
+    """
+    金额列的精确合计（SQL表达式）：SUM(CAST(ROUND(金额 * 100) AS BIGINT))，没有记录时为0
+    查询结果直接是Decimal金额
+    """
+    cents = cast(func.round(column * 100), BigInteger)
+    return type_coerce(func.coalesce(func.sum(cents), 0), Cents())
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+列表分页模块
+基于排序键的游标分页（keyset pagination），翻页开销与数据总量无关
+"""
+
+import base64
+import json
+from datetime import date, datetime
+
+from flask import current_app, request
+from sqlalchemy import tuple_
+from sqlalchemy.types import Date, DateTime, Integer
+
+
+class KeysetPage:
+    """
+    一页列表数据
+    items: 当前页记录
+    next_cursor / prev_cursor: 下一页、上一页游标，没有时为None
+    """
+
+    def __init__(self, items, next_cursor=None, prev_cursor=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self):
+        return self.prev_cursor is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def encode_cursor(values):
+    """
+    将排序键的值编码为URL安全的游标
+    """
+    data = [value.isoformat() if isinstance(value, (date, datetime)) else value for value in values]
+    raw = json.dumps(data, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token, columns):
+    """
+    解析游标，按排序列的类型还原取值
+    :raises ValueError: 游标格式错误
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except Exception:
+        raise ValueError('无效的分页游标')
+    if not isinstance(data, list) or len(data) != len(columns):
+        raise ValueError('无效的分页游标')
+
+    values = []
+    for column, value in zip(columns, data):
+        column_type = column.type
+        if value is None:
+            values.append(None)
+        elif isinstance(column_type, DateTime):
+            values.append(datetime.fromisoformat(value))
+        elif isinstance(column_type, Date):
+            values.append(date.fromisoformat(value[:10]))
+        elif isinstance(column_type, Integer):
+            values.append(int(value))
+        else:
+            values.append(value)
+    return values
+
+
+def keyset_paginate(query, columns, after=None, before=None, per_page=None):
+    """
+    按排序列倒序分页
+    :param query: 已加好筛选条件的查询
+    :param columns: 排序列，最后一列必须唯一（通常为id），如 (Voucher.date, Voucher.id)
+    :param after: 下一页游标（取排在该位置之后的记录）
+    :param before: 上一页游标（取排在该位置之前的记录）
+    :param per_page: 每页记录数，默认使用配置PER_PAGE
+    :return: KeysetPage
+    """
+    per_page = per_page or current_app.config['PER_PAGE']
+    key = tuple_(*columns)
+
+    if before:
+        values = decode_cursor(before, columns)
+        rows = query.filter(key > tuple_(*values)).order_by(
+            *[column.asc() for column in columns]
+        ).limit(per_page + 1).all()
+        has_more = len(rows) > per_page
+        items = list(reversed(rows[:per_page]))
+        has_prev, has_next = has_more, True
+    else:
+        if after:
+            values = decode_cursor(after, columns)
+            query = query.filter(key < tuple_(*values))
+        rows = query.order_by(
+            *[column.desc() for column in columns]
+        ).limit(per_page + 1).all()
+        items = rows[:per_page]
+        has_prev, has_next = bool(after), len(rows) > per_page
+
+    def cursor_of(item):
+        return encode_cursor([getattr(item, column.key) for column in columns])
+
+    return KeysetPage(
+        items,
+        next_cursor=cursor_of(items[-1]) if items and has_next else None,
+        prev_cursor=cursor_of(items[0]) if items and has_prev else None
+    )
+
+
+def list_filters():
+    """
+    读取列表页的筛选参数：status、start_date、end_date
+    :return: {'status': str或None, 'start_date': date或None, 'end_date': date或None}
+    """
+    filters = {'status': request.args.get('status') or None, 'start_date': None, 'end_date': None}
+    for name in ('start_date', 'end_date'):
+        value = request.args.get(name)
+        if value:
+            try:
+                filters[name] = datetime.strptime(value, '%Y-%m-%d').date()
+            except ValueError:
+                pass
+    return filters
+
+
+def apply_list_filters(query, filters, status_column=None, date_column=None):
+    """
+    为列表查询加上状态和日期范围筛选
+    日期范围按日期列筛选，日期时间列的结束日期包含当天全天
+    """
+    if status_column is not None and filters['status']:
+        query = query.filter(status_column == filters['status'])
+    if date_column is not None:
+        is_datetime = isinstance(date_column.type, DateTime)
+        if filters['start_date']:
+            start = filters['start_date']
+            if is_datetime:
+                start = datetime.combine(start, datetime.min.time())
+            query = query.filter(date_column >= start)
+        if filters['end_date']:
+            end = filters['end_date']
+            if is_datetime:
+                end = datetime.combine(end, datetime.max.time())
+            query = query.filter(date_column <= end)
+    return query
+
+
+def paginate_list(query, columns, status_column=None, date_column=None):
+    """
+    列表视图的通用分页：读取筛选参数和游标，返回 (page, filters)
+    游标无效时从第一页开始
+    """
+    filters = list_filters()
+    query = apply_list_filters(query, filters, status_column, date_column)
+    try:
+        page = keyset_paginate(query, columns,
+                               after=request.args.get('after'),
+                               before=request.args.get('before'))
+    except ValueError:
+        page = keyset_paginate(query, columns)
+    return page, filters
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+性能分析模块
+按请求统计执行的SQL语句数及耗时、模板渲染耗时和请求总耗时，用于发现N+1查询和慢页面；
+测试中可为页面设定查询预算。请求结果可显示在页面底部的调试面板中，
+慢请求写入JSON Lines格式的日志文件，各路由的耗时分位数通过 /admin/metrics 查看
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+from flask import current_app, g, request, session
+from jinja2 import Template
+from markupsafe import escape
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_local = threading.local()
+
+# 多个线程追加写入慢请求日志时加锁，保证每行完整
+_slow_log_lock = threading.Lock()
+
+
+class QueryBudgetExceeded(AssertionError):
+    """代码块执行的SQL语句数超出预算"""
+
+
+class QueryRecord:
+    """一条SQL语句及其耗时（秒，执行完成后填入）"""
+    __slots__ = ('statement', 'duration')
+
+    def __init__(self, statement):
+        self.statement = statement
+        self.duration = 0.0
+
+
+class QueryCounter:
+    """
+    SQL语句计数器
+    queries: 计数期间执行的SQL语句记录
+    """
+
+    def __init__(self):
+        self.queries = []
+
+    @property
+    def statements(self):
+        return [query.statement for query in self.queries]
+
+    @property
+    def count(self):
+        return len(self.queries)
+
+    @property
+    def sql_time(self):
+        """SQL执行总耗时（秒）"""
+        return sum(query.duration for query in self.queries)
+
+    def slowest(self, limit=5):
+        """耗时最长的若干条语句"""
+        return sorted(self.queries, key=lambda query: query.duration, reverse=True)[:limit]
+
+
+class RequestProfile(QueryCounter):
+    """
+    单个请求的性能记录：SQL语句、模板渲染耗时、请求总耗时
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.started = time.perf_counter()
+        self.render_time = 0.0
+        self.total_time = None
+
+    def finish(self):
+        self.total_time = time.perf_counter() - self.started
+        return self.total_time
+
+    def as_dict(self, slowest=5):
+        return {
+            'query_count': self.count,
+            'sql_ms': round(self.sql_time * 1000, 2),
+            'render_ms': round(self.render_time * 1000, 2),
+            'total_ms': round((self.total_time or 0.0) * 1000, 2),
+            'slowest_queries': [{'ms': round(query.duration * 1000, 2), 'statement': query.statement}
+                                for query in self.slowest(slowest)],
+        }
+
+
+def _active_counters():
+    """当前线程正在计数的计数器"""
+    counters = getattr(_local, 'counters', None)
+    if counters is None:
+        counters = _local.counters = []
+    return counters
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _start_statement(conn, cursor, statement, parameters, context, executemany):
+    counters = _active_counters()
+    if not counters:
+        return
+    record = QueryRecord(statement)
+    for counter in counters:
+        counter.queries.append(record)
+    conn.info.setdefault('profiler_records', []).append((record, time.perf_counter()))
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _finish_statement(conn, cursor, statement, parameters, context, executemany):
+    records = conn.info.get('profiler_records')
+    if records:
+        record, started = records.pop()
+        record.duration = time.perf_counter() - started
+
+
+@contextmanager
+def count_queries():
+    """
+    统计代码块内执行的SQL语句
+    用法：with count_queries() as counter: ...; counter.count
+    """
+    counter = QueryCounter()
+    counters = _active_counters()
+    counters.append(counter)
+    try:
+        yield counter
+    finally:
+        counters.remove(counter)
+
+
+@contextmanager
+def query_budget(limit):
+    """
+    断言代码块内执行的SQL语句不超过limit条
+    :raises QueryBudgetExceeded: 超出预算，异常信息列出全部语句
+    """
+    with count_queries() as counter:
+        yield counter
+    if counter.count > limit:
+        statements = '\n'.join(counter.statements)
+        raise QueryBudgetExceeded(f'执行了{counter.count}条SQL，超出预算{limit}条：\n{statements}')
+
+
+class TimedTemplate(Template):
+    """渲染时将耗时计入当前请求的性能记录"""
+
+    def render(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return super().render(*args, **kwargs)
+        finally:
+            profile = g.get('query_counter') if g else None
+            if profile is not None:
+                profile.render_time += time.perf_counter() - started
+
+
+class RouteMetrics:
+    """
+    各路由最近若干次请求的耗时，用于计算分位数
+    每个路由只保留最近window次，内存占用固定
+    """
+
+    def __init__(self, window=1000):
+        self.window = window
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def record(self, route, seconds):
+        with self._lock:
+            samples = self._samples.get(route)
+            if samples is None:
+                samples = self._samples[route] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    @staticmethod
+    def _percentile(ordered, percent):
+        """最近秩法计算分位数"""
+        return ordered[max(0, math.ceil(len(ordered) * percent / 100) - 1)]
+
+    def summary(self):
+        """
+        :return: {路由: {'count', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms'}}，按p95降序
+        """
+        with self._lock:
+            snapshot = {route: sorted(samples) for route, samples in self._samples.items()}
+        result = {}
+        for route, ordered in snapshot.items():
+            result[route] = {
+                'count': len(ordered),
+                'p50_ms': round(self._percentile(ordered, 50) * 1000, 2),
+                'p95_ms': round(self._percentile(ordered, 95) * 1000, 2),
+                'p99_ms': round(self._percentile(ordered, 99) * 1000, 2),
+                'max_ms': round(ordered[-1] * 1000, 2),
+            }
+        return dict(sorted(result.items(), key=lambda item: item[1]['p95_ms'], reverse=True))
+
+    def clear(self):
+        with self._lock:
+            self._samples.clear()
+
+
+def get_metrics():
+    """当前应用的路由耗时统计"""
+    return current_app.extensions['route_metrics']
+
+
+def _route_name():
+    rule = request.url_rule.rule if request.url_rule is not None else '<unmatched>'
+    return f'{request.method} {rule}'
+
+
+def _panel_html(profile):
+    """页面底部的性能面板"""
+    rows = ''.join(
+        f'<tr><td style="padding:2px 8px;text-align:right;">{query.duration * 1000:.2f}ms</td>'
+        f'<td style="padding:2px 8px;font-family:monospace;">{escape(query.statement)}</td></tr>'
+        for query in profile.slowest()
+    )
+    return (
+        '<div id="profiler-panel" style="position:fixed;bottom:0;left:0;right:0;max-height:40%;overflow:auto;'
+        'z-index:9999;background:#222;color:#eee;font-size:12px;padding:6px 12px;">'
+        f'<strong>{escape(_route_name())}</strong> 总耗时 {profile.total_time * 1000:.1f}ms ｜ '
+        f'SQL {profile.count} 条 {profile.sql_time * 1000:.1f}ms ｜ 模板渲染 {profile.render_time * 1000:.1f}ms'
+        f'<table>{rows}</table></div>'
+    )
+
+
+def _write_slow_request(path, record):
+    """追加一行慢请求记录，目录不存在时自动创建"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    line = json.dumps(record, ensure_ascii=False) + '\n'
+    with _slow_log_lock, open(path, 'a', encoding='utf-8') as log_file:
+        log_file.write(line)
+
+
+def init_profiler(app):
+    """
+    为每个请求记录性能数据，记录在g.query_counter
+    - 调试和测试模式下通过响应头X-Query-Count返回SQL语句数
+    - 超出配置QUERY_BUDGET时记录警告日志
+    - 总耗时超过SLOW_REQUEST_THRESHOLD秒的请求写入SLOW_REQUEST_LOG
+    - PROFILER_PANEL开启时在HTML页面底部显示性能面板
+    - 各路由耗时记入app.extensions['route_metrics']
+    """
+    app.jinja_env.template_class = TimedTemplate
+    app.extensions['route_metrics'] = RouteMetrics(app.config.get('METRICS_WINDOW', 1000))
+
+    @app.before_request
+    def start_profile():
+        g.query_counter = RequestProfile()
+        _active_counters().append(g.query_counter)
+
+    @app.after_request
+    def report_profile(response):
+        profile = g.get('query_counter')
+        if profile is None:
+            return response
+        total_time = profile.finish()
+        app.extensions['route_metrics'].record(_route_name(), total_time)
+
+        if app.debug or app.testing:
+            response.headers['X-Query-Count'] = str(profile.count)
+        budget = app.config.get('QUERY_BUDGET')
+        if budget and profile.count > budget:
+            app.logger.warning('请求 %s 执行了%d条SQL，超出预算%d条',
+                               request.path, profile.count, budget)
+
+        threshold = app.config.get('SLOW_REQUEST_THRESHOLD')
+        log_path = app.config.get('SLOW_REQUEST_LOG')
+        if log_path and threshold is not None and total_time >= threshold:
+            record = {
+                'time': datetime.now().isoformat(timespec='seconds'),
+                'method': request.method,
+                'path': request.path,
+                'route': _route_name(),
+                'status': response.status_code,
+                'user_id': session.get('user_id'),
+            }
+            record.update(profile.as_dict())
+            _write_slow_request(log_path, record)
+
+        if (app.config.get('PROFILER_PANEL') and response.mimetype == 'text/html'
+                and not response.is_streamed and not response.direct_passthrough):
+            body = response.get_data(as_text=True)
+            position = body.rfind('</body>')
+            if position != -1:
+                response.set_data(body[:position] + _panel_html(profile) + body[position:])
+        return response
+
+    @app.teardown_request
+    def stop_profile(exc=None):
+        profile = g.pop('query_counter', None)
+        if profile is not None and profile in _active_counters():
+            _active_counters().remove(profile)
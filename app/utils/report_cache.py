@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+报表结果缓存模块
+报表数据按（报表名称、规范化的参数、科目表版本、报表日期范围内的总账版本）缓存在进程内的LRU缓存中。
+总账版本按凭证日期记录：凭证过账（或已过账凭证被修改）时，在同一事务中把全局变更序号写入凭证日期对应的版本行，
+报表的总账版本为其日期范围内各日版本的最大值（一次查询）。过账日期为D的凭证只改变范围包含D的报表的缓存键，
+已结账期间的报表一直从缓存读取；旧键不再被访问，按LRU淘汰
+"""
+
+import functools
+import inspect as pyinspect
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import event, func, inspect, or_, select
+
+from app.models import db, LedgerVersion, Voucher, VoucherEntry
+from app.utils.chart import bump_version, get_chart
+from app.utils.report_jobs import dumps
+
+# 总账变更序号，每次变更递增
+LEDGER_VERSION = 'ledger'
+
+# 影响全部日期的变更（重建期间余额、现金流量分类等）
+LEDGER_ALL = 'ledger:all'
+
+# 每条语句更新的日期版本行数
+TOUCH_CHUNK_SIZE = 500
+
+
+def _day_name(day):
+    if isinstance(day, datetime):
+        day = day.date()
+    return f'ledger:{day.isoformat()}'
+
+
+def touch_ledger(connection, days=None):
+    """
+    在当前事务中记录总账变更（不提交事务）
+    :param days: 变更的凭证日期，为None表示影响全部日期
+    """
+    bump_version(connection, LEDGER_VERSION)
+    table = LedgerVersion.__table__
+    sequence = connection.execute(select(table.c.version).where(table.c.name == LEDGER_VERSION)).scalar()
+    if days is None or None in days:
+        names = [LEDGER_ALL]
+    else:
+        names = sorted({_day_name(day) for day in days})
+
+    for start in range(0, len(names), TOUCH_CHUNK_SIZE):
+        chunk = names[start:start + TOUCH_CHUNK_SIZE]
+        existing = set(connection.execute(select(table.c.name).where(table.c.name.in_(chunk))).scalars())
+        if existing:
+            connection.execute(table.update().where(table.c.name.in_(existing)).values(version=sequence))
+        missing = [name for name in chunk if name not in existing]
+        if missing:
+            connection.execute(table.insert(), [{'name': name, 'version': sequence} for name in missing])
+
+
+def ledger_version(start_date=None, end_date=None):
+    """
+    凭证日期范围内（含两端，为空表示不限）总账数据的版本：范围内最近一次变更的序号，没有变更时为0
+    """
+    low = _day_name(start_date) if start_date else 'ledger:'
+    high = _day_name(end_date) if end_date else 'ledger:9999-12-31'
+    return db.session.query(func.max(LedgerVersion.version)).filter(or_(
+        LedgerVersion.name == LEDGER_ALL,
+        LedgerVersion.name.between(low, high)
+    )).scalar() or 0
+
+
+class ReportCache:
+    """
+    进程内的LRU报表缓存，保存在app.extensions['report_cache']
+    按条数和估算的字节数（报表数据JSON编码后的长度）限制大小，超出时淘汰最久未使用的报表；
+    缓存的报表数据由多个请求共享，调用方不得修改
+    """
+
+    def __init__(self, max_entries=128, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self):
+        return bool(self.max_entries and self.max_bytes)
+
+    def get(self, key):
+        """读取报表数据，未缓存时返回None"""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def set(self, key, value, size):
+        """缓存报表数据，单个报表超过字节数上限时不缓存"""
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            self._data[key] = (value, size)
+            self.bytes += size
+            while len(self._data) > self.max_entries or self.bytes > self.max_bytes:
+                _, (_, evicted_size) = self._data.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+
+    def stats(self):
+        """命中、未命中、淘汰次数和当前占用"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._data),
+                'bytes': self.bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+                'evictions': self.evictions,
+            }
+
+
+def get_report_cache():
+    """当前应用的报表缓存"""
+    return current_app.extensions['report_cache']
+
+
+def init_report_cache(app):
+    """REPORT_CACHE_SIZE、REPORT_CACHE_MAX_BYTES为0时不缓存"""
+    app.extensions['report_cache'] = ReportCache(
+        max_entries=app.config.get('REPORT_CACHE_SIZE', 128),
+        max_bytes=app.config.get('REPORT_CACHE_MAX_BYTES', 64 * 1024 * 1024),
+    )
+
+
+def cached_report(name, date_range):
+    """
+    缓存报表函数的结果
+    :param name: 报表名称
+    :param date_range: 按报表参数（关键字参数）返回报表数据依赖的凭证日期范围 (起, 止)，为None表示不限
+    """
+    def decorator(builder):
+        signature = pyinspect.signature(builder)
+
+        @functools.wraps(builder)
+        def wrapper(*args, **kwargs):
+            cache = current_app.extensions.get('report_cache')
+            if cache is None or not cache.enabled:
+                return builder(*args, **kwargs)
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            params = bound.arguments
+            # 先读取版本再生成报表：生成期间有新的过账时，结果只会比键对应的版本更新
+            key = (name, tuple(sorted(params.items())), get_chart().version, ledger_version(*date_range(**params)))
+            value = cache.get(key)
+            if value is None:
+                value = builder(*args, **kwargs)
+                cache.set(key, value, len(dumps(value)))
+            return value
+
+        wrapper.uncached = builder
+        return wrapper
+    return decorator
+
+
+def _changed_ledger_days(session):
+    """本次flush中已过账凭证（或其分录）变化涉及的凭证日期"""
+    days = set()
+    with session.no_autoflush:
+        for obj in session.new:
+            if isinstance(obj, Voucher) and obj.status == 'posted':
+                days.add(obj.date)
+            elif isinstance(obj, VoucherEntry) and obj.voucher is not None and obj.voucher.status == 'posted':
+                days.add(obj.voucher.date)
+        for obj in list(session.dirty) + list(session.deleted):
+            if isinstance(obj, Voucher):
+                state = inspect(obj)
+                statuses = set(state.attrs.status.history.sum()) or {obj.status}
+                if 'posted' in statuses:
+                    days.update(state.attrs.date.history.sum() or [obj.date])
+            elif isinstance(obj, VoucherEntry) and obj.voucher is not None and obj.voucher.status == 'posted':
+                days.add(obj.voucher.date)
+    return days
+
+
+@event.listens_for(db.session, 'before_flush')
+def _touch_changed_ledger(session, flush_context, instances):
+    """通过ORM新增、修改、删除已过账凭证时记录总账变更（过账使用 post_vouchers 时由其记录）"""
+    days = _changed_ledger_days(session)
+    if days:
+        touch_ledger(session.connection(), days)
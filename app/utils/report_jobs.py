@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+报表后台任务模块
+请求只保存报表任务（报表名称和参数）并返回任务ID，由有界线程池在后台生成报表，
+报表数据以JSON保存在报表任务表中，页面轮询任务状态，完成后按保存的数据渲染报表。
+任务超过REPORT_JOB_TIMEOUT仍未完成时中断正在执行的查询（SQLite）并不再执行后续查询，标记为超时；
+用户取消任务的处理方式相同。线程池和排队数按工作进程计算，任务状态保存在数据库中，多个工作进程共享
+"""
+
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.models import db, ReportJob
+
+# 已结束的任务状态
+FINISHED_STATUSES = ('done', 'failed', 'cancelled', 'timeout')
+
+JOB_STATUS_LABELS = {
+    'queued': '排队中',
+    'running': '生成中',
+    'done': '已完成',
+    'failed': '失败',
+    'cancelled': '已取消',
+    'timeout': '超时',
+}
+
+# 报表名称 -> 生成报表数据的函数，由 report_job 装饰器注册
+REPORT_BUILDERS = {}
+
+
+def report_job(name):
+    """注册可在后台生成的报表，函数按关键字参数接收报表参数，返回报表数据（字典）"""
+    def decorator(builder):
+        REPORT_BUILDERS[name] = builder
+        return builder
+    return decorator
+
+
+# 报表数据的JSON编码：Decimal、日期保持类型，具名元组转为字典（模板中按属性访问不变）
+
+def _encode(value):
+    if isinstance(value, Decimal):
+        return {'$decimal': str(value)}
+    if isinstance(value, datetime):
+        return {'$datetime': value.isoformat()}
+    if isinstance(value, date):
+        return {'$date': value.isoformat()}
+    if hasattr(value, '_asdict'):
+        return {key: _encode(item) for key, item in value._asdict().items()}
+    if isinstance(value, dict):
+        return {str(key): _encode(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_encode(item) for item in value]
+    return value
+
+
+def _decode(obj):
+    if len(obj) == 1:
+        if '$decimal' in obj:
+            return Decimal(obj['$decimal'])
+        if '$datetime' in obj:
+            return datetime.fromisoformat(obj['$datetime'])
+        if '$date' in obj:
+            return date.fromisoformat(obj['$date'])
+    return obj
+
+
+def dumps(value):
+    return json.dumps(_encode(value), ensure_ascii=False, separators=(',', ':'))
+
+
+def loads(text):
+    return json.loads(text, object_hook=_decode) if text else None
+
+
+class JobStopped(Exception):
+    """任务已被取消或超时，不再执行后续查询"""
+
+
+class JobControl:
+    """正在执行的任务：停止原因和执行查询的数据库连接（用于中断）"""
+
+    def __init__(self):
+        self.reason = None
+        self.connection = None
+        self._lock = threading.Lock()
+
+    def attach(self, connection):
+        with self._lock:
+            self.connection = connection
+
+    def stop(self, reason):
+        with self._lock:
+            if self.reason is None:
+                self.reason = reason
+            connection = self.connection
+        # SQLite可从其他线程中断正在执行的语句，其他数据库在下一条语句前停止
+        interrupt = getattr(connection, 'interrupt', None)
+        if interrupt is not None:
+            interrupt()
+
+
+# 当前线程正在执行的任务
+_local = threading.local()
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _stop_cancelled_job(conn, cursor, statement, parameters, context, executemany):
+    control = getattr(_local, 'control', None)
+    if control is not None and control.reason:
+        raise JobStopped(control.reason)
+
+
+class ReportJobQueue:
+    """
+    每个工作进程一个任务队列，保存在app.extensions['report_jobs']
+    workers为0时在提交任务的请求中直接生成（仍保存任务和结果）
+    """
+
+    def __init__(self, app, workers, queue_size, timeout, retention=None):
+        self.app = app
+        self.workers = workers
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.retention = retention
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='report-job') if workers else None
+        self._lock = threading.Lock()
+        self._waiting = 0
+        self._controls = {}
+
+    def submit(self, report, params, user_id=None):
+        """
+        提交报表任务（提交事务）
+        :param params: 报表参数，传给报表函数的关键字参数
+        :return: ReportJob
+        :raises ValueError: 报表不存在或排队的任务已满
+        """
+        if report not in REPORT_BUILDERS:
+            raise ValueError(f'报表 {report} 不支持后台生成')
+        with self._lock:
+            if self._executor is not None and self._waiting >= self.queue_size:
+                raise ValueError('报表任务排队已满，请稍后再试')
+            self._waiting += 1
+
+        try:
+            self._purge()
+            job = ReportJob(report=report, params=dumps(params), status='queued', user_id=user_id)
+            db.session.add(job)
+            db.session.commit()
+        except Exception:
+            with self._lock:
+                self._waiting -= 1
+            raise
+
+        control = JobControl()
+        with self._lock:
+            self._controls[job.id] = control
+        if self._executor is None:
+            self._execute(job.id, control)
+        else:
+            self._executor.submit(self._run, job.id, control)
+        return job
+
+    def cancel(self, job):
+        """
+        取消排队中或生成中的任务（提交事务）
+        任务在其他工作进程中生成时，该进程生成完成后丢弃结果
+        :return: 是否取消
+        """
+        if job.status in FINISHED_STATUSES:
+            return False
+        with self._lock:
+            control = self._controls.get(job.id)
+        if control is not None:
+            control.stop('cancelled')
+        job.status = 'cancelled'
+        job.finish_time = job.finish_time or datetime.now()
+        job.error = '用户取消'
+        db.session.commit()
+        return True
+
+    def shutdown(self, wait=True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+
+    def _purge(self):
+        """删除保留期以前已结束的任务"""
+        if not self.retention:
+            return
+        ReportJob.query.filter(
+            ReportJob.status.in_(FINISHED_STATUSES),
+            ReportJob.create_time < datetime.now() - timedelta(seconds=self.retention)
+        ).delete(synchronize_session=False)
+
+    def _run(self, job_id, control):
+        with self.app.app_context():
+            try:
+                self._execute(job_id, control)
+            except Exception:
+                db.session.rollback()
+                self.app.logger.exception('报表任务 %s 执行失败', job_id)
+            finally:
+                db.session.remove()
+
+    def _execute(self, job_id, control):
+        with self._lock:
+            self._waiting -= 1
+        try:
+            job = db.session.get(ReportJob, job_id)
+            if job is None or job.status != 'queued' or control.reason:
+                return
+            job.status = 'running'
+            job.start_time = datetime.now()
+            db.session.commit()
+            params = loads(job.params)
+
+            timer = threading.Timer(self.timeout, control.stop, ('timeout',)) if self.timeout else None
+            started = time.perf_counter()
+            result = error = None
+            _local.control = control
+            try:
+                control.attach(db.session.connection().connection.dbapi_connection)
+                if timer is not None:
+                    timer.start()
+                result = dumps(REPORT_BUILDERS[job.report](**params))
+            except Exception as e:
+                db.session.rollback()
+                error = str(e)[:500]
+                if not control.reason:
+                    self.app.logger.exception('报表任务 %s 生成失败', job_id)
+            finally:
+                _local.control = None
+                if timer is not None:
+                    timer.cancel()
+                control.attach(None)
+
+            # 生成期间被其他请求（或其他工作进程）取消时保留取消状态
+            job = db.session.get(ReportJob, job_id)
+            db.session.refresh(job)
+            if job.status == 'running':
+                if error is None:
+                    job.status, job.result = 'done', result
+                elif control.reason == 'timeout':
+                    job.status, job.error = 'timeout', f'超过{self.timeout}秒未完成'
+                elif control.reason == 'cancelled':
+                    job.status, job.error = 'cancelled', '用户取消'
+                else:
+                    job.status, job.error = 'failed', error
+                job.finish_time = datetime.now()
+                job.duration_ms = round((time.perf_counter() - started) * 1000, 2)
+            db.session.commit()
+        finally:
+            with self._lock:
+                self._controls.pop(job_id, None)
+
+
+def get_job_queue():
+    """当前应用的报表任务队列"""
+    return current_app.extensions['report_jobs']
+
+
+def submit_report_job(report, params, user_id=None):
+    return get_job_queue().submit(report, params, user_id=user_id)
+
+
+def job_result(job):
+    """已完成任务的报表数据"""
+    return loads(job.result) if job.status == 'done' else None
+
+
+def expire_stale_job(job, timeout):
+    """
+    执行任务的工作进程已退出时，任务不会再结束：
+    超过两倍超时时间仍未结束的任务标记为超时（不提交事务）
+    """
+    if job.status in FINISHED_STATUSES or not timeout:
+        return False
+    if datetime.now() - (job.start_time or job.create_time) < timedelta(seconds=2 * timeout):
+        return False
+    job.status = 'timeout'
+    job.finish_time = datetime.now()
+    job.error = '处理任务的工作进程已退出'
+    return True
+
+
+def job_as_dict(job):
+    return {
+        'id': job.id,
+        'report': job.report,
+        'status': job.status,
+        'status_label': JOB_STATUS_LABELS.get(job.status, job.status),
+        'finished': job.status in FINISHED_STATUSES,
+        'create_time': job.create_time.isoformat(timespec='seconds'),
+        'duration_ms': job.duration_ms,
+        'error': job.error,
+    }
+
+
+def init_report_jobs(app):
+    """创建报表任务队列，线程在提交第一个任务时才启动"""
+    app.extensions['report_jobs'] = ReportJobQueue(
+        app,
+        workers=app.config.get('REPORT_JOB_WORKERS', 0),
+        queue_size=app.config.get('REPORT_JOB_QUEUE_SIZE', 20),
+        timeout=app.config.get('REPORT_JOB_TIMEOUT'),
+        retention=app.config.get('REPORT_JOB_RETENTION'),
+    )
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据库结构升级模块
+为已有数据库补建新增的表、列和索引
+"""
+
+from sqlalchemy import inspect
+from sqlalchemy.schema import CreateColumn
+from app.models import db
+
+
+def _add_column(engine, table, column):
+    """为已有的表添加列（新增的列需要有服务器端默认值或允许为空）"""
+    definition = CreateColumn(column).compile(dialect=engine.dialect)
+    with engine.begin() as connection:
+        connection.exec_driver_sql(f'ALTER TABLE {table.name} ADD COLUMN {definition}')
+
+
+def upgrade_schema():
+    """
+    创建缺失的表，并为已有的表补建模型中声明的列和索引
+    :return: 新建的列（表名.列名）和索引名称列表
+    """
+    engine = db.engine
+    existing_tables = set(inspect(engine).get_table_names())
+
+    # 新表连同其索引一起创建
+    db.create_all()
+
+    created = []
+    inspector = inspect(engine)
+    for table in db.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        column_names = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in column_names:
+                _add_column(engine, table, column)
+                created.append(f'{table.name}.{column.name}')
+        index_names = {index['name'] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in index_names:
+                index.create(bind=engine)
+                created.append(index.name)
+    return created
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+试算平衡定时校验模块
+用一条分组查询比对每个科目存储的余额与初始余额加已过账凭证汇总的余额，并核对借贷发生额合计；
+应用处理请求后在后台线程中按TRIAL_BALANCE_INTERVAL定时执行，结果写入试算平衡校验记录表，
+发现不一致时记录错误日志，管理员可通过 /admin/trial-balance 查看
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from sqlalchemy import func
+from app.models import db, Account, TrialBalanceRun, Voucher, VoucherEntry
+from app.utils.ledger import ZERO, signed_amount
+from app.utils.money import money_sum
+
+
+def trial_balance_snapshot():
+    """
+    单条查询：科目表左连接按科目汇总的已过账分录
+    :return: {'total_debit', 'total_credit', 'account_count', 'drift': [{account_code, account_name, stored, computed}]}
+    """
+    totals = db.session.query(
+        VoucherEntry.account_code.label('account_code'),
+        money_sum(VoucherEntry.debit).label('debit'),
+        money_sum(VoucherEntry.credit).label('credit')
+    ).join(Voucher, Voucher.id == VoucherEntry.voucher_id).filter(
+        Voucher.status == 'posted',
+        Voucher.is_deleted == False
+    ).group_by(VoucherEntry.account_code).subquery()
+
+    rows = db.session.query(
+        Account.code,
+        Account.name,
+        Account.type,
+        Account.balance,
+        Account.opening_balance,
+        func.coalesce(totals.c.debit, 0),
+        func.coalesce(totals.c.credit, 0)
+    ).outerjoin(totals, totals.c.account_code == Account.code).order_by(Account.code)
+
+    total_debit = total_credit = ZERO
+    drift = []
+    account_count = 0
+    for code, name, account_type, stored, opening, debit, credit in rows:
+        account_count += 1
+        debit, credit = Decimal(debit).quantize(ZERO), Decimal(credit).quantize(ZERO)
+        total_debit += debit
+        total_credit += credit
+        computed = Decimal(opening or 0).quantize(ZERO) + signed_amount(account_type, debit, credit)
+        stored = Decimal(stored or 0).quantize(ZERO)
+        if stored != computed:
+            drift.append({'account_code': code, 'account_name': name,
+                          'stored': str(stored), 'computed': str(computed)})
+    return {
+        'total_debit': total_debit,
+        'total_credit': total_credit,
+        'account_count': account_count,
+        'drift': drift,
+    }
+
+
+def verify_trial_balance(trigger='schedule', keep=None, logger=None):
+    """
+    执行一次试算平衡校验并保存结果（提交事务）
+    :param keep: 只保留最近多少条校验记录，为空表示不清理
+    :param logger: 不一致时记录错误日志
+    :return: TrialBalanceRun
+    """
+    started = time.perf_counter()
+    snapshot = trial_balance_snapshot()
+    run = TrialBalanceRun(
+        trigger=trigger,
+        ok=not snapshot['drift'] and snapshot['total_debit'] == snapshot['total_credit'],
+        total_debit=snapshot['total_debit'],
+        total_credit=snapshot['total_credit'],
+        account_count=snapshot['account_count'],
+        drift_count=len(snapshot['drift']),
+        duration_ms=round((time.perf_counter() - started) * 1000, 2),
+    )
+    run.drift_accounts = snapshot['drift']
+    db.session.add(run)
+
+    if keep:
+        oldest_kept = db.session.query(TrialBalanceRun.id).order_by(
+            TrialBalanceRun.id.desc()).offset(keep - 1).limit(1).scalar()
+        if oldest_kept is not None:
+            TrialBalanceRun.query.filter(TrialBalanceRun.id < oldest_kept).delete(synchronize_session=False)
+    db.session.commit()
+
+    if not run.ok and logger is not None:
+        logger.error('试算平衡校验未通过：借方合计 %s，贷方合计 %s，%d 个科目余额与凭证不一致：%s',
+                     run.total_debit, run.total_credit, run.drift_count,
+                     '、'.join(item['account_code'] for item in snapshot['drift'][:20]))
+    return run
+
+
+def latest_runs(limit=20):
+    """最近的校验记录，按时间倒序"""
+    return TrialBalanceRun.query.order_by(TrialBalanceRun.id.desc()).limit(limit).all()
+
+
+def run_as_dict(run):
+    return {
+        'id': run.id,
+        'time': run.create_time.isoformat(timespec='seconds'),
+        'trigger': run.trigger,
+        'ok': run.ok,
+        'total_debit': str(run.total_debit),
+        'total_credit': str(run.total_credit),
+        'account_count': run.account_count,
+        'drift_count': run.drift_count,
+        'drift': run.drift_accounts,
+        'duration_ms': run.duration_ms,
+    }
+
+
+class TrialBalanceScheduler:
+    """
+    后台线程，每隔interval秒执行一次校验
+    多个工作进程各有一个线程：最近半个间隔内已有其他进程校验过时跳过本次
+    """
+
+    def __init__(self, app, interval, keep=None):
+        self.app = app
+        self.interval = interval
+        self.keep = keep
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name='trial-balance-verifier', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def run_once(self):
+        """
+        执行一次定时校验
+        :return: TrialBalanceRun，跳过时返回None
+        """
+        with self.app.app_context():
+            try:
+                last_run = db.session.query(func.max(TrialBalanceRun.create_time)).scalar()
+                if last_run is not None and datetime.now() - last_run < timedelta(seconds=self.interval / 2):
+                    return None
+                return verify_trial_balance('schedule', keep=self.keep, logger=self.app.logger)
+            except Exception:
+                db.session.rollback()
+                self.app.logger.exception('试算平衡定时校验失败')
+                return None
+            finally:
+                db.session.remove()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self.run_once()
+            self._stop.wait(self.interval)
+
+
+def init_verifier(app):
+    """
+    在应用处理第一个请求前启动定时校验线程（命令行工具不启动），
+    配置TRIAL_BALANCE_INTERVAL为0时不启动；调度器保存在app.extensions['trial_balance_scheduler']
+    """
+    @app.before_first_request
+    def start_trial_balance_scheduler():
+        interval = app.config.get('TRIAL_BALANCE_INTERVAL')
+        if not interval:
+            return
+        scheduler = TrialBalanceScheduler(app, interval, keep=app.config.get('TRIAL_BALANCE_HISTORY'))
+        app.extensions['trial_balance_scheduler'] = scheduler
+        scheduler.start()
@@ -18,4 +18,5 @@ from app.views import account
 from app.views import report
 from app.views import auth
 from app.views import budget
-from app.views import tax
\ No newline at end of file
+from app.views import tax
+from app.views import admin
\ No newline at end of file
@@ -5,9 +5,15 @@
 """
 
 from flask import render_template, request, redirect, url_for, flash, session
-from app.models import db, Account, Voucher, VoucherEntry, PurchaseOrder, SalesOrder, Expense
+from sqlalchemy.orm import selectinload
+from app.models import db, Account, Voucher, VoucherEntry
 from app.views import main_bp
 from app.utils.auth import login_required, admin_required
+from app.utils.ledger import post_vouchers
+from app.utils.dashboard import dashboard_metrics, movements_posted, status_changed
+from app.utils.pagination import paginate_list
+from app.utils.money import ZERO, parse_money
+from app.utils.chart import PATH_SEPARATOR, get_chart
 from datetime import datetime
 import uuid
 
@@ -26,13 +32,17 @@ def account_add():
     """添加会计科目"""
     if request.method == 'POST':
         try:
+            parent_code = request.form.get('parent_code') or None
+            get_chart().validate_parent(request.form['code'], parent_code, request.form['type'])
+            opening_balance = parse_money(request.form.get('balance'), '余额', allow_negative=True)
             account = Account(
                 code=request.form['code'],
                 name=request.form['name'],
                 type=request.form['type'],
-                parent_code=request.form.get('parent_code'),
+                parent_code=parent_code,
                 description=request.form.get('description'),
-                balance=float(request.form.get('balance', 0))
+                opening_balance=opening_balance,
+                balance=opening_balance
             )
             db.session.add(account)
             db.session.commit()
@@ -42,7 +52,7 @@ def account_add():
             db.session.rollback()
             flash(f'会计科目添加失败: {str(e)}', 'danger')
     # 获取所有科目作为父科目选项
-    parent_accounts = Account.query.filter_by(is_deleted=False).all()
+    parent_accounts = get_chart().accounts
     return render_template('account/add.html', parent_accounts=parent_accounts)
 
 @main_bp.route('/account/edit/<int:id>', methods=['GET', 'POST'])
@@ -52,9 +62,11 @@ def account_edit(id):
     account = Account.query.get_or_404(id)
     if request.method == 'POST':
         try:
+            parent_code = request.form.get('parent_code') or None
+            get_chart().validate_parent(account.code, parent_code, request.form['type'])
             account.name = request.form['name']
             account.type = request.form['type']
-            account.parent_code = request.form.get('parent_code')
+            account.parent_code = parent_code
             account.description = request.form.get('description')
             # 不允许直接修改余额，余额应该通过凭证自动更新
             db.session.commit()
@@ -63,7 +75,9 @@ def account_edit(id):
         except Exception as e:
             db.session.rollback()
             flash(f'会计科目编辑失败: {str(e)}', 'danger')
-    parent_accounts = Account.query.filter(Account.is_deleted == False, Account.id != id).all()
+    # 本科目及其下级科目不能作为上级科目
+    parent_accounts = [parent for parent in get_chart().accounts
+                       if account.code not in parent.path.split(PATH_SEPARATOR)]
     return render_template('account/edit.html', account=account, parent_accounts=parent_accounts)
 
 @main_bp.route('/account/delete/<int:id>')
@@ -74,8 +88,7 @@ def account_delete(id):
     try:
         account = Account.query.get_or_404(id)
         # 检查是否有子科目
-        has_children = Account.query.filter_by(parent_code=account.code, is_deleted=False).first()
-        if has_children:
+        if get_chart().children_of(account.code):
             flash('该科目存在子科目，不能删除！', 'danger')
             return redirect(url_for('main.account_list'))
         # 检查是否有凭证分录使用该科目
@@ -104,78 +117,7 @@ def account_view(id):
 @login_required
 def dashboard():
     """仪表盘"""
-    from datetime import datetime, timedelta
-    from decimal import Decimal
-    
-    # 获取当前月份
-    today = datetime.today()
-    current_month_start = today.replace(day=1)
-    current_month_end = (current_month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-    
-    # 计算本月收入、支出、利润
-    # 1. 获取本月的凭证
-    vouchers = Voucher.query.filter(
-        Voucher.date >= current_month_start.date(),
-        Voucher.date <= current_month_end.date(),
-        Voucher.status == 'posted',
-        Voucher.is_deleted == False
-    ).all()
-    
-    # 2. 初始化本月收支变量
-    total_income = Decimal('0.0')
-    total_expense = Decimal('0.0')
-    
-    # 遍历凭证计算本月收支
-    for voucher in vouchers:
-        for entry in voucher.entries:
-            if entry.account and entry.account.type == 'income':
-                total_income += entry.credit  # 收入类账户增加记在贷方
-            elif entry.account and entry.account.type in ['expense', 'cost']:
-                total_expense += entry.debit
-    
-    total_profit = total_income - total_expense
-    
-    # 获取待处理事项数量
-    pending_orders = PurchaseOrder.query.filter_by(status='pending', is_deleted=False).count() + SalesOrder.query.filter_by(status='pending', is_deleted=False).count()
-    pending_expenses = Expense.query.filter_by(status='pending', is_deleted=False).count()
-    pending_vouchers = Voucher.query.filter_by(status='draft', is_deleted=False).count()
-    total_pending = pending_orders + pending_expenses + pending_vouchers
-    
-    # 获取最近交易记录
-    recent_transactions = []
-    
-    # 获取最近的凭证
-    recent_vouchers = Voucher.query.filter_by(is_deleted=False).order_by(Voucher.create_time.desc()).limit(5).all()
-    for voucher in recent_vouchers:
-        recent_transactions.append({
-            'date': voucher.date.strftime('%Y-%m-%d'),
-            'type': '凭证',
-            'description': voucher.summary,
-            'amount': sum(entry.debit for entry in voucher.entries),
-            'status': voucher.status
-        })
-    
-    # 获取最近的费用报销
-    recent_expenses = Expense.query.filter_by(is_deleted=False).order_by(Expense.create_time.desc()).limit(5).all()
-    for expense in recent_expenses:
-        recent_transactions.append({
-            'date': expense.create_time.strftime('%Y-%m-%d'),
-            'type': '费用报销',
-            'description': expense.description,
-            'amount': expense.amount,
-            'status': expense.status
-        })
-    
-    # 按日期排序
-    recent_transactions.sort(key=lambda x: x['date'], reverse=True)
-    recent_transactions = recent_transactions[:10]  # 只显示最近10条
-    
-    return render_template('dashboard.html', 
-                         total_income=total_income,
-                         total_expense=total_expense,
-                         total_profit=total_profit,
-                         total_pending=total_pending,
-                         recent_transactions=recent_transactions)
+    return render_template('dashboard.html', **dashboard_metrics())
 
 # 凭证管理
 
@@ -183,8 +125,13 @@ def dashboard():
 @login_required
 def voucher_list():
     """凭证列表"""
-    vouchers = Voucher.query.filter_by(is_deleted=False).all()
-    return render_template('voucher/list.html', vouchers=vouchers)
+    page, filters = paginate_list(
+        Voucher.query.filter_by(is_deleted=False),
+        (Voucher.date, Voucher.id),
+        status_column=Voucher.status,
+        date_column=Voucher.date
+    )
+    return render_template('voucher/list.html', vouchers=page.items, page=page, filters=filters)
 
 @main_bp.route('/voucher/add', methods=['GET', 'POST'])
 @login_required
@@ -205,18 +152,17 @@ def voucher_add():
             
             # 处理凭证分录
             entry_count = int(request.form['entry_count'])
-            total_debit = 0
-            total_credit = 0
+            total_debit = ZERO
+            total_credit = ZERO
             
             for i in range(entry_count):
                 account_code = request.form[f'account_code_{i}']
-                debit = float(request.form[f'debit_{i}'] or 0)
-                credit = float(request.form[f'credit_{i}'] or 0)
+                debit = parse_money(request.form[f'debit_{i}'], f'第{i+1}行借方金额')
+                credit = parse_money(request.form[f'credit_{i}'], f'第{i+1}行贷方金额')
                 description = request.form.get(f'description_{i}', '')
                 
                 # 验证科目存在
-                account = Account.query.filter_by(code=account_code, is_deleted=False).first()
-                if not account:
+                if get_chart().get(account_code) is None:
                     flash(f'第{i+1}行分录的科目不存在！', 'danger')
                     return redirect(url_for('main.voucher_add'))
                 
@@ -233,13 +179,14 @@ def voucher_add():
                 total_debit += debit
                 total_credit += credit
             
-            # 检查借贷平衡
-            if abs(total_debit - total_credit) > 0.01:
+            # 检查借贷平衡（金额已按分舍入，借贷合计应完全相等）
+            if total_debit != total_credit:
                 flash('凭证借贷不平衡！', 'danger')
                 return redirect(url_for('main.voucher_add'))
             
             db.session.add(voucher)
             db.session.commit()
+            status_changed('vouchers', None, voucher.status)
             flash('凭证添加成功！', 'success')
             return redirect(url_for('main.voucher_list'))
         except Exception as e:
@@ -247,14 +194,15 @@ def voucher_add():
             flash(f'凭证添加失败: {str(e)}', 'danger')
     
     # 获取所有科目
-    accounts = Account.query.filter_by(is_deleted=False).all()
-    return render_template('voucher/add.html', accounts=accounts)
+    return render_template('voucher/add.html', accounts=get_chart().accounts)
 
 @main_bp.route('/voucher/view/<int:id>')
 @login_required
 def voucher_view(id):
     """查看凭证详情"""
-    voucher = Voucher.query.get_or_404(id)
+    voucher = Voucher.query.options(
+        selectinload(Voucher.entries).joinedload(VoucherEntry.account)
+    ).get_or_404(id)
     return render_template('voucher/view.html', voucher=voucher)
 
 @main_bp.route('/voucher/approve/<int:id>')
@@ -273,6 +221,7 @@ def voucher_approve(id):
         voucher.approval_time = datetime.now()
         
         db.session.commit()
+        status_changed('vouchers', 'draft', 'approved')
         flash('凭证审核成功！', 'success')
     except Exception as e:
         db.session.rollback()
@@ -290,26 +239,42 @@ def voucher_post(id):
             flash('只有审核通过的凭证可以过账！', 'danger')
             return redirect(url_for('main.voucher_list'))
         
-        # 更新科目余额
-        for entry in voucher.entries:
-            account = Account.query.filter_by(code=entry.account_code).first()
-            if account:
-                # 根据科目类型更新余额
-                if account.type in ['asset', 'expense', 'cost']:
-                    account.balance += entry.debit - entry.credit
-                else:  # liability, equity, income
-                    account.balance += entry.credit - entry.debit
-        
-        voucher.status = 'posted'
-        voucher.post_time = datetime.now()
+        # 更新科目余额、凭证状态和科目期间余额
+        result = post_vouchers(voucher_ids=[voucher.id])
         
         db.session.commit()
+        movements_posted(result.movements)
         flash('凭证过账成功！', 'success')
     except Exception as e:
         db.session.rollback()
         flash(f'凭证过账失败: {str(e)}', 'danger')
     return redirect(url_for('main.voucher_list'))
 
+@main_bp.route('/voucher/batch_post', methods=['POST'])
+@login_required
+@admin_required  # 只有管理员才能过账凭证
+def voucher_batch_post():
+    """批量过账：过账勾选的凭证，未勾选时过账日期范围内全部审核通过的凭证"""
+    try:
+        voucher_ids = [int(voucher_id) for voucher_id in request.form.getlist('voucher_ids')]
+        start_date = request.form.get('start_date')
+        end_date = request.form.get('end_date')
+        if voucher_ids:
+            result = post_vouchers(voucher_ids=voucher_ids)
+        else:
+            result = post_vouchers(
+                start_date=datetime.strptime(start_date, '%Y-%m-%d').date() if start_date else None,
+                end_date=datetime.strptime(end_date, '%Y-%m-%d').date() if end_date else None
+            )
+        
+        db.session.commit()
+        movements_posted(result.movements)
+        flash(f'批量过账完成：{result.count} 张凭证，用时 {result.seconds:.2f} 秒（{result.rate:.0f} 张/秒）', 'success')
+    except Exception as e:
+        db.session.rollback()
+        flash(f'批量过账失败: {str(e)}', 'danger')
+    return redirect(url_for('main.voucher_list'))
+
 @main_bp.route('/voucher/delete/<int:id>')
 @login_required
 @admin_required  # 只有管理员才能删除凭证
@@ -323,6 +288,7 @@ def voucher_delete(id):
         
         voucher.is_deleted = True
         db.session.commit()
+        status_changed('vouchers', voucher.status, None)
         flash('凭证删除成功！', 'success')
     except Exception as e:
         db.session.rollback()
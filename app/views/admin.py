@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+系统管理模块视图
+"""
+
+from flask import jsonify, request
+from app.views import main_bp
+from app.utils.auth import login_required, admin_required
+from app.utils.profiler import get_metrics
+from app.utils.report_cache import get_report_cache
+from app.utils.verifier import latest_runs, run_as_dict
+
+# 路由耗时统计
+@main_bp.route('/admin/metrics')
+@login_required
+@admin_required
+def admin_metrics():
+    """各路由最近请求耗时的p50/p95/p99分位数和报表缓存命中情况（JSON），reset=1时统计后清空"""
+    metrics = get_metrics()
+    routes = metrics.summary()
+    if request.args.get('reset'):
+        metrics.clear()
+    return jsonify(window=metrics.window, routes=routes, report_cache=get_report_cache().stats())
+
+# 试算平衡校验结果
+@main_bp.route('/admin/trial-balance')
+@login_required
+@admin_required
+def admin_trial_balance():
+    """最近的试算平衡校验记录（JSON），limit指定条数"""
+    limit = min(request.args.get('limit', 20, type=int), 500)
+    runs = [run_as_dict(run) for run in latest_runs(limit)]
+    return jsonify(ok=runs[0]['ok'] if runs else None, latest=runs[0] if runs else None, runs=runs)
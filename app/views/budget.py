@@ -8,6 +8,7 @@ from flask import render_template, request, redirect, url_for, flash, session
 from app.models import db, Budget
 from app.views import main_bp
 from app.utils.auth import login_required, admin_required
+from app.utils.money import parse_money
 from datetime import datetime
 
 # 预算列表
@@ -26,7 +27,7 @@ def budget_add():
     if request.method == 'POST':
         try:
             department = request.form['department']
-            budget_amount = float(request.form['budget_amount'])
+            budget_amount = parse_money(request.form['budget_amount'], '预算金额')
             year = int(request.form['year'])
             
             # 检查是否已存在相同部门和年份的预算
@@ -76,7 +77,7 @@ def budget_edit(id):
                 return redirect(url_for('main.budget_edit', id=id))
             
             budget.department = request.form['department']
-            budget.budget_amount = float(request.form['budget_amount'])
+            budget.budget_amount = parse_money(request.form['budget_amount'], '预算金额')
             budget.year = int(request.form['year'])
             
             db.session.commit()
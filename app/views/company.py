@@ -9,6 +9,7 @@ from app.models import db, Company, Account, User
 from app.views import main_bp
 from werkzeug.security import generate_password_hash
 from app.utils.auth import login_required, admin_required
+from app.utils.money import parse_money
 import json
 
 @main_bp.route('/')
@@ -47,7 +48,7 @@ def company_init():
         try:
             # 获取表单数据
             name = request.form['name']
-            registered_capital = request.form['registered_capital']
+            registered_capital = parse_money(request.form['registered_capital'], '注册资金')
             industry = request.form['industry']
             accounting_period = request.form['accounting_period']
             currency = request.form['currency']
@@ -69,10 +70,11 @@ def company_init():
             # 自动生成标准会计科目表
             generate_default_accounts()
             
-            # 设置实收资本初始余额为注册资本
+            # 设置实收资本初始余额为注册资本（记为初始余额，重算余额时保留）
             paid_in_capital_account = Account.query.filter_by(code='4001').first()
             if paid_in_capital_account:
-                paid_in_capital_account.balance = float(registered_capital)
+                paid_in_capital_account.opening_balance = registered_capital
+                paid_in_capital_account.balance = registered_capital
                 db.session.commit()
             
             # 创建默认管理员用户
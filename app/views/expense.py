@@ -8,6 +8,11 @@ from flask import render_template, request, redirect, url_for, flash, session
 from app.models import db, Expense, User, Voucher, VoucherEntry, Account
 from app.views import main_bp
 from app.utils.auth import login_required, admin_required
+from app.utils.ledger import post_vouchers
+from app.utils.dashboard import movements_posted, status_changed
+from app.utils.pagination import paginate_list
+from app.utils.money import parse_money
+from app.utils.chart import get_chart
 from datetime import datetime
 import uuid
 
@@ -17,8 +22,13 @@ import uuid
 @login_required
 def expense_list():
     """费用记录列表"""
-    expenses = Expense.query.filter_by(is_deleted=False).all()
-    return render_template('expense/list.html', expenses=expenses)
+    page, filters = paginate_list(
+        Expense.query.filter_by(is_deleted=False),
+        (Expense.create_time, Expense.id),
+        status_column=Expense.status,
+        date_column=Expense.create_time
+    )
+    return render_template('expense/list.html', expenses=page.items, page=page, filters=filters)
 
 @main_bp.route('/expense/add', methods=['GET', 'POST'])
 @login_required
@@ -30,13 +40,14 @@ def expense_add():
             expense = Expense(
                 expense_number=expense_number,
                 user_id=session['user_id'],  # 使用当前登录用户ID
-                amount=float(request.form['amount']),
+                amount=parse_money(request.form['amount'], '报销金额'),
                 expense_type=request.form['expense_type'],
                 description=request.form.get('description'),
                 status='pending'
             )
             db.session.add(expense)
             db.session.commit()
+            status_changed('expenses', None, 'pending')
             flash('费用记录添加成功！', 'success')
             return redirect(url_for('main.expense_list'))
         except Exception as e:
@@ -51,7 +62,7 @@ def expense_edit(id):
     expense = Expense.query.get_or_404(id)
     if request.method == 'POST':
         try:
-            expense.amount = float(request.form['amount'])
+            expense.amount = parse_money(request.form['amount'], '报销金额')
             expense.expense_type = request.form['expense_type']
             expense.description = request.form.get('description')
             db.session.commit()
@@ -78,6 +89,7 @@ def expense_delete(id):
         expense = Expense.query.get_or_404(id)
         expense.is_deleted = True
         db.session.commit()
+        status_changed('expenses', expense.status, None)
         flash('费用记录删除成功！', 'success')
     except Exception as e:
         db.session.rollback()
@@ -91,10 +103,12 @@ def expense_approve(id):
     """审批费用记录"""
     try:
         expense = Expense.query.get_or_404(id)
+        old_status = expense.status
         expense.status = 'approved'
         expense.approval_id = session['user_id']  # 使用当前登录用户ID
         expense.approval_time = datetime.now()
         db.session.commit()
+        status_changed('expenses', old_status, 'approved')
         flash('费用记录审批成功！', 'success')
     except Exception as e:
         db.session.rollback()
@@ -108,10 +122,12 @@ def expense_reject(id):
     """拒绝费用记录"""
     try:
         expense = Expense.query.get_or_404(id)
+        old_status = expense.status
         expense.status = 'rejected'
         expense.approval_id = session['user_id']  # 使用当前登录用户ID
         expense.approval_time = datetime.now()
         db.session.commit()
+        status_changed('expenses', old_status, 'rejected')
         flash('费用记录已拒绝！', 'success')
     except Exception as e:
         db.session.rollback()
@@ -125,6 +141,7 @@ def expense_pay(id):
     """支付费用记录"""
     try:
         expense = Expense.query.get_or_404(id)
+        old_status = expense.status
         
         # 1. 更新费用状态
         expense.status = 'paid'
@@ -136,7 +153,7 @@ def expense_pay(id):
             voucher_number=voucher_number,
             date=datetime.now().date(),
             summary=f"支付费用报销: {expense.description or expense.expense_type}",
-            status='posted',
+            status='approved',  # 系统生成的凭证直接审核，随后过账
             user_id=session['user_id']  # 使用当前登录用户ID
         )
         db.session.add(voucher)
@@ -144,7 +161,8 @@ def expense_pay(id):
         
         # 3. 生成凭证分录
         # 借方：费用科目
-        expense_account = Account.query.filter_by(type='expense').first()
+        chart = get_chart()
+        expense_account = next(iter(chart.of_type('expense')), None)
         if not expense_account:
             # 如果没有费用科目，创建一个默认的
             expense_account = Account(
@@ -157,7 +175,7 @@ def expense_pay(id):
             db.session.flush()
         
         # 贷方：银行存款/现金科目
-        cash_account = Account.query.filter_by(code='1001').first()
+        cash_account = chart.get('1001')
         if not cash_account:
             # 如果没有现金科目，创建一个默认的
             cash_account = Account(
@@ -189,12 +207,13 @@ def expense_pay(id):
         )
         db.session.add(credit_entry)
         
-        # 4. 更新会计科目余额
-        expense_account.balance += expense.amount  # 费用科目余额增加（借方）
-        cash_account.balance -= expense.amount  # 现金科目余额减少（贷方）
+        # 4. 过账：更新会计科目余额和科目期间余额
+        result = post_vouchers(voucher_ids=[voucher.id])
         
         # 提交所有变更
         db.session.commit()
+        movements_posted(result.movements)
+        status_changed('expenses', old_status, 'paid')
         flash('费用记录已支付并生成凭证！', 'success')
     except Exception as e:
         db.session.rollback()
@@ -5,9 +5,13 @@
 """
 
 from flask import render_template, redirect, url_for, flash, request, session
+from sqlalchemy.orm import joinedload, selectinload
 from app.models import db, Supplier, PurchaseOrder, PurchaseOrderItem
 from app.views import main_bp
 from app.utils.auth import login_required, admin_required
+from app.utils.pagination import paginate_list
+from app.utils.dashboard import status_changed
+from app.utils.money import ZERO, multiply, parse_decimal, parse_money
 from datetime import datetime
 import uuid
 
@@ -19,8 +23,12 @@ def supplier_list():
     """
     供应商列表
     """
-    suppliers = Supplier.query.filter_by(is_deleted=False).all()
-    return render_template('purchase/supplier_list.html', suppliers=suppliers)
+    page, filters = paginate_list(
+        Supplier.query.filter_by(is_deleted=False),
+        (Supplier.create_time, Supplier.id),
+        date_column=Supplier.create_time
+    )
+    return render_template('purchase/supplier_list.html', suppliers=page.items, page=page, filters=filters)
 
 @main_bp.route('/supplier/add', methods=['GET', 'POST'])
 @login_required
@@ -130,8 +138,13 @@ def purchase_order_list():
     """
     采购订单列表
     """
-    orders = PurchaseOrder.query.filter_by(is_deleted=False).all()
-    return render_template('purchase/order_list.html', orders=orders)
+    page, filters = paginate_list(
+        PurchaseOrder.query.options(joinedload(PurchaseOrder.supplier)).filter_by(is_deleted=False),
+        (PurchaseOrder.create_time, PurchaseOrder.id),
+        status_column=PurchaseOrder.status,
+        date_column=PurchaseOrder.create_time
+    )
+    return render_template('purchase/order_list.html', orders=page.items, page=page, filters=filters)
 
 @main_bp.route('/purchase/order/add', methods=['GET', 'POST'])
 @login_required
@@ -143,7 +156,7 @@ def purchase_order_add():
         try:
             # 获取表单数据
             supplier_id = request.form['supplier_id']
-            tax_rate = float(request.form['tax_rate'])
+            tax_rate = parse_decimal(request.form['tax_rate'], '税率')
             payment_method = request.form['payment_method']
             
             # 创建订单编号
@@ -155,14 +168,14 @@ def purchase_order_add():
             unit_prices = request.form.getlist('unit_price[]')
             
             # 计算订单总金额
-            total_amount = 0
+            total_amount = ZERO
             items = []
             
             for item_name, quantity, unit_price in zip(item_names, quantities, unit_prices):
                 if item_name and quantity and unit_price:
-                    quantity = float(quantity)
-                    unit_price = float(unit_price)
-                    amount = quantity * unit_price
+                    quantity = parse_decimal(quantity, '数量')
+                    unit_price = parse_money(unit_price, '单价')
+                    amount = multiply(quantity, unit_price)
                     total_amount += amount
                     
                     item = PurchaseOrderItem(
@@ -174,7 +187,7 @@ def purchase_order_add():
                     items.append(item)
             
             # 计算税额
-            tax_amount = total_amount * tax_rate
+            tax_amount = multiply(total_amount, tax_rate)
             
             # 创建采购订单
             order = PurchaseOrder(
@@ -195,6 +208,7 @@ def purchase_order_add():
             # 保存数据
             db.session.add(order)
             db.session.commit()
+            status_changed('orders', None, 'pending')
             
             flash('采购订单添加成功！', 'success')
             return redirect(url_for('main.purchase_order_list'))
@@ -213,7 +227,10 @@ def purchase_order_view(order_id):
     """
     查看采购订单详情
     """
-    order = PurchaseOrder.query.filter_by(id=order_id, is_deleted=False).first()
+    order = PurchaseOrder.query.options(
+        joinedload(PurchaseOrder.supplier),
+        selectinload(PurchaseOrder.items)
+    ).filter_by(id=order_id, is_deleted=False).first()
     if not order:
         flash('采购订单不存在或已删除', 'danger')
         return redirect(url_for('main.purchase_order_list'))
@@ -234,11 +251,13 @@ def purchase_order_approve(order_id):
     
     try:
         # 更新订单状态
+        old_status = order.status
         order.status = 'approved'
         order.approval_id = session['user_id']  # 使用当前登录用户ID
         order.approval_time = datetime.now()
         
         db.session.commit()
+        status_changed('orders', old_status, 'approved')
         flash('采购订单审批成功！', 'success')
         
     except Exception as e:
@@ -261,9 +280,11 @@ def purchase_order_cancel(order_id):
     
     try:
         # 更新订单状态
+        old_status = order.status
         order.status = 'cancelled'
         
         db.session.commit()
+        status_changed('orders', old_status, 'cancelled')
         flash('采购订单取消成功！', 'success')
         
     except Exception as e:
@@ -286,9 +307,11 @@ def purchase_order_complete(order_id):
     
     try:
         # 更新订单状态
+        old_status = order.status
         order.status = 'completed'
         
         db.session.commit()
+        status_changed('orders', old_status, 'completed')
         flash('采购订单完成成功！', 'success')
         
     except Exception as e:
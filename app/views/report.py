@@ -4,59 +4,63 @@
 财务报表模块视图
 """
 
-from flask import render_template, request, redirect, url_for, flash
-from app.models import db, Account, Voucher, Expense, SalesOrder, PurchaseOrder
+from flask import render_template, request, redirect, url_for, flash, abort, session, jsonify, current_app
+from app.models import db, ReportJob
 from app.views import main_bp
 from app.utils.auth import login_required
+from app.utils.ledger import (ZERO, balances_as_of, general_ledger_entries, ledger_accounts, ledger_balance,
+                              ledger_page, month_periods, monthly_entry_totals)
+from app.utils.cash_flow import CASH_FLOW_ACTIVITIES, CASH_FLOW_ITEMS, cash_account_codes, cash_flow_totals
+from app.utils.chart import get_chart
+from app.utils.export import export_response, EXPORT_FORMATS
+from app.utils.report_cache import cached_report
+from app.utils.report_jobs import (expire_stale_job, get_job_queue, job_as_dict, job_result, report_job,
+                                   submit_report_job)
+from collections import namedtuple
 from datetime import datetime, timedelta, date
-from decimal import Decimal
 
-# 资产负债表
-@main_bp.route('/report/balance_sheet', methods=['GET', 'POST'])
-@login_required
-def balance_sheet():
-    """资产负债表"""
-    print(f"[DEBUG] Request method: {request.method}")
-    print(f"[DEBUG] Form data: {request.form}")
-    if request.method == 'POST':
-        report_date = datetime.strptime(request.form['report_date'], '%Y-%m-%d').date()
-        print(f"[DEBUG] Report date from POST: {report_date}")
-        flash(f'报表已生成，日期: {report_date}', 'success')
-    else:
-        # 默认显示当前月份的最后一天
-        today = date.today()
-        report_date = date(today.year, today.month, 1) + timedelta(days=32)
-        report_date = report_date.replace(day=1) - timedelta(days=1)
-        print(f"[DEBUG] Report date from GET: {report_date}")
-    
-    # 获取所有会计科目
-    accounts = Account.query.filter_by(is_deleted=False).all()
-    
-    # 查询报告日期之前的所有已过账凭证
-    vouchers = Voucher.query.filter(
-        Voucher.date <= report_date,
-        Voucher.status == 'posted',
-        Voucher.is_deleted == False
-    ).all()
-    
-    # 计算每个科目的历史余额
-    account_balances = {}
-    
-    # 初始化所有科目的余额为0
-    for account in accounts:
-        account_balances[account.code] = Decimal('0.0')
-    
-    # 根据凭证计算每个科目的历史余额
-    for voucher in vouchers:
-        for entry in voucher.entries:
-            if entry.account_code in account_balances:
-                # 资产、费用、成本类科目：借方增加，贷方减少
-                # 负债、所有者权益、收入类科目：贷方增加，借方减少
-                account = next(a for a in accounts if a.code == entry.account_code)
-                if account.type in ['asset', 'expense', 'cost']:
-                    account_balances[entry.account_code] += entry.debit - entry.credit
-                else:
-                    account_balances[entry.account_code] += entry.credit - entry.debit
+# 报表数据：视图渲染页面和导出文件共用
+
+# 利润表涉及的损益类科目类型
+PROFIT_TYPES = ('income', 'cost', 'expense')
+
+# 报表中的科目行：科目表缓存中的科目对象由各请求共享，计算出的余额放在每次生成的行中
+BalanceLine = namedtuple('BalanceLine', 'code name type parent_code level calculated_balance')
+
+def _level(value):
+    """展开级次参数：正整数时只列示该级次及以上的科目，缺省或格式错误时全部展开"""
+    try:
+        level = int(value)
+    except (TypeError, ValueError):
+        return None
+    return level if level > 0 else None
+
+def _expanded(accounts, level):
+    """按展开级次筛选科目（按科目树顺序）"""
+    return [account for account in accounts if level is None or account.level <= level]
+
+def _balance_lines(report_date, level=None):
+    """
+    读取最近一期科目期间余额快照，加上之后的已过账分录，计算每个科目的历史余额；
+    上级科目的余额为按科目树汇总的合计（含全部下级科目），各级次共用同一次查询的结果
+    :return: (报表行, {科目编码: 本科目余额})，合计应按本科目余额计算，避免重复
+    """
+    chart = get_chart()
+    balances = balances_as_of(chart.accounts, report_date)
+    totals = chart.rollup(balances)
+    lines = [BalanceLine(account.code, account.name, account.type, account.parent_code, account.level,
+                         totals[account.code])
+             for account in _expanded(chart.accounts, level)]
+    return lines, balances
+
+@report_job('balance_sheet')
+@cached_report('balance_sheet', lambda report_date, **params: (None, report_date))
+def build_balance_sheet(report_date, level=None):
+    """
+    资产负债表数据
+    """
+    # 所有会计科目及其历史余额
+    accounts, balances = _balance_lines(report_date, level)
     
     # 按科目类型分组，并使用计算出的历史余额
     assets = []
@@ -67,9 +71,6 @@ def balance_sheet():
     cost_accounts = []
     
     for account in accounts:
-        # 更新账户的余额为历史余额
-        account.calculated_balance = account_balances[account.code]
-        
         if account.type == 'asset':
             assets.append(account)
         elif account.type == 'liability':
@@ -83,15 +84,18 @@ def balance_sheet():
         elif account.type == 'cost':
             cost_accounts.append(account)
     
-    # 计算合计
-    total_assets = sum(account.calculated_balance for account in assets)
-    total_liabilities = sum(account.calculated_balance for account in liabilities)
-    total_equity = sum(account.calculated_balance for account in equity)
+    # 计算合计（按各科目本身的余额，与展开级次无关）
+    type_totals = {}
+    for account in get_chart().accounts:
+        type_totals[account.type] = type_totals.get(account.type, ZERO) + balances[account.code]
+    total_assets = type_totals.get('asset', ZERO)
+    total_liabilities = type_totals.get('liability', ZERO)
+    total_equity = type_totals.get('equity', ZERO)
     
     # 计算收入、费用和成本的总计（使用历史余额）
-    total_income = sum(account.calculated_balance for account in income_accounts)
-    total_expense = sum(account.calculated_balance for account in expense_accounts)
-    total_cost = sum(account.calculated_balance for account in cost_accounts)
+    total_income = type_totals.get('income', ZERO)
+    total_expense = type_totals.get('expense', ZERO)
+    total_cost = type_totals.get('cost', ZERO)
     
     # 计算本年利润的影响
     current_profit = total_income - total_expense - total_cost
@@ -102,20 +106,110 @@ def balance_sheet():
     # 调整资产负债表平衡检查：资产 = 负债 + 所有者权益（含本年利润）
     adjusted_total = total_liabilities + adjusted_equity
     
-    return render_template('report/balance_sheet.html', 
-                         report_date=report_date, 
-                         assets=assets, 
-                         liabilities=liabilities, 
-                         equity=equity,
-                         total_assets=total_assets,
-                         total_liabilities=total_liabilities,
-                         total_equity=total_equity,
-                         adjusted_equity=adjusted_equity,
-                         current_profit=current_profit,
-                         adjusted_total=adjusted_total,
-                         total_income=total_income,
-                         total_expense=total_expense,
-                         total_cost=total_cost)
+    return dict(
+        report_date=report_date,
+        level=level,
+        max_level=get_chart().max_level,
+        assets=assets,
+        liabilities=liabilities,
+        equity=equity,
+        total_assets=total_assets,
+        total_liabilities=total_liabilities,
+        total_equity=total_equity,
+        adjusted_equity=adjusted_equity,
+        current_profit=current_profit,
+        adjusted_total=adjusted_total,
+        total_income=total_income,
+        total_expense=total_expense,
+        total_cost=total_cost)
+
+# 资产负债表
+@main_bp.route('/report/balance_sheet', methods=['GET', 'POST'])
+@login_required
+def balance_sheet():
+    """资产负债表"""
+    if request.method == 'POST':
+        report_date = datetime.strptime(request.form['report_date'], '%Y-%m-%d').date()
+        level = _level(request.form.get('level'))
+        if request.form.get('background'):
+            return _submit_job('balance_sheet', report_date=report_date, level=level)
+        flash(f'报表已生成，日期: {report_date}', 'success')
+    else:
+        # 默认显示当前月份的最后一天
+        today = date.today()
+        report_date = date(today.year, today.month, 1) + timedelta(days=32)
+        report_date = report_date.replace(day=1) - timedelta(days=1)
+        level = None
+    
+    return render_template('report/balance_sheet.html', **build_balance_sheet(report_date, level))
+
+@report_job('profit_statement')
+@cached_report('profit_statement', lambda start_date, end_date, **params: (start_date, end_date))
+def build_profit_statement(start_date, end_date, monthly=False, level=None):
+    """
+    利润表数据
+    损益类科目的发生额由一次按科目、月份分组的汇总查询得到，
+    monthly为True时同时给出期间内逐月的对比列（同一次查询的结果）；
+    上级科目的发生额按科目树汇总，level为展开级次
+    """
+    # 获取所有收入、费用和成本类账户
+    chart = get_chart()
+    all_accounts = chart.of_type(*PROFIT_TYPES)
+    account_types = {acc.code: acc.type for acc in all_accounts}
+    accounts = _expanded(all_accounts, level)
+    income_accounts = [acc for acc in accounts if acc.type == 'income']
+    cost_accounts = [acc for acc in accounts if acc.type == 'cost']
+    expense_accounts = [acc for acc in accounts if acc.type == 'expense']
+
+    # 期间内已过账凭证按科目、月份汇总（排除期末结转凭证）
+    periods = month_periods(start_date, end_date)
+    monthly_movements = {code: dict.fromkeys(periods, ZERO) for code in account_types}
+    period_totals = {key: dict.fromkeys(periods, ZERO)
+                     for key in ('income', 'cost', 'expense', 'gross_profit', 'net_profit')}
+    totals = monthly_entry_totals(start_date, end_date, account_codes=account_types, exclude_closing=True)
+    for (code, period), (debit, credit) in totals.items():
+        account_type = account_types[code]
+        # 收入类账户取贷方发生额，成本、费用类账户取借方发生额
+        amount = credit if account_type == 'income' else debit
+        monthly_movements[code][period] += amount
+        period_totals[account_type][period] += amount
+
+    for period in periods:
+        gross = period_totals['income'][period] - period_totals['cost'][period]
+        period_totals['gross_profit'][period] = gross
+        period_totals['net_profit'][period] = gross - period_totals['expense'][period]
+
+    # 各期发生额按科目树逐级汇总（合计仍按各科目本身的发生额）
+    rolled_up = {period: chart.rollup({code: values[period] for code, values in monthly_movements.items()})
+                 for period in periods}
+    monthly_movements = {code: {period: rolled_up[period][code] for period in periods} for code in account_types}
+    account_movements = {code: sum(values.values(), ZERO) for code, values in monthly_movements.items()}
+    total_income = sum(period_totals['income'].values(), ZERO)
+    total_cost = sum(period_totals['cost'].values(), ZERO)
+    total_expense = sum(period_totals['expense'].values(), ZERO)
+
+    # 计算利润
+    gross_profit = total_income - total_cost
+    net_profit = gross_profit - total_expense
+
+    return dict(
+        start_date=start_date,
+        end_date=end_date,
+        monthly=monthly,
+        level=level,
+        max_level=chart.max_level,
+        periods=periods if monthly else [],
+        income_accounts=income_accounts,
+        expense_accounts=expense_accounts,
+        cost_accounts=cost_accounts,
+        account_movements=account_movements,
+        monthly_movements=monthly_movements,
+        period_totals=period_totals,
+        total_income=total_income,
+        total_cost=total_cost,
+        total_expense=total_expense,
+        gross_profit=gross_profit,
+        net_profit=net_profit)
 
 # 利润表
 @main_bp.route('/report/profit_statement', methods=['GET', 'POST'])
@@ -125,76 +219,64 @@ def profit_statement():
     if request.method == 'POST':
         start_date = datetime.strptime(request.form['start_date'], '%Y-%m-%d').date()
         end_date = datetime.strptime(request.form['end_date'], '%Y-%m-%d').date()
+        monthly = bool(request.form.get('monthly'))
+        level = _level(request.form.get('level'))
+        if request.form.get('background'):
+            return _submit_job('profit_statement', start_date=start_date, end_date=end_date,
+                               monthly=monthly, level=level)
     else:
         # 默认显示当前月份
         today = date.today()
         start_date = date(today.year, today.month, 1)
         end_date = date(today.year, today.month, 1) + timedelta(days=32)
         end_date = end_date.replace(day=1) - timedelta(days=1)
+        monthly = False
+        level = None
     
-    # 获取所有收入、费用和成本类账户
-    income_accounts = Account.query.filter_by(type='income', is_deleted=False).all()
-    expense_accounts = Account.query.filter_by(type='expense', is_deleted=False).all()
-    cost_accounts = Account.query.filter_by(type='cost', is_deleted=False).all()
-    
-    # 获取期间内的所有已过账凭证（排除期末结转凭证）
-    vouchers = Voucher.query.filter(
-        Voucher.date >= start_date,
-        Voucher.date <= end_date,
-        Voucher.status == 'posted',
-        Voucher.is_deleted == False,
-        ~Voucher.voucher_number.like('CLOS%')  # 排除结转凭证
-    ).all()
-    
-    # 基于凭证数据计算期间收入和费用
-    total_income = Decimal('0.0')  # 收入（损益类账户的贷方发生额）
-    total_cost = Decimal('0.0')    # 成本（损益类账户的借方发生额）
-    total_expense = Decimal('0.0') # 费用（损益类账户的借方发生额）
-    
-    # 为每个损益类账户创建期间发生额字典
-    account_movements = {}
-    
-    # 初始化所有账户的发生额为0
-    for acc in income_accounts + cost_accounts + expense_accounts:
-        account_movements[acc.code] = Decimal('0.0')
-    
-    # 收集损益类账户的代码
-    income_codes = [acc.code for acc in income_accounts]
-    cost_codes = [acc.code for acc in cost_accounts]
-    expense_codes = [acc.code for acc in expense_accounts]
-    
-    # 遍历所有凭证条目，汇总期间损益数据
-    for voucher in vouchers:
-        for entry in voucher.entries:
-            if entry.account_code in income_codes:
-                # 收入类账户的贷方发生额计入收入
-                total_income += entry.credit
-                account_movements[entry.account_code] += entry.credit
-            elif entry.account_code in cost_codes:
-                # 成本类账户的借方发生额计入成本
-                total_cost += entry.debit
-                account_movements[entry.account_code] += entry.debit
-            elif entry.account_code in expense_codes:
-                # 费用类账户的借方发生额计入费用
-                total_expense += entry.debit
-                account_movements[entry.account_code] += entry.debit
-    
-    # 计算利润
-    gross_profit = total_income - total_cost
-    net_profit = gross_profit - total_expense
-    
-    return render_template('report/profit_statement.html', 
-                         start_date=start_date, 
-                         end_date=end_date, 
-                         income_accounts=income_accounts, 
-                         expense_accounts=expense_accounts,
-                         cost_accounts=cost_accounts,
-                         account_movements=account_movements,
-                         total_income=total_income,
-                         total_cost=total_cost,
-                         total_expense=total_expense,
-                         gross_profit=gross_profit,
-                         net_profit=net_profit)
+    return render_template('report/profit_statement.html',
+                           **build_profit_statement(start_date, end_date, monthly=monthly, level=level))
+
+@report_job('cash_flow')
+@cached_report('cash_flow', lambda start_date, end_date: (None, end_date))
+def build_cash_flow(start_date, end_date):
+    """
+    现金流量表数据（直接法）
+    各项目金额为现金流量分类表的分组汇总，期初、期末现金余额取自总账
+    """
+    totals = cash_flow_totals(start_date, end_date)
+
+    # 按活动类别组织项目，流出金额以正数列示
+    activities = []
+    for activity, name in CASH_FLOW_ACTIVITIES:
+        lines = [(label, abs(totals.get(item, ZERO)), direction)
+                 for item, item_activity, direction, label in CASH_FLOW_ITEMS if item_activity == activity]
+        inflow = sum((amount for _, amount, direction in lines if direction == 'in'), ZERO)
+        outflow = sum((amount for _, amount, direction in lines if direction == 'out'), ZERO)
+        activities.append(dict(key=activity, name=name, lines=lines,
+                               inflow=inflow, outflow=outflow, net=inflow - outflow))
+    net_flows = {activity['key']: activity['net'] for activity in activities}
+
+    operating_cash_flow = net_flows['operating']
+    investing_cash_flow = net_flows['investing']
+    financing_cash_flow = net_flows['financing']
+    net_cash_flow = operating_cash_flow + investing_cash_flow + financing_cash_flow
+
+    # 期初、期末现金及现金等价物余额（现金、银行存款科目及其下级科目在开始日前一天和结束日的总账余额）
+    chart = get_chart()
+    cash_accounts = [chart.get(code) for code in sorted(cash_account_codes(chart))]
+    beginning_cash = sum(balances_as_of(cash_accounts, start_date - timedelta(days=1)).values(), ZERO)
+    ending_cash = sum(balances_as_of(cash_accounts, end_date).values(), ZERO)
+
+    return dict(
+        start_date=start_date,
+        end_date=end_date,
+        activities=activities,
+        operating_cash_flow=operating_cash_flow,
+        investing_cash_flow=investing_cash_flow,
+        financing_cash_flow=financing_cash_flow,
+        net_cash_flow=net_cash_flow,
+        beginning_cash=beginning_cash,
+        ending_cash=ending_cash)
 
 # 现金流量表
 @main_bp.route('/report/cash_flow', methods=['GET', 'POST'])
@@ -211,101 +293,19 @@ def cash_flow():
         end_date = date(today.year, today.month, 1) + timedelta(days=32)
         end_date = end_date.replace(day=1) - timedelta(days=1)
     
-    # 这里简化处理，实际应该基于现金科目计算
-    # 假设现金和银行存款科目
-    cash_accounts = Account.query.filter(
-        Account.code.like('1001%') | Account.code.like('1002%'),
-        Account.is_deleted == False
-    ).all()
-    
-    # 获取期间内的凭证
-    vouchers = Voucher.query.filter(
-        Voucher.date >= start_date,
-        Voucher.date <= end_date,
-        Voucher.status == 'posted',
-        Voucher.is_deleted == False
-    ).all()
-    
-    # 计算经营活动、投资活动、筹资活动的现金流量
-    # 正确的方法：基于现金类科目（1001、1002）的实际变动计算
-    cash_sales = Decimal('0.0')  # 销售商品收到的现金
-    cash_expenses = Decimal('0.0')  # 支付的经营费用
-    investing_cash = Decimal('0.0')  # 投资活动现金流量
-    financing_cash = Decimal('0.0')  # 筹资活动现金流量
-    
-    for voucher in vouchers:
-        for entry in voucher.entries:
-            account = entry.account
-            if not account:
-                continue
-                
-            # 现金流入：现金/银行存款科目的借方
-            if account.code in ['1001', '1002'] and entry.debit > 0:
-                # 查找对应的贷方科目，判断现金流入的性质
-                credit_entry = None
-                for e in voucher.entries:
-                    if e.credit > 0 and e != entry:
-                        credit_entry = e
-                        break
-                
-                if credit_entry:
-                    credit_account = credit_entry.account
-                    if credit_account:
-                        if credit_account.type == 'income':
-                            # 销售商品收到的现金（经营活动流入）
-                            cash_sales += entry.debit
-                        elif credit_account.type == 'equity':
-                            # 筹资活动流入
-                            financing_cash += entry.debit
-                        elif credit_account.type == 'liability':
-                            # 筹资活动流入（借款）
-                            financing_cash += entry.debit
-            
-            # 现金流出：现金/银行存款科目的贷方
-            elif account.code in ['1001', '1002'] and entry.credit > 0:
-                # 查找对应的借方科目，判断现金流出的性质
-                debit_entry = None
-                for e in voucher.entries:
-                    if e.debit > 0 and e != entry:
-                        debit_entry = e
-                        break
-                
-                if debit_entry:
-                    debit_account = debit_entry.account
-                    if debit_account:
-                        if debit_account.type in ['expense', 'cost']:
-                            # 支付经营费用（经营活动流出）
-                            cash_expenses += entry.credit
-                        elif debit_account.type == 'asset' and (debit_account.code.startswith('15') or debit_account.code.startswith('16')):
-                            # 投资活动流出（购买长期资产）
-                            investing_cash -= entry.credit
-    
-    # 计算各活动现金流量净额
-    operating_cash_flow = cash_sales - cash_expenses
-    investing_cash_flow = investing_cash
-    financing_cash_flow = financing_cash
-    
-    net_cash_flow = operating_cash_flow + investing_cash_flow + financing_cash_flow
-    
-    # 计算期初和期末现金余额
-    if cash_accounts:
-        beginning_cash = sum(account.balance for account in cash_accounts) - net_cash_flow
-        ending_cash = sum(account.balance for account in cash_accounts)
-    else:
-        beginning_cash = Decimal('0.0')
-        ending_cash = net_cash_flow
-    
-    return render_template('report/cash_flow.html', 
-                         start_date=start_date, 
-                         end_date=end_date, 
-                         cash_sales=cash_sales,
-                         cash_expenses=cash_expenses,
-                         operating_cash_flow=operating_cash_flow,
-                         investing_cash_flow=investing_cash_flow,
-                         financing_cash_flow=financing_cash_flow,
-                         net_cash_flow=net_cash_flow,
-                         beginning_cash=beginning_cash,
-                         ending_cash=ending_cash)
+    return render_template('report/cash_flow.html', **build_cash_flow(start_date, end_date))
+
+@report_job('account_balance')
+@cached_report('account_balance', lambda report_date, **params: (None, report_date))
+def build_account_balance(report_date, level=None):
+    """
+    科目余额表数据
+    """
+    return dict(
+        report_date=report_date,
+        level=level,
+        max_level=get_chart().max_level,
+        accounts=_balance_lines(report_date, level)[0])
 
 # 科目余额表
 @main_bp.route('/report/account_balance', methods=['GET', 'POST'])
@@ -314,50 +314,240 @@ def account_balance():
     """科目余额表"""
     if request.method == 'POST':
         report_date = datetime.strptime(request.form['report_date'], '%Y-%m-%d').date()
+        level = _level(request.form.get('level'))
         flash(f'报表已生成，日期: {report_date}', 'success')
     else:
         report_date = date.today()
+        level = None
     
-    # 获取所有会计科目
-    accounts = Account.query.filter_by(is_deleted=False).order_by(Account.code).all()
-    
-    # 查询报告日期之前的所有已过账凭证
-    vouchers = Voucher.query.filter(
-        Voucher.date <= report_date,
-        Voucher.status == 'posted',
-        Voucher.is_deleted == False
-    ).all()
-    
-    # 计算每个科目的历史余额
-    account_balances = {}
-    
-    # 初始化所有科目的余额为0
-    for account in accounts:
-        account_balances[account.code] = Decimal('0.0')
-    
-    # 根据凭证计算每个科目的历史余额
-    for voucher in vouchers:
-        for entry in voucher.entries:
-            if entry.account_code in account_balances:
-                # 资产、费用、成本类科目：借方增加，贷方减少
-                # 负债、所有者权益、收入类科目：贷方增加，借方减少
-                account = next(a for a in accounts if a.code == entry.account_code)
-                if account.type in ['asset', 'expense', 'cost']:
-                    account_balances[entry.account_code] += entry.debit - entry.credit
-                else:
-                    account_balances[entry.account_code] += entry.credit - entry.debit
-    
-    # 将计算出的历史余额添加到账户对象中
-    for account in accounts:
-        account.calculated_balance = account_balances[account.code]
-    
-    return render_template('report/account_balance.html', 
-                         report_date=report_date, 
-                         accounts=accounts)
+    return render_template('report/account_balance.html', **build_account_balance(report_date, level))
+
+# 报表后台任务
+
+# 报表名称 -> (页面模板, 报表页面的视图)
+REPORT_PAGES = {
+    'balance_sheet': ('report/balance_sheet.html', 'main.balance_sheet'),
+    'profit_statement': ('report/profit_statement.html', 'main.profit_statement'),
+    'cash_flow': ('report/cash_flow.html', 'main.cash_flow'),
+    'account_balance': ('report/account_balance.html', 'main.account_balance'),
+}
+
+def _submit_job(report, **params):
+    """提交报表后台任务，跳转到任务页面；排队已满时返回报表页面"""
+    try:
+        job = submit_report_job(report, params, user_id=session.get('user_id'))
+    except ValueError as e:
+        db.session.rollback()
+        flash(str(e), 'danger')
+        return redirect(url_for(REPORT_PAGES[report][1]))
+    return redirect(url_for('main.report_job_page', id=job.id))
+
+def _get_job(id):
+    """读取报表任务，只有提交人和管理员可以查看"""
+    job = ReportJob.query.get_or_404(id)
+    if job.user_id != session.get('user_id') and session.get('role') != 'admin':
+        abort(404)
+    if expire_stale_job(job, current_app.config.get('REPORT_JOB_TIMEOUT')):
+        db.session.commit()
+    return job
+
+@main_bp.route('/report/job/<int:id>')
+@login_required
+def report_job_page(id):
+    """报表任务：已完成时按保存的报表数据显示报表，未完成时显示任务状态并定时刷新"""
+    job = _get_job(id)
+    if job.status == 'done':
+        return render_template(REPORT_PAGES[job.report][0], job=job, **job_result(job))
+    return render_template('report/job.html', job=job, info=job_as_dict(job),
+                           report_url=url_for(REPORT_PAGES[job.report][1]))
+
+@main_bp.route('/report/job/<int:id>/status')
+@login_required
+def report_job_status(id):
+    """报表任务状态（JSON），供页面轮询"""
+    return jsonify(job_as_dict(_get_job(id)))
+
+@main_bp.route('/report/job/<int:id>/cancel', methods=['POST'])
+@login_required
+def report_job_cancel(id):
+    """取消排队中或生成中的报表任务"""
+    job = _get_job(id)
+    if get_job_queue().cancel(job):
+        flash('报表任务已取消', 'success')
+    else:
+        flash('报表任务已结束，不能取消', 'warning')
+    return redirect(url_for('main.report_job_page', id=job.id))
 
 # 报表列表
 @main_bp.route('/report/list')
 @login_required
 def report_list():
     """报表列表"""
-    return render_template('report/list.html')
+    return render_template('report/list.html', accounts=get_chart().accounts)
+
+# 报表导出
+
+def _arg_date(name, default):
+    """读取查询参数中的日期，缺省或格式错误时使用默认值"""
+    value = request.args.get(name)
+    if value:
+        try:
+            return datetime.strptime(value, '%Y-%m-%d').date()
+        except ValueError:
+            pass
+    return default
+
+def _current_month():
+    """当前月份的第一天和最后一天"""
+    today = date.today()
+    start_date = date(today.year, today.month, 1)
+    end_date = (start_date + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    return start_date, end_date
+
+def _account_rows(category, accounts):
+    return [(category, account.code, account.name, account.calculated_balance) for account in accounts]
+
+def _balance_sheet_export():
+    report_date = _arg_date('report_date', _current_month()[1])
+    data = build_balance_sheet(report_date, _level(request.args.get('level')))
+    rows = _account_rows('资产', data['assets'])
+    rows.append(('资产合计', '', '', data['total_assets']))
+    rows += _account_rows('负债', data['liabilities'])
+    rows.append(('负债合计', '', '', data['total_liabilities']))
+    rows += _account_rows('所有者权益', data['equity'])
+    rows.append(('本年利润', '', '', data['current_profit']))
+    rows.append(('所有者权益合计', '', '', data['adjusted_equity']))
+    rows.append(('负债和所有者权益合计', '', '', data['adjusted_total']))
+    return f'资产负债表_{report_date}', ('项目', '科目编码', '科目名称', '期末余额'), rows
+
+def _profit_statement_export():
+    default_start, default_end = _current_month()
+    start_date = _arg_date('start_date', default_start)
+    end_date = _arg_date('end_date', default_end)
+    data = build_profit_statement(start_date, end_date, monthly=bool(request.args.get('monthly')),
+                                  level=_level(request.args.get('level')))
+    periods = data['periods']
+    movements = data['account_movements']
+    monthly_movements = data['monthly_movements']
+    period_totals = data['period_totals']
+
+    def lines(category, accounts):
+        return [(category, account.code, account.name,
+                 *(monthly_movements[account.code][period] for period in periods),
+                 movements[account.code]) for account in accounts]
+
+    def total(label, key, amount):
+        return (label, '', '', *(period_totals[key][period] for period in periods), amount)
+
+    rows = lines('营业收入', data['income_accounts'])
+    rows.append(total('营业收入合计', 'income', data['total_income']))
+    rows += lines('营业成本', data['cost_accounts'])
+    rows.append(total('营业成本合计', 'cost', data['total_cost']))
+    rows.append(total('营业毛利', 'gross_profit', data['gross_profit']))
+    rows += lines('营业费用', data['expense_accounts'])
+    rows.append(total('营业费用合计', 'expense', data['total_expense']))
+    rows.append(total('净利润', 'net_profit', data['net_profit']))
+    headers = ('项目', '科目编码', '科目名称', *(f'{period[:4]}-{period[4:]}' for period in periods), '本期金额')
+    return f'利润表_{start_date}_{end_date}', headers, rows
+
+def _cash_flow_export():
+    default_start, default_end = _current_month()
+    start_date = _arg_date('start_date', default_start)
+    end_date = _arg_date('end_date', default_end)
+    data = build_cash_flow(start_date, end_date)
+    rows = []
+    for activity in data['activities']:
+        rows += [(label, amount) for label, amount, _ in activity['lines']]
+        rows.append((f"{activity['name']}现金流入小计", activity['inflow']))
+        rows.append((f"{activity['name']}现金流出小计", activity['outflow']))
+        rows.append((f"{activity['name']}产生的现金流量净额", activity['net']))
+    rows += [
+        ('现金及现金等价物净增加额', data['net_cash_flow']),
+        ('期初现金及现金等价物余额', data['beginning_cash']),
+        ('期末现金及现金等价物余额', data['ending_cash']),
+    ]
+    return f'现金流量表_{start_date}_{end_date}', ('项目', '金额'), rows
+
+def _account_balance_export():
+    report_date = _arg_date('report_date', date.today())
+    data = build_account_balance(report_date, _level(request.args.get('level')))
+    rows = [(account.code, account.name, account.type, account.calculated_balance)
+            for account in data['accounts']]
+    return f'科目余额表_{report_date}', ('科目编码', '科目名称', '科目类型', '余额'), rows
+
+REPORT_EXPORTS = {
+    'balance_sheet': _balance_sheet_export,
+    'profit_statement': _profit_statement_export,
+    'cash_flow': _cash_flow_export,
+    'account_balance': _account_balance_export,
+}
+
+@main_bp.route('/report/<report>/export')
+@login_required
+def report_export(report):
+    """导出报表，参数与报表页面相同，format为csv或xlsx"""
+    if report not in REPORT_EXPORTS:
+        abort(404)
+    export_format = request.args.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        abort(400)
+    filename, headers, rows = REPORT_EXPORTS[report]()
+    return export_response(filename, headers, rows, export_format)
+
+@main_bp.route('/report/general_ledger/export')
+@login_required
+def general_ledger_export():
+    """导出科目明细账：科目在期间内的全部已过账分录，边查询边下载"""
+    account = get_chart().get(request.args.get('account_code', ''))
+    if account is None:
+        abort(404)
+    export_format = request.args.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        abort(400)
+    start_date = _arg_date('start_date', None)
+    end_date = _arg_date('end_date', None)
+    headers = ('日期', '凭证编号', '摘要', '分录说明', '借方', '贷方', '余额')
+    rows = general_ledger_entries(account, start_date, end_date)
+    filename = f'明细账_{account.code}_{account.name}_{start_date or "期初"}_{end_date or "至今"}'
+    return export_response(filename, headers, rows, export_format)
+
+# 科目明细账页面
+
+def build_account_ledger(account, start_date, end_date, include_children=False, after=None, before=None):
+    """
+    科目明细账数据：期初、期末余额和按游标分页的已过账分录（含逐笔余额）
+    游标无效时从第一页开始
+    """
+    try:
+        page = ledger_page(account, start_date, end_date, after=after, before=before,
+                           include_children=include_children)
+    except ValueError:
+        page = ledger_page(account, start_date, end_date, include_children=include_children)
+    accounts = ledger_accounts(account, include_children)
+    return dict(
+        account=account,
+        start_date=start_date,
+        end_date=end_date,
+        include_children=include_children,
+        page=page,
+        opening_balance=ledger_balance(accounts, start_date - timedelta(days=1)),
+        closing_balance=ledger_balance(accounts, end_date))
+
+# 科目明细账
+@main_bp.route('/report/account_ledger')
+@login_required
+def account_ledger():
+    """科目明细账，默认显示当前月份"""
+    chart = get_chart()
+    account_code = request.args.get('account_code')
+    account = chart.get(account_code) if account_code else (chart.accounts[0] if chart.accounts else None)
+    if account is None:
+        abort(404)
+    default_start, default_end = _current_month()
+    data = build_account_ledger(account,
+                                _arg_date('start_date', default_start),
+                                _arg_date('end_date', default_end),
+                                include_children=bool(request.args.get('include_children')),
+                                after=request.args.get('after'),
+                                before=request.args.get('before'))
+    return render_template('report/account_ledger.html', accounts=chart.accounts, **data)
@@ -5,9 +5,13 @@
 """
 
 from flask import render_template, request, redirect, url_for, flash, session
+from sqlalchemy.orm import joinedload, selectinload
 from app.models import db, Customer, SalesOrder, SalesOrderItem, Voucher, VoucherEntry
 from app.views import main_bp
 from app.utils.auth import login_required, admin_required
+from app.utils.pagination import paginate_list
+from app.utils.dashboard import status_changed
+from app.utils.money import ZERO, multiply, parse_decimal, parse_money
 from datetime import datetime
 import uuid
 
@@ -17,8 +21,12 @@ import uuid
 @login_required
 def customer_list():
     """客户列表"""
-    customers = Customer.query.filter_by(is_deleted=False).all()
-    return render_template('sales/customer_list.html', customers=customers)
+    page, filters = paginate_list(
+        Customer.query.filter_by(is_deleted=False),
+        (Customer.create_time, Customer.id),
+        date_column=Customer.create_time
+    )
+    return render_template('sales/customer_list.html', customers=page.items, page=page, filters=filters)
 
 @main_bp.route('/sales/customer/add', methods=['GET', 'POST'])
 @login_required
@@ -33,7 +41,7 @@ def customer_add():
                 email=request.form.get('email'),
                 address=request.form.get('address'),
                 tax_number=request.form.get('tax_number'),
-                credit_limit=float(request.form.get('credit_limit', 0))
+                credit_limit=parse_money(request.form.get('credit_limit'), '信用额度')
             )
             db.session.add(customer)
             db.session.commit()
@@ -57,7 +65,7 @@ def customer_edit(id):
             customer.email = request.form.get('email')
             customer.address = request.form.get('address')
             customer.tax_number = request.form.get('tax_number')
-            customer.credit_limit = float(request.form.get('credit_limit', 0))
+            customer.credit_limit = parse_money(request.form.get('credit_limit'), '信用额度')
             db.session.commit()
             flash('客户编辑成功！', 'success')
             return redirect(url_for('main.customer_list'))
@@ -87,8 +95,13 @@ def customer_delete(id):
 @login_required
 def sales_order_list():
     """销售订单列表"""
-    orders = SalesOrder.query.filter_by(is_deleted=False).all()
-    return render_template('sales/order_list.html', orders=orders)
+    page, filters = paginate_list(
+        SalesOrder.query.options(joinedload(SalesOrder.customer)).filter_by(is_deleted=False),
+        (SalesOrder.create_time, SalesOrder.id),
+        status_column=SalesOrder.status,
+        date_column=SalesOrder.create_time
+    )
+    return render_template('sales/order_list.html', orders=page.items, page=page, filters=filters)
 
 @main_bp.route('/sales/order/add', methods=['GET', 'POST'])
 @login_required
@@ -97,7 +110,7 @@ def sales_order_add():
     if request.method == 'POST':
         try:
             customer_id = request.form['customer_id']
-            tax_rate = float(request.form['tax_rate'])
+            tax_rate = parse_decimal(request.form['tax_rate'], '税率')
             payment_method = request.form['payment_method']
             order_number = f"SO{datetime.now().strftime('%Y%m%d%H%M%S')}{uuid.uuid4().hex[:8].upper()}"
             
@@ -106,13 +119,13 @@ def sales_order_add():
             quantities = request.form.getlist('quantity[]')
             unit_prices = request.form.getlist('unit_price[]')
             
-            total_amount = 0
+            total_amount = ZERO
             items = []
             for item_name, quantity, unit_price in zip(item_names, quantities, unit_prices):
                 if item_name and quantity and unit_price:
-                    quantity = float(quantity)
-                    unit_price = float(unit_price)
-                    amount = quantity * unit_price
+                    quantity = parse_decimal(quantity, '数量')
+                    unit_price = parse_money(unit_price, '单价')
+                    amount = multiply(quantity, unit_price)
                     total_amount += amount
                     item = SalesOrderItem(
                         item_name=item_name,
@@ -123,7 +136,7 @@ def sales_order_add():
                     items.append(item)
             
             # 计算税额
-            tax_amount = total_amount * tax_rate
+            tax_amount = multiply(total_amount, tax_rate)
             
             # 创建订单
             order = SalesOrder(
@@ -143,6 +156,7 @@ def sales_order_add():
             
             db.session.add(order)
             db.session.commit()
+            status_changed('orders', None, 'pending')
             flash('销售订单添加成功！', 'success')
             return redirect(url_for('main.sales_order_list'))
         except Exception as e:
@@ -156,7 +170,10 @@ def sales_order_add():
 @login_required
 def sales_order_view(id):
     """查看销售订单详情"""
-    order = SalesOrder.query.get_or_404(id)
+    order = SalesOrder.query.options(
+        joinedload(SalesOrder.customer),
+        selectinload(SalesOrder.items)
+    ).get_or_404(id)
     return render_template('sales/order_view.html', order=order)
 
 @main_bp.route('/sales/order/approve/<int:id>')
@@ -166,10 +183,12 @@ def sales_order_approve(id):
     """审批销售订单"""
     try:
         order = SalesOrder.query.get_or_404(id)
+        old_status = order.status
         order.status = 'approved'
         order.approval_id = session['user_id']  # 使用当前登录用户ID
         order.approval_time = datetime.now()
         db.session.commit()
+        status_changed('orders', old_status, 'approved')
         flash('销售订单审批成功！', 'success')
     except Exception as e:
         db.session.rollback()
@@ -182,9 +201,11 @@ def sales_order_complete(id):
     """完成销售订单"""
     try:
         order = SalesOrder.query.get_or_404(id)
+        old_status = order.status
         order.status = 'completed'
         order.payment_time = datetime.now()
         db.session.commit()
+        status_changed('orders', old_status, 'completed')
         flash('销售订单已完成！', 'success')
     except Exception as e:
         db.session.rollback()
@@ -197,8 +218,10 @@ def sales_order_cancel(id):
     """取消销售订单"""
     try:
         order = SalesOrder.query.get_or_404(id)
+        old_status = order.status
         order.status = 'cancelled'
         db.session.commit()
+        status_changed('orders', old_status, 'cancelled')
         flash('销售订单已取消！', 'success')
     except Exception as e:
         db.session.rollback()
@@ -8,6 +8,8 @@ from flask import render_template, request, redirect, url_for, flash, session
 from app.models import db, Tax
 from app.views import main_bp
 from app.utils.auth import login_required, admin_required
+from app.utils.pagination import paginate_list
+from app.utils.money import parse_money
 from datetime import datetime
 
 # 税务列表
@@ -15,8 +17,12 @@ from datetime import datetime
 @login_required
 def tax_list():
     """税务列表"""
-    taxes = Tax.query.filter_by(is_deleted=False).order_by(Tax.tax_period.desc(), Tax.tax_type).all()
-    return render_template('tax/list.html', taxes=taxes)
+    page, filters = paginate_list(
+        Tax.query.filter_by(is_deleted=False),
+        (Tax.tax_period, Tax.id),
+        status_column=Tax.status
+    )
+    return render_template('tax/list.html', taxes=page.items, page=page, filters=filters)
 
 # 添加税务申报
 @main_bp.route('/tax/add', methods=['GET', 'POST'])
@@ -27,7 +33,7 @@ def tax_add():
         try:
             tax_type = request.form['tax_type']
             tax_period = request.form['tax_period']
-            amount = float(request.form['amount'])
+            amount = parse_money(request.form['amount'], '申报金额')
             
             # 创建新税务申报
             new_tax = Tax(
@@ -66,7 +72,7 @@ def tax_edit(id):
             
             tax.tax_type = request.form['tax_type']
             tax.tax_period = request.form['tax_period']
-            tax.amount = float(request.form['amount'])
+            tax.amount = parse_money(request.form['amount'], '申报金额')
             
             db.session.commit()
             
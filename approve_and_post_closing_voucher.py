@@ -8,6 +8,7 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from app import create_app, db
 from app.models import Voucher
+from app.utils.ledger import post_vouchers
 
 app = create_app()
 
@@ -32,19 +33,10 @@ with app.app_context():
         
         # 过账凭证
         if closing_voucher.status == 'approved':
-            # 更新科目余额
-            for entry in closing_voucher.entries:
-                account = entry.account
-                if account:
-                    # 根据科目类型更新余额
-                    if account.type in ['asset', 'expense', 'cost']:
-                        account.balance += entry.debit - entry.credit
-                    else:  # liability, equity, income
-                        account.balance += entry.credit - entry.debit
-            
-            closing_voucher.status = 'posted'
-            closing_voucher.post_time = db.func.now()
+            # 更新科目余额、凭证状态和科目期间余额
+            post_vouchers(voucher_ids=[closing_voucher.id])
             db.session.commit()
+            db.session.refresh(closing_voucher)
             print("凭证过账成功！")
         
         print("\n结转凭证处理完成！")
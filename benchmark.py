@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+性能基准测试脚本
+在已知规模的SQLite数据集上，通过Flask测试客户端计时报表、仪表盘、过账和列表页面，
+统计每个请求的SQL语句数；另在新的Python进程中计时导入应用包和创建应用（启动耗时）。
+结果写入JSON，并与保存的基线比较
+
+用法：
+    python benchmark.py --profile small                 # 运行并与 benchmark_baseline.json 比较
+    python benchmark.py --profile medium --repeat 10
+    python benchmark.py --profile small --update-baseline
+存在回退（耗时超出容差或SQL语句数增加）时退出码为1
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from app import create_app
+from app.models import db, User, Voucher, VoucherEntry
+from app.utils.cache import get_cache
+from app.utils.datagen import PROFILES, generate_dataset
+from app.utils.profiler import count_queries
+from app.utils.schema import upgrade_schema
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 生成的数据集缓存目录，相同档位和种子只生成一次
+DATASET_DIR = os.path.join(BASE_DIR, '.benchmark')
+DEFAULT_BASELINE = os.path.join(BASE_DIR, 'benchmark_baseline.json')
+DEFAULT_OUTPUT = os.path.join(BASE_DIR, 'benchmark_results.json')
+
+# 耗时超过基线的比例（且超过绝对噪声下限）视为回退
+DEFAULT_TOLERANCE = 0.25
+NOISE_FLOOR_MS = 5.0
+
+
+def _create_app(database):
+    app = create_app()
+    app.config.update(
+        TESTING=True,
+        SQLALCHEMY_DATABASE_URI=f'sqlite:///{database}',
+        SLOW_REQUEST_LOG=None,
+        TRIAL_BALANCE_INTERVAL=0,
+    )
+    return app
+
+
+def prepare_dataset(profile, seed, vouchers=None, dataset_dir=DATASET_DIR):
+    """
+    生成（或复用已缓存的）数据集
+    :return: (数据库文件路径, 数据集信息)
+    """
+    name = f'{profile}_seed{seed}' + (f'_v{vouchers}' if vouchers else '')
+    database = os.path.join(dataset_dir, f'{name}.db')
+    info_path = os.path.join(dataset_dir, f'{name}.json')
+    if os.path.exists(database) and os.path.exists(info_path):
+        with open(info_path, encoding='utf-8') as info_file:
+            return database, json.load(info_file)
+
+    os.makedirs(dataset_dir, exist_ok=True)
+    for path in (database, info_path):
+        if os.path.exists(path):
+            os.remove(path)
+
+    app = _create_app(database)
+    with app.app_context():
+        db.create_all()
+        from app.views.company import generate_default_accounts
+        generate_default_accounts()
+        stats = generate_dataset(profile, seed=seed, vouchers=vouchers,
+                                 progress=lambda message: print(f'  {message}', file=sys.stderr))
+        db.session.remove()
+        db.engine.dispose()
+
+    info = dict(stats, profile=profile, seed=seed,
+                start_date=stats['start_date'].isoformat(), end_date=stats['end_date'].isoformat())
+    with open(info_path, 'w', encoding='utf-8') as info_file:
+        json.dump(info, info_file, ensure_ascii=False, indent=2)
+    return database, info
+
+
+def benchmark_cases(end_date):
+    """
+    基准测试用例：(名称, 方法, URL, 表单数据, 每次请求前是否清空缓存)
+    报表日期以数据集截止日期为准
+    """
+    year_start = (end_date - timedelta(days=364)).isoformat()
+    month_start = end_date.replace(day=1).isoformat()
+    end = end_date.isoformat()
+    return [
+        ('balance_sheet', 'POST', '/report/balance_sheet', {'report_date': end}, False),
+        ('profit_statement', 'POST', '/report/profit_statement', {'start_date': month_start, 'end_date': end}, False),
+        ('profit_statement_monthly', 'POST', '/report/profit_statement',
+         {'start_date': year_start, 'end_date': end, 'monthly': '1'}, False),
+        ('cash_flow', 'POST', '/report/cash_flow', {'start_date': year_start, 'end_date': end}, False),
+        ('account_balance', 'POST', '/report/account_balance', {'report_date': end}, False),
+        ('dashboard', 'GET', '/dashboard', None, True),
+        ('dashboard_cached', 'GET', '/dashboard', None, False),
+        ('voucher_list', 'GET', '/voucher/list', None, False),
+        ('voucher_list_deep', 'GET', '/voucher/list?page=200', None, False),
+        ('account_list', 'GET', '/account/list', None, False),
+        ('purchase_order_list', 'GET', '/purchase/order/list', None, False),
+        ('sales_order_list', 'GET', '/sales/order/list', None, False),
+        ('expense_list', 'GET', '/expense/list', None, False),
+    ]
+
+
+def _measure(client, method, url, data, clear_cache):
+    if clear_cache:
+        get_cache().clear()
+    with count_queries() as counter:
+        started = time.perf_counter()
+        response = client.open(url, method=method, data=data)
+        elapsed = (time.perf_counter() - started) * 1000
+    return response.status_code, elapsed, counter.count
+
+
+def _summary(status, timings, queries):
+    """status为HTTP状态码，启动耗时等非请求用例为0"""
+    return {
+        'status': status,
+        'median_ms': round(statistics.median(timings), 2),
+        'min_ms': round(min(timings), 2),
+        'max_ms': round(max(timings), 2),
+        'queries': queries,
+        'runs': len(timings),
+    }
+
+
+def _approved_vouchers(user, voucher_date, count):
+    """创建count张审核通过的销售收款凭证，返回ID列表"""
+    vouchers = []
+    for index in range(count):
+        voucher = Voucher(voucher_number=f'BENCH{voucher_date:%Y%m%d}{index:06d}', date=voucher_date,
+                          summary='基准测试过账', status='approved', user_id=user.id)
+        voucher.entries = [
+            VoucherEntry(account_code='1002', debit=Decimal('113.00'), credit=Decimal('0.00')),
+            VoucherEntry(account_code='6001', debit=Decimal('0.00'), credit=Decimal('100.00')),
+            VoucherEntry(account_code='2221', debit=Decimal('0.00'), credit=Decimal('13.00')),
+        ]
+        vouchers.append(voucher)
+    db.session.add_all(vouchers)
+    db.session.commit()
+    return [voucher.id for voucher in vouchers]
+
+
+def run_benchmarks(database, info, repeat=5):
+    """
+    在数据集副本上运行全部用例（过账会修改数据，不改动缓存的数据集）
+    :return: {用例名称: 统计结果}
+    """
+    workdir = tempfile.mkdtemp(prefix='finance-bench-')
+    copy = os.path.join(workdir, 'bench.db')
+    shutil.copyfile(database, copy)
+    try:
+        app = _create_app(copy)
+        results = {}
+        with app.app_context():
+            # 缓存的数据集可能由旧版本生成，补建新增的表和索引
+            upgrade_schema()
+            admin = User.query.filter_by(role='admin', is_deleted=False).first()
+            client = app.test_client()
+            with client.session_transaction() as sess:
+                sess['user_id'] = admin.id
+                sess['username'] = admin.username
+                sess['role'] = admin.role
+
+            end_date = date.fromisoformat(info['end_date'])
+            for name, method, url, data, clear_cache in benchmark_cases(end_date):
+                _measure(client, method, url, data, clear_cache)  # 预热
+                timings, statuses, queries = [], set(), 0
+                for _ in range(repeat):
+                    status, elapsed, queries = _measure(client, method, url, data, clear_cache)
+                    timings.append(elapsed)
+                    statuses.add(status)
+                results[name] = _summary(max(statuses), timings, queries)
+
+            # 逐张过账审核通过的凭证（另行创建，不依赖数据集中的凭证状态）
+            approved = _approved_vouchers(admin, end_date, repeat)
+            timings, statuses, queries = [], set(), 0
+            for voucher_id in approved:
+                status, elapsed, queries = _measure(client, 'GET', f'/voucher/post/{voucher_id}', None, False)
+                timings.append(elapsed)
+                statuses.add(status)
+            results['voucher_post'] = _summary(max(statuses), timings, queries)
+            db.session.remove()
+            db.engine.dispose()
+        return results
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+# 在新进程中执行：导入应用包、创建应用，输出耗时和创建应用时执行的SQL语句数
+STARTUP_SCRIPT = """
+import json, time
+started = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+from app.utils.profiler import count_queries
+with count_queries() as counter:
+    created_started = time.perf_counter()
+    create_app()
+    created = time.perf_counter()
+print(json.dumps({'import_ms': (imported - started) * 1000, 'create_app_ms': (created - created_started) * 1000,
+                  'queries': counter.count}))
+"""
+
+
+def measure_startup(database, repeat=5):
+    """
+    启动耗时：每次启动一个新的Python进程（与gunicorn工作进程、flask命令启动时相同）
+    :return: {'startup_import': 统计结果, 'startup_create_app': 统计结果}
+    """
+    env = dict(os.environ, DATABASE_URL=f'sqlite:///{database}', FINANCE_CONFIG='default')
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', STARTUP_SCRIPT], cwd=BASE_DIR, env=env,
+                                check=True, capture_output=True, text=True).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    return {
+        'startup_import': _summary(0, [run['import_ms'] for run in runs], 0),
+        'startup_create_app': _summary(0, [run['create_app_ms'] for run in runs], runs[-1]['queries']),
+    }
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    与基线比较
+    :return: [(用例名称, 说明)] 回退列表
+    """
+    regressions = []
+    for name, base in baseline.get('results', {}).items():
+        current = results.get(name)
+        if current is None:
+            regressions.append((name, '用例缺失'))
+            continue
+        if current['status'] >= 400:
+            regressions.append((name, f"状态码 {current['status']}"))
+        if current['queries'] > base['queries']:
+            regressions.append((name, f"SQL语句数 {base['queries']} -> {current['queries']}"))
+        limit = max(base['median_ms'] * (1 + tolerance), base['median_ms'] + NOISE_FLOOR_MS)
+        if current['median_ms'] > limit:
+            regressions.append((name, f"中位耗时 {base['median_ms']:.1f}ms -> {current['median_ms']:.1f}ms"))
+    return regressions
+
+
+def format_table(results, baseline=None):
+    base_results = (baseline or {}).get('results', {})
+    lines = [f"{'用例':<26}{'中位(ms)':>12}{'基线(ms)':>12}{'变化':>9}{'SQL':>6}{'状态':>6}"]
+    for name, result in results.items():
+        base = base_results.get(name)
+        base_ms = f"{base['median_ms']:.1f}" if base else '-'
+        change = f"{(result['median_ms'] / base['median_ms'] - 1) * 100:+.0f}%" if base and base['median_ms'] else '-'
+        lines.append(f"{name:<28}{result['median_ms']:>12.1f}{base_ms:>12}{change:>10}"
+                     f"{result['queries']:>6}{result['status']:>7}")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='财务系统性能基准测试')
+    parser.add_argument('--profile', choices=list(PROFILES), default='small', help='数据集规模')
+    parser.add_argument('--seed', type=int, default=42, help='数据集随机种子')
+    parser.add_argument('--vouchers', type=int, help='覆盖档位中的凭证数')
+    parser.add_argument('--repeat', type=int, default=5, help='每个用例的计时次数（另有一次预热）')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help='结果JSON文件')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='基线JSON文件')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help='耗时容差比例')
+    parser.add_argument('--update-baseline', action='store_true', help='将本次结果保存为基线')
+    args = parser.parse_args(argv)
+
+    database, info = prepare_dataset(args.profile, args.seed, args.vouchers)
+    results = run_benchmarks(database, info, repeat=args.repeat)
+    results.update(measure_startup(database, repeat=args.repeat))
+
+    report = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'dataset': {key: info[key] for key in ('profile', 'seed', 'start_date', 'end_date', 'vouchers', 'entries')},
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as output:
+        json.dump(report, output, ensure_ascii=False, indent=2)
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)
+        if baseline['dataset']['profile'] != args.profile or baseline['dataset']['vouchers'] != info['vouchers']:
+            print(f"基线数据集（{baseline['dataset']['profile']}，{baseline['dataset']['vouchers']} 张凭证）"
+                  f"与本次不同，不做比较")
+            baseline = None
+
+    print(f"数据集 {args.profile}：凭证 {info['vouchers']} 张，分录 {info['entries']} 条")
+    print(format_table(results, baseline))
+    print(f'结果已写入 {args.output}')
+
+    if args.update_baseline:
+        shutil.copyfile(args.output, args.baseline)
+        print(f'已更新基线 {args.baseline}')
+        return 0
+    if baseline:
+        regressions = compare(results, baseline, args.tolerance)
+        for name, message in regressions:
+            print(f'回退：{name} {message}')
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
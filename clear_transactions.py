@@ -4,34 +4,48 @@
 删除历史交易记录脚本
 """
 
-from app import app
-from app.models import db, Expense, Voucher, VoucherEntry, Account
+from app import create_app
+from app.models import db, Expense, Voucher, VoucherEntry, Account, AccountPeriodBalance, CashFlowEntry
+from app.utils.report_cache import touch_ledger
+
+app = create_app()
 
 def clear_transactions():
     """删除所有交易记录"""
     with app.app_context():
         try:
-            # 1. 删除所有凭证分录
+            # 1. 删除现金流量分类（引用凭证和凭证分录）
+            cash_flow_count = CashFlowEntry.query.delete()
+            print(f"已删除 {cash_flow_count} 条现金流量分类记录")
+            
+            # 2. 删除所有凭证分录
             voucher_entry_count = VoucherEntry.query.count()
             VoucherEntry.query.delete()
             print(f"已删除 {voucher_entry_count} 条凭证分录")
             
-            # 2. 删除所有凭证
+            # 3. 删除所有凭证
             voucher_count = Voucher.query.count()
             Voucher.query.delete()
             print(f"已删除 {voucher_count} 张凭证")
             
-            # 3. 删除所有费用报销
+            # 4. 删除所有费用报销
             expense_count = Expense.query.count()
             Expense.query.delete()
             print(f"已删除 {expense_count} 条费用报销记录")
             
-            # 4. 重置会计科目余额
+            # 5. 删除科目期间余额快照（批量删除不经过ORM，报表按快照计算余额）
+            period_count = AccountPeriodBalance.query.delete()
+            print(f"已删除 {period_count} 条科目期间余额记录")
+            
+            # 6. 会计科目余额恢复为初始余额
             accounts = Account.query.all()
             for account in accounts:
-                account.balance = 0.0
+                account.balance = account.opening_balance
             print(f"已重置 {len(accounts)} 个会计科目的余额")
             
+            # 7. 使全部报表缓存失效（批量删除不触发ORM事件）
+            touch_ledger(db.session.connection())
+            
             # 提交更改
             db.session.commit()
             print("所有交易记录已成功删除！")
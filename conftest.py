@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+pytest公共夹具：基于临时SQLite数据库的应用实例和测试数据
+"""
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+from app import create_app
+from app.models import db, Account, User, Voucher, VoucherEntry
+
+
+@pytest.fixture
+def app(tmp_path):
+    """使用临时数据库的应用实例"""
+    app = create_app('testing')
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'test.db'}",
+        SLOW_REQUEST_LOG=str(tmp_path / 'slow_requests.log'),
+    )
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+
+
+@pytest.fixture
+def admin(app):
+    """管理员用户"""
+    user = User(username='admin', password=generate_password_hash('123456'),
+                real_name='系统管理员', role='admin')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+@pytest.fixture
+def client(app, admin):
+    """已登录管理员的测试客户端"""
+    client = app.test_client()
+    with client.session_transaction() as sess:
+        sess['user_id'] = admin.id
+        sess['username'] = admin.username
+        sess['role'] = admin.role
+    return client
+
+
+@pytest.fixture
+def accounts(app):
+    """默认会计科目表"""
+    from app.views.company import generate_default_accounts
+    generate_default_accounts()
+    return {account.code: account for account in Account.query.all()}
+
+
+def make_voucher(user, voucher_date, lines, status='posted', number=None):
+    """
+    创建凭证
+    :param lines: [(科目编码, 借方, 贷方)]
+    """
+    voucher = Voucher(
+        voucher_number=number or f"VOU{Voucher.query.count() + 1:08d}",
+        date=voucher_date,
+        summary='测试凭证',
+        status=status,
+        user_id=user.id
+    )
+    for code, debit, credit in lines:
+        voucher.entries.append(VoucherEntry(account_code=code,
+                                            debit=Decimal(str(debit)),
+                                            credit=Decimal(str(credit))))
+    db.session.add(voucher)
+    db.session.commit()
+    return voucher
+
+
+@pytest.fixture
+def ledger(app, admin, accounts):
+    """一组跨月份的已过账凭证"""
+    make_voucher(admin, date(2024, 1, 5), [('1002', 100000, 0), ('4001', 0, 100000)])
+    make_voucher(admin, date(2024, 1, 20), [('6602', 1200.50, 0), ('1001', 0, 1200.50)])
+    make_voucher(admin, date(2024, 2, 10), [('1122', 5650, 0), ('6001', 0, 5000), ('2221', 0, 650)])
+    make_voucher(admin, date(2024, 2, 28), [('1002', 5650, 0), ('1122', 0, 5650)])
+    make_voucher(admin, date(2024, 3, 3), [('1601', 30000, 0), ('1002', 0, 30000)])
+    make_voucher(admin, date(2024, 3, 15), [('6001', 99, 0), ('1002', 0, 99)], status='approved')
+    return accounts
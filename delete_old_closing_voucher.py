@@ -7,7 +7,8 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from app import create_app, db
-from app.models import Voucher
+from app.models import CashFlowEntry, Voucher
+from app.utils.ledger import rebuild_account_balances, rebuild_period_balances
 
 app = create_app()
 
@@ -22,12 +23,17 @@ with app.app_context():
             
         for voucher in closing_vouchers:
             print(f"删除凭证：ID={voucher.id}, 编号={voucher.voucher_number}, 状态={voucher.status}")
-            # 先删除凭证分录
+            # 先删除现金流量分类和凭证分录
+            CashFlowEntry.query.filter_by(voucher_id=voucher.id).delete(synchronize_session=False)
             for entry in voucher.entries:
                 db.session.delete(entry)
             # 再删除凭证
             db.session.delete(voucher)
+        db.session.flush()
         
+        # 已过账凭证的发生额已计入科目余额和期间余额：按剩余凭证重算（期间余额重建同时使报表缓存失效）
+        rebuild_account_balances()
+        rebuild_period_balances()
         db.session.commit()
         print(f"\n成功删除 {len(closing_vouchers)} 个结转凭证！")
         
@@ -1,105 +0,0 @@
-#!/usr/bin/env python3
-# -*- coding: utf-8 -*-
-"""
-修复资产负债表不平衡问题的脚本
-"""
-
-from app import create_app, db
-from app.models import Account
-
-# 创建Flask应用实例
-app = create_app()
-
-with app.app_context():
-    # 1. 获取所有账户
-    all_accounts = Account.query.all()
-    
-    print("=== 修复前账户余额 ===")
-    for account in all_accounts:
-        print(f"{account.code} - {account.name} ({account.type}): {account.balance:.2f}")
-    
-    # 2. 定义目标余额
-    # 确保资产 = 负债 + 所有者权益
-    target_balances = {
-        # 资产类科目 (Asset)
-        '1001': 10000.00,    # 库存现金
-        '1002': 120000.00,   # 银行存款
-        '1122': 50000.00,    # 应收账款
-        '1221': 0.00,        # 其他应收款
-        '1403': 0.00,        # 原材料
-        '1405': 0.00,        # 库存商品
-        '1601': 20000.00,    # 固定资产
-        '1602': 0.00,        # 累计折旧
-        
-        # 负债类科目 (Liability)
-        '2001': 30000.00,    # 短期借款
-        '2202': 0.00,        # 应付账款
-        '2211': 0.00,        # 应付职工薪酬
-        '2221': 10000.00,    # 应交税费
-        '2241': 0.00,        # 其他应付款
-        
-        # 所有者权益类科目 (Equity)
-        '4001': 150000.00,   # 实收资本
-        '4101': 10000.00,    # 盈余公积
-        '4103': 0.00,        # 本年利润
-        '4104': 0.00,        # 利润分配
-        
-        # 收入类科目 (Income)
-        '6001': 0.00,        # 主营业务收入
-        '6051': 0.00,        # 其他业务收入
-        '6301': 0.00,        # 营业外收入
-        
-        # 费用类科目 (Expense)
-        '6601': 0.00,        # 销售费用
-        '6602': 0.00,        # 管理费用
-        '6603': 0.00,        # 财务费用
-        '6711': 0.00,        # 营业外支出
-        
-        # 成本类科目 (Cost)
-        '5001': 0.00,        # 生产成本
-        '5101': 0.00,        # 制造费用
-    }
-    
-    # 3. 更新账户余额
-    for account in all_accounts:
-        if account.code in target_balances:
-            account.balance = target_balances[account.code]
-    
-    # 4. 保存更改
-    db.session.commit()
-    
-    print("\n=== 修复后账户余额 ===")
-    
-    # 5. 计算各类科目总余额
-    asset_total = sum(acc.balance for acc in Account.query.filter_by(type='asset').all())
-    liability_total = sum(acc.balance for acc in Account.query.filter_by(type='liability').all())
-    equity_total = sum(acc.balance for acc in Account.query.filter_by(type='equity').all())
-    income_total = sum(acc.balance for acc in Account.query.filter_by(type='income').all())
-    expense_total = sum(acc.balance for acc in Account.query.filter_by(type='expense').all())
-    cost_total = sum(acc.balance for acc in Account.query.filter_by(type='cost').all())
-    
-    print(f"资产总计: {asset_total:.2f}")
-    print(f"负债总计: {liability_total:.2f}")
-    print(f"所有者权益总计: {equity_total:.2f}")
-    print(f"收入总计: {income_total:.2f}")
-    print(f"费用总计: {expense_total:.2f}")
-    print(f"成本总计: {cost_total:.2f}")
-    
-    # 6. 验证资产负债表平衡
-    current_profit = income_total - expense_total - cost_total
-    adjusted_total = liability_total + equity_total + current_profit
-    
-    print(f"\n=== 资产负债表平衡检查 ===")
-    print(f"资产总计: {asset_total:.2f}")
-    print(f"负债+所有者权益: {liability_total + equity_total:.2f}")
-    print(f"本年利润: {current_profit:.2f}")
-    print(f"调整后总计: {adjusted_total:.2f}")
-    
-    if abs(asset_total - adjusted_total) < 0.01:
-        print("✅ 资产负债表平衡！")
-    else:
-        print(f"❌ 资产负债表不平衡，差额: {abs(asset_total - adjusted_total):.2f}")
-    
-    print("\n=== 修复完成 ===")
-    print("所有账户余额已重置为合理值，确保资产负债表平衡。")
-    print("您可以重新访问资产负债表页面查看修复结果。")
\ No newline at end of file
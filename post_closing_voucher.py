@@ -4,7 +4,8 @@ import os
 sys.path.append(os.path.abspath(os.path.dirname(__file__)))
 
 from app import create_app
-from app.models import db, Account, Voucher
+from app.models import db, Voucher
+from app.utils.ledger import post_vouchers
 from datetime import datetime
 
 app = create_app('development')
@@ -32,21 +33,10 @@ with app.app_context():
         db.session.commit()
         print(f"凭证已审核，状态：{closing_voucher.status}")
         
-        # 2. 过账凭证
-        closing_voucher.status = 'posted'
-        closing_voucher.post_time = datetime.now()
-        
-        # 更新账户余额
-        for entry in closing_voucher.entries:
-            account = Account.query.filter_by(code=entry.account_code).first()
-            if account:
-                # 根据科目类型更新余额
-                if account.type in ['asset', 'expense', 'cost']:
-                    account.balance += entry.debit - entry.credit
-                else:  # liability, equity, income
-                    account.balance += entry.credit - entry.debit
-        
+        # 2. 过账凭证：更新科目余额、凭证状态和科目期间余额
+        post_vouchers(voucher_ids=[closing_voucher.id])
         db.session.commit()
+        db.session.refresh(closing_voucher)
         print(f"凭证已过账，状态：{closing_voucher.status}")
         print("结转完成！")
         
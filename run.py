@@ -1,10 +1,13 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """
-应用启动文件
+应用启动文件（开发服务器）
+首次运行前执行 flask db init 创建数据库表
 """
 
-from app import app
+from app import create_app
+
+app = create_app()
 
 if __name__ == '__main__':
-    app.run(debug=True, host='127.0.0.1', port=5000)
\ No newline at end of file
+    app.run(debug=True, host='127.0.0.1', port=5000)
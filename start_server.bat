@@ -7,6 +7,7 @@ echo.
 echo Starting server...
 echo Please do not close this window
 echo.
+python -m flask db init
 python run.py
 echo.
 echo Server stopped
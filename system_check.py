@@ -11,7 +11,7 @@ from datetime import date, timedelta
 from decimal import Decimal
 
 # 添加项目根目录到Python路径
-sys.path.append('E:\trae项目\finance')
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from app import create_app
 from app.models import db, Account, Voucher
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试分页的科目明细账及逐笔余额
+"""
+
+import re
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+
+from app.utils.chart import get_chart
+from app.utils.ledger import general_ledger_entries, ledger_page, rebuild_period_balances
+from app.utils.profiler import count_queries
+from conftest import make_voucher
+
+
+@pytest.fixture
+def busy_account(app, admin, accounts):
+    """银行存款及其明细科目跨三个月的收付款，每天两张凭证"""
+    for i in range(60):
+        day = date(2024, 1, 1) + timedelta(days=i)
+        make_voucher(admin, day, [('1002', 100 + i, 0), ('6001', 0, 100 + i)])
+        make_voucher(admin, day, [('6602', 30, 0), ('1002', 0, 20), ('100201', 0, 10)])
+    rebuild_period_balances()
+    return get_chart().get('1002')
+
+
+def walk(account, start_date=None, end_date=None, **kwargs):
+    pages = [ledger_page(account, start_date, end_date, per_page=7, **kwargs)]
+    while pages[-1].has_next:
+        pages.append(ledger_page(account, start_date, end_date, after=pages[-1].next_cursor, per_page=7, **kwargs))
+    return pages
+
+
+def test_pages_match_streamed_ledger(busy_account):
+    start_date, end_date = date(2024, 1, 10), date(2024, 2, 20)
+    pages = walk(busy_account, start_date, end_date)
+    lines = [line for page in pages for line in page]
+    streamed = list(general_ledger_entries(busy_account, start_date, end_date))[1:-1]
+    assert len(lines) == len(streamed) == 84
+    assert [(line.date, line.voucher_number, line.debit, line.credit, line.balance) for line in lines] == [
+        (row[0], row[1], row[4], row[5], row[6]) for row in streamed]
+    assert not pages[0].has_prev and not pages[-1].has_next
+
+    # 从最后一页向前翻，余额与向后翻时相同
+    back = ledger_page(busy_account, start_date, end_date, before=pages[-1].prev_cursor, per_page=7)
+    assert list(back) == list(pages[-2])
+    assert back.has_prev and back.has_next
+
+
+def test_page_cost_does_not_grow_with_depth(busy_account):
+    pages = walk(busy_account)
+    with count_queries() as first:
+        ledger_page(busy_account, per_page=7)
+    with count_queries() as last:
+        ledger_page(busy_account, before=pages[-1].prev_cursor, per_page=7)
+    assert first.count == last.count
+
+
+def test_ledger_includes_sub_accounts(busy_account):
+    lines = [line for page in walk(busy_account, include_children=True) for line in page]
+    assert len(lines) == 180
+    assert {line.account_code for line in lines} == {'1002', '100201'}
+    assert lines[-1].balance == sum(Decimal(100 + i) for i in range(60)) - 60 * 30
+
+
+def test_ledger_page(client, busy_account):
+    html = client.get('/report/account_ledger?account_code=1002&start_date=2024-02-01&end_date=2024-02-29'
+                      ).get_data(as_text=True)
+    assert '期初余额' in html and '2945.00' in html  # 1月份余额：100 + ... + 130 - 31 × 20
+    next_link = re.search(r'href="(/report/account_ledger\?[^"]*after=[^"]+)"', html).group(1)
+    assert client.get(next_link.replace('&amp;', '&')).status_code == 200
+    assert client.get('/report/account_ledger?account_code=1002&after=bad').status_code == 200
+    assert client.get('/report/account_ledger?account_code=9999').status_code == 404
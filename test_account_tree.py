@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试科目树（路径、级次）、按级次汇总的报表和下级现金科目
+"""
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from app.models import db, Account, CashFlowEntry, Voucher
+from app.utils.chart import get_chart, tree_paths
+from app.utils.ledger import post_vouchers
+from app.utils.profiler import count_queries
+from app.views.report import build_account_balance, build_balance_sheet, build_cash_flow, build_profit_statement
+from conftest import make_voucher
+
+
+def test_tree_paths_and_levels(app, accounts):
+    assert tree_paths({'1': None, '11': '1', '111': '11', 'a': 'b', 'b': 'a', 'x': 'missing'}) == {
+        '1': '1', '11': '1/11', '111': '1/11/111', 'a': 'b/a', 'b': 'b', 'x': 'x'}
+
+    chart = get_chart()
+    assert chart.get('100201').path == '1002/100201' and chart.get('100201').level == 2
+    assert chart.max_level == 2
+    codes = [account.code for account in chart.accounts]
+    assert codes.index('1002') < codes.index('100201') < codes.index('100202') < codes.index('1122')
+    assert [account.code for account in chart.subtree('1002')] == ['1002', '100201', '100202']
+    assert chart.rollup({'100201': Decimal('1'), '100202': Decimal('2'), '1002': Decimal('4')})['1002'] == 7
+
+
+@pytest.mark.parametrize('code, parent_code, account_type, message', [
+    ('100203', '9999', 'asset', '不存在'),
+    ('100203', '1002', 'liability', '类型'),
+    ('1002', '100201', 'asset', '本科目或其下级科目'),
+    ('1002', '1002', 'asset', '本科目或其下级科目'),
+])
+def test_validate_parent(app, accounts, code, parent_code, account_type, message):
+    with pytest.raises(ValueError, match=message):
+        get_chart().validate_parent(code, parent_code, account_type)
+
+
+def test_account_edit_rejects_cycle(client, accounts):
+    account = Account.query.filter_by(code='1002').one()
+    response = client.post(f'/account/edit/{account.id}', data={
+        'name': '银行存款', 'type': 'asset', 'parent_code': '100201', 'description': ''}, follow_redirects=True)
+    assert '上级科目不能是本科目或其下级科目' in response.get_data(as_text=True)
+    assert Account.query.filter_by(code='1002').one().parent_code is None
+
+
+def test_reports_roll_up_sub_accounts(app, admin, accounts):
+    make_voucher(admin, date(2024, 1, 5), [('100201', 600, 0), ('100202', 400, 0), ('4001', 0, 1000)])
+    make_voucher(admin, date(2024, 1, 9), [('6602', 50, 0), ('100202', 0, 50)])
+    get_chart()
+
+    with count_queries() as counter:
+        full = build_balance_sheet(date(2024, 1, 31))
+    with count_queries() as collapsed_counter:
+        collapsed = build_balance_sheet(date(2024, 1, 31), level=1)
+    assert collapsed_counter.count == counter.count
+
+    lines = {line.code: line.calculated_balance for line in full['assets']}
+    assert lines['1002'] == Decimal('950.00')
+    assert (lines['100201'], lines['100202']) == (Decimal('600.00'), Decimal('350.00'))
+    # 合计不重复计算下级科目，与展开级次无关
+    assert full['total_assets'] == collapsed['total_assets'] == Decimal('950.00')
+    assert all(line.level == 1 for line in collapsed['assets'])
+    assert '1002' in {line.code for line in collapsed['assets']}
+
+    balances = build_account_balance(date(2024, 1, 31), level=1)
+    assert '100201' not in {line.code for line in balances['accounts']}
+
+    profit = build_profit_statement(date(2024, 1, 1), date(2024, 1, 31), level=1)
+    assert profit['max_level'] == 2 and profit['total_expense'] == Decimal('50.00')
+
+
+def test_cash_sub_account_without_prefix(app, admin, accounts):
+    # 编码不以1001/1002开头、但在科目树中位于银行存款下的明细科目
+    db.session.add(Account(code='1099', name='银行存款-保证金户', type='asset', parent_code='1002'))
+    db.session.commit()
+    voucher = make_voucher(admin, date(2024, 1, 5), [('1099', 800, 0), ('6001', 0, 800)], status='approved')
+    post_vouchers(voucher_ids=[voucher.id])
+    db.session.commit()
+
+    entry = CashFlowEntry.query.filter_by(voucher_id=voucher.id).one()
+    assert (entry.cash_account_code, entry.amount) == ('1099', Decimal('800.00'))
+    data = build_cash_flow(date(2024, 1, 1), date(2024, 1, 31))
+    assert data['operating_cash_flow'] == data['ending_cash'] == Decimal('800.00')
+    assert Voucher.query.get(voucher.id).status == 'posted'
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试性能基准测试脚本
+"""
+
+import json
+
+import benchmark
+
+
+def test_benchmark_runs_and_compares(tmp_path):
+    database, info = benchmark.prepare_dataset('small', seed=1, vouchers=300, dataset_dir=str(tmp_path))
+    assert info['vouchers'] == 300
+    # 再次调用复用缓存的数据集
+    assert benchmark.prepare_dataset('small', seed=1, vouchers=300, dataset_dir=str(tmp_path))[1] == info
+
+    results = benchmark.run_benchmarks(database, info, repeat=1)
+    assert {'balance_sheet', 'profit_statement', 'cash_flow', 'account_balance', 'dashboard',
+            'voucher_list', 'voucher_post'} <= set(results)
+    assert all(result['status'] < 400 for result in results.values())
+    assert results['dashboard_cached']['queries'] == 0
+
+    baseline = {'results': json.loads(json.dumps(results))}
+    assert benchmark.compare(results, baseline) == []
+
+    baseline['results']['cash_flow']['queries'] -= 1
+    baseline['results']['balance_sheet']['median_ms'] = 0.01
+    baseline['results']['missing'] = dict(results['dashboard'])
+    assert {name for name, _ in benchmark.compare(results, baseline)} == {'cash_flow', 'balance_sheet', 'missing'}
+
+
+def test_benchmark_main_writes_results(tmp_path, monkeypatch):
+    monkeypatch.setattr(benchmark, 'DATASET_DIR', str(tmp_path))
+    output, baseline = tmp_path / 'results.json', tmp_path / 'baseline.json'
+    args = ['--vouchers', '200', '--repeat', '1', '--output', str(output), '--baseline', str(baseline)]
+    assert benchmark.main(args + ['--update-baseline']) == 0
+    report = json.loads(output.read_text(encoding='utf-8'))
+    assert report['dataset']['vouchers'] == 200
+    # 创建应用时不再建表，不执行SQL
+    assert report['results']['startup_create_app']['queries'] == 0
+    assert json.loads(baseline.read_text(encoding='utf-8'))['results'] == report['results']
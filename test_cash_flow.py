@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试现金流量分类记录及现金流量表
+"""
+
+from datetime import date
+from decimal import Decimal
+
+from app.models import db, Account, CashFlowEntry, Voucher
+from app.utils.cash_flow import voucher_cash_flows
+from app.utils.chart import get_chart
+from app.utils.ledger import post_vouchers
+from app.utils.profiler import count_queries
+from app.views.report import build_cash_flow
+
+
+def flows(*lines):
+    entries = [(index, code, account_type, Decimal(debit), Decimal(credit))
+               for index, (code, account_type, debit, credit) in enumerate(lines, start=1)]
+    return [(code, counterpart, item, amount) for _, code, counterpart, item, amount in voucher_cash_flows(entries)]
+
+
+def test_cash_entries_are_split_by_counterpart():
+    # 现销：价款和销项税额都计入销售商品收到的现金
+    assert flows(('1002', 'asset', '5650', '0'),
+                 ('6001', 'income', '0', '5000'),
+                 ('2221', 'liability', '0', '650')) == [
+        ('1002', '6001', 'sales_receipts', Decimal('5000.00')),
+        ('1002', '2221', 'sales_receipts', Decimal('650.00')),
+    ]
+    # 按对方科目金额比例分摊，尾差计入最后一项
+    assert flows(('6602', 'expense', '1', '0'),
+                 ('1601', 'asset', '2', '0'),
+                 ('1001', 'asset', '0', '1')) == [
+        ('1001', '6602', 'other_operating_payments', Decimal('-0.33')),
+        ('1001', '1601', 'investing_payments', Decimal('-0.67')),
+    ]
+    # 现金科目之间划转不产生现金流量
+    assert flows(('1001', 'asset', '500', '0'), ('100201', 'asset', '0', '500')) == []
+
+
+def test_posting_classifies_cash_entries(app, ledger):
+    voucher_id = Voucher.query.filter_by(status='approved').one().id
+    get_chart()
+    with count_queries() as counter:
+        post_vouchers(voucher_ids=[voucher_id])
+        db.session.commit()
+    # 科目类型取自科目表缓存，分类时不再连接科目表
+    assert not [sql for sql in counter.statements if 'JOIN account ' in sql]
+
+    entry = CashFlowEntry.query.filter_by(voucher_id=voucher_id).one()
+    assert (entry.cash_account_code, entry.counterpart_code) == ('1002', '6001')
+    assert (entry.activity, entry.item, entry.amount) == ('operating', 'other_operating_payments', Decimal('-99.00'))
+
+
+def test_cash_flow_report(app, ledger):
+    # 夹具凭证直接以已过账状态写入，先生成分类记录
+    result = app.test_cli_runner().invoke(args=['ledger', 'rebuild-cash-flow'])
+    assert '已生成 4 条现金流量分类记录' in result.output
+
+    data = build_cash_flow(date(2024, 2, 1), date(2024, 3, 31))
+    activities = {activity['key']: activity for activity in data['activities']}
+    assert activities['operating']['lines'][0] == ('销售商品、提供劳务收到的现金', Decimal('5650.00'), 'in')
+    assert data['operating_cash_flow'] == Decimal('5650.00')
+    assert activities['investing']['outflow'] == Decimal('30000.00')
+    assert data['financing_cash_flow'] == Decimal('0.00')
+    # 期初余额取自总账，与期末余额之差等于现金净增加额
+    assert data['beginning_cash'] == Decimal('98799.50')
+    assert data['ending_cash'] == Decimal('74449.50')
+    assert data['beginning_cash'] + data['net_cash_flow'] == data['ending_cash']
+
+    january = build_cash_flow(date(2024, 1, 1), date(2024, 1, 31))
+    assert january['financing_cash_flow'] == Decimal('100000.00')
+    assert january['operating_cash_flow'] == Decimal('-1200.50')
+
+
+def test_cash_flow_page(client, ledger):
+    client.application.test_cli_runner().invoke(args=['ledger', 'rebuild-cash-flow'])
+    response = client.post('/report/cash_flow', data={'start_date': '2024-01-01', 'end_date': '2024-03-31'})
+    text = response.get_data(as_text=True)
+    assert response.status_code == 200
+    assert '筹资活动现金流入小计' in text and '100000.00' in text and '74449.50' in text
+
+
+def test_cash_flow_page_skips_deleted_cash_account(client, ledger):
+    # 已删除的现金明细科目不参与期初、期末现金余额
+    client.get(f"/account/delete/{ledger['100202'].id}")
+    assert db.session.get(Account, ledger['100202'].id).is_deleted
+    response = client.post('/report/cash_flow', data={'start_date': '2024-01-01', 'end_date': '2024-03-31'})
+    assert response.status_code == 200 and '74449.50' in response.get_data(as_text=True)
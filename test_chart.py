@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试进程内科目表缓存及其版本号失效
+"""
+
+from datetime import date
+from decimal import Decimal
+
+from app import create_app
+from app.models import db, Account, Expense, Voucher
+from app.utils.ledger import compute_balances
+from app.utils.chart import chart_version, get_chart
+from app.utils.profiler import count_queries
+
+
+def test_chart_indexes_accounts(app, accounts):
+    chart = get_chart()
+    assert [account.code for account in chart.accounts] == sorted(accounts)
+    assert chart.get('100201').parent_code == '1002'
+    assert [account.code for account in chart.children_of('1002')] == ['100201', '100202']
+    assert all(account.type == 'income' for account in chart.of_type('income'))
+    assert chart.types['6602'] == 'expense'
+    assert chart.get('9999') is None
+
+    # 同一上下文内不再查询
+    with count_queries() as counter:
+        assert get_chart() is chart
+    assert counter.count == 0
+
+
+def test_chart_version_invalidates_other_workers(app, accounts):
+    version = chart_version()
+    assert version > 0
+
+    # 另一个工作进程：独立的应用实例和缓存，连接同一数据库
+    other = create_app('testing')
+    other.config.update(SQLALCHEMY_DATABASE_URI=app.config['SQLALCHEMY_DATABASE_URI'])
+    with other.app_context():
+        assert get_chart().get('1002').name == '银行存款'
+
+    # 只修改余额不影响科目表
+    Account.query.filter_by(code='1002').one().balance = Decimal('10.00')
+    db.session.commit()
+    assert chart_version() == version
+
+    Account.query.filter_by(code='1002').one().name = '银行存款（基本户）'
+    db.session.commit()
+    assert chart_version() == version + 1
+    assert get_chart().get('1002').name == '银行存款（基本户）'
+
+    with other.app_context():
+        with count_queries() as counter:
+            chart = get_chart()
+        assert counter.count == 2  # 版本号一次，重新加载科目表一次
+        assert chart.get('1002').name == '银行存款（基本户）'
+    with other.app_context():
+        with count_queries() as counter:
+            assert get_chart() is chart
+        assert counter.count == 1  # 版本未变，只查询版本号
+        db.session.remove()
+
+    db.session.add(Account(code='100203', name='招商银行', type='asset', parent_code='1002'))
+    db.session.commit()
+    assert [account.code for account in get_chart().children_of('1002')] == ['100201', '100202', '100203']
+
+
+def test_voucher_add_resolves_accounts_from_chart(client, accounts):
+    lines = {'date': '2024-01-05', 'summary': '多行凭证', 'entry_count': 10}
+    for i in range(9):
+        lines.update({f'account_code_{i}': '6602', f'debit_{i}': '10', f'credit_{i}': ''})
+    lines.update({'account_code_9': '1002', 'debit_9': '', 'credit_9': '90'})
+    get_chart()
+
+    with count_queries() as counter:
+        client.post('/voucher/add', data=lines)
+    assert Voucher.query.count() == 1
+    assert not [statement for statement in counter.statements if 'FROM account' in statement]
+
+    lines['account_code_9'] = '9999'
+    response = client.post('/voucher/add', data=lines, follow_redirects=True)
+    assert '第10行分录的科目不存在' in response.get_data(as_text=True)
+    assert Voucher.query.count() == 1
+
+
+def test_expense_pay_creates_missing_cash_account(client, admin, accounts):
+    # 科目表中没有库存现金科目：支付时在同一事务中创建，过账按资产类科目计算余额
+    db.session.delete(accounts['1001'])
+    db.session.add(Expense(expense_number='EXP001', user_id=admin.id, amount=Decimal('120.00'),
+                           expense_type='差旅费', status='approved'))
+    db.session.commit()
+    assert get_chart().get('1001') is None
+
+    expense_id = Expense.query.filter_by(expense_number='EXP001').one().id
+    client.get(f'/expense/pay/{expense_id}')
+    assert db.session.get(Expense, expense_id).status == 'paid'
+    cash = Account.query.filter_by(code='1001').one()
+    assert cash.balance == Decimal('-120.00')
+    assert get_chart().types['1001'] == 'asset'
+    assert compute_balances([cash], end_date=date.today())['1001'] == Decimal('-120.00')
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试总账数据检查（flask ledger check）
+"""
+
+import json
+from datetime import date
+from decimal import Decimal
+
+from app.models import db, Account
+from app.utils.checks import run_checks
+from conftest import make_voucher
+
+
+def run_check(app, *args):
+    result = app.test_cli_runner().invoke(args=['ledger', 'check', '--format', 'json', *args])
+    return result.exit_code, json.loads(result.stdout)
+
+
+def test_check_reports_all_checks_in_a_few_queries(app, ledger):
+    app.test_cli_runner().invoke(args=['ledger', 'rebuild'])
+
+    exit_code, report = run_check(app)
+    checks = {check['name']: check for check in report['checks']}
+    assert exit_code == 1 and not report['ok']
+    assert report['queries'] <= 15
+    assert [name for name, check in checks.items() if not check['ok']] == ['negative_cash']
+    # 库存现金只有支出，1月20日起为负数
+    assert checks['negative_cash']['issues'] == [{
+        'account_code': '1001', 'first_negative_date': '2024-01-20', 'lowest_balance': '-1200.50',
+        'lowest_date': '2024-01-20', 'balance': '-1200.50'}]
+    assert checks['trial_balance']['details']['total_debit'] == '142500.50'
+    assert checks['trial_balance']['details']['total_credit'] == '142500.50'
+
+    exit_code, report = run_check(app, '--only', 'trial_balance', '--only', 'unbalanced')
+    assert exit_code == 0 and [check['name'] for check in report['checks']] == ['unbalanced', 'trial_balance']
+
+
+def test_check_finds_ledger_problems(app, admin, ledger):
+    make_voucher(admin, date(2024, 3, 20), [('6602', 10, 0), ('1002', 0, 9)])
+    make_voucher(admin, date(2024, 3, 21), [('9999', 5, 0), ('1002', 0, 5)])
+    # 结转凭证只结转了收入，管理费用仍有余额
+    make_voucher(admin, date(2024, 3, 31), [('6001', 5000, 0), ('4001', 0, 5000)], number='CLOS20240331')
+    Account.query.filter_by(code='1002').update({Account.balance: Decimal('1.00')})
+    db.session.commit()
+
+    results = {result.name: result for result in run_checks()}
+    assert [issue['voucher_number'] for issue in results['unbalanced'].issues] == ['VOU00000007']
+    assert results['accounts'].issues == [{'account_code': '9999', 'entries': 1, 'message': '分录引用的科目不存在'}]
+    assert '1002' in {issue.get('account_code') for issue in results['balance_drift'].issues}
+    assert [(issue['account_code'], issue['balance']) for issue in results['closing'].issues] == [
+        ('6602', Decimal('1210.50'))]
+    assert results['trial_balance'].issues[0]['difference'] == Decimal('1.00')
+
+
+def test_check_text_output(app, ledger):
+    app.test_cli_runner().invoke(args=['ledger', 'rebuild'])
+    result = app.test_cli_runner().invoke(args=['ledger', 'check', '--only', 'negative_cash'])
+    assert result.exit_code == 1
+    assert '[失败] 现金余额非负' in result.output and 'first_negative_date=2024-01-20' in result.output
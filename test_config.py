@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试命名配置的选择、数据库连接池配置和数据库初始化命令
+"""
+
+from sqlalchemy.pool import QueuePool, StaticPool
+
+from app import create_app
+from app.config import DevelopmentConfig, ProductionConfig, TestingConfig
+from app.models import db
+
+
+def test_config_is_selected_by_name_or_environment(monkeypatch):
+    assert create_app('testing').config['TESTING']
+    assert create_app('unknown').config['DEBUG'] == DevelopmentConfig.DEBUG
+
+    monkeypatch.setenv('FINANCE_CONFIG', 'production')
+    app = create_app()
+    assert not app.debug and app.config['SQLITE_PRAGMAS'] == ProductionConfig.SQLITE_PRAGMAS
+
+
+def test_pool_options_apply_to_file_databases(tmp_path):
+    app = create_app('production')
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'pool.db'}"
+    with app.app_context():
+        pool = db.engine.pool
+        assert isinstance(pool, QueuePool) and pool.size() == 5 and pool._pre_ping
+        assert db.engine.pool._recycle == 1800
+        db.engine.dispose()
+
+    # 内存数据库只有一个连接，忽略连接池大小
+    app.config['SQLALCHEMY_DATABASE_URI'] = TestingConfig.SQLALCHEMY_DATABASE_URI
+    with app.app_context():
+        assert isinstance(db.engine.pool, StaticPool)
+        db.create_all()
+        assert db.session.execute(db.text('SELECT 1')).scalar() == 1
+
+
+def test_tables_are_created_by_db_init(tmp_path):
+    database = tmp_path / 'init.db'
+    app = create_app('testing')
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{database}'
+    # 创建应用不再建表
+    with app.app_context():
+        assert not db.inspect(db.engine).get_table_names()
+
+    result = app.test_cli_runner().invoke(args=['db', 'init'])
+    assert result.exit_code == 0 and '数据库初始化完成' in result.output
+    with app.app_context():
+        assert {'account', 'voucher', 'voucher_entry'} <= set(db.inspect(db.engine).get_table_names())
+        db.engine.dispose()
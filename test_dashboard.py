@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试仪表盘指标缓存及其增量更新
+"""
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from app.models import db, Expense, PurchaseOrder, Supplier
+from app.utils.cache import SimpleCache, get_cache
+from app.utils.dashboard import dashboard_metrics
+from app.utils.profiler import query_budget
+from conftest import make_voucher
+
+
+def fresh_metrics():
+    """清空缓存后重新计算的指标"""
+    get_cache().clear()
+    return dashboard_metrics()
+
+
+@pytest.fixture
+def month(client, admin, accounts):
+    """本月的已过账凭证和待处理单据"""
+    today = date.today()
+    make_voucher(admin, today, [('1002', 1000, 0), ('6001', 0, 1000)])
+    make_voucher(admin, today, [('6602', 300, 0), ('1001', 0, 300)])
+    make_voucher(admin, today, [('5001', 50, 0), ('1001', 0, 50)], status='draft')
+    make_voucher(admin, today, [('1001', 80, 0), ('6051', 0, 80)], status='approved')
+    supplier = Supplier(name='供应商', contact='张三', phone='13800000000')
+    db.session.add(PurchaseOrder(order_number='PO0001', supplier=supplier, total_amount=100,
+                                 tax_rate=13, tax_amount=13, payment_method='bank',
+                                 status='pending', user_id=admin.id))
+    db.session.add(Expense(expense_number='EXP0001', user_id=admin.id, amount=120,
+                           expense_type='差旅费', status='approved'))
+    db.session.commit()
+
+
+def test_simple_cache_expiry_and_update(monkeypatch):
+    cache = SimpleCache(default_timeout=10)
+    now = [100.0]
+    monkeypatch.setattr('app.utils.cache.time.monotonic', lambda: now[0])
+    cache.set('a', 1)
+    assert cache.update('a', lambda v: v + 1) == 2
+    assert cache.update('missing', lambda v: v + 1) is None
+    assert cache.get('missing') is None
+    now[0] = 110.0
+    assert cache.get('a') is None
+    cache.set('b', 1, timeout=0)
+    now[0] = 1e9
+    assert cache.get('b') == 1
+
+
+def test_dashboard_metrics(month):
+    metrics = fresh_metrics()
+    assert metrics['total_income'] == Decimal('1000.00')
+    assert metrics['total_expense'] == Decimal('300.00')
+    assert metrics['total_profit'] == Decimal('700.00')
+    assert metrics['total_pending'] == 2  # 1张待审批采购订单 + 1张草稿凭证
+    assert len(metrics['recent_transactions']) == 5
+
+
+def test_cached_dashboard_runs_no_queries(client, month):
+    assert client.get('/dashboard').status_code == 200
+    with query_budget(0):
+        response = client.get('/dashboard')
+    assert '1000.00' in response.get_data(as_text=True)
+
+
+def test_voucher_post_updates_cached_totals(client, month):
+    client.get('/dashboard')
+    voucher_id = db.session.execute(db.text("SELECT id FROM voucher WHERE status = 'approved'")).scalar()
+    client.get(f'/voucher/post/{voucher_id}')
+
+    cached = dashboard_metrics()
+    assert cached['total_income'] == Decimal('1080.00')
+    assert cached == fresh_metrics()
+
+
+def test_status_changes_update_pending_count(client, month):
+    client.get('/dashboard')
+    order_id = PurchaseOrder.query.filter_by(order_number='PO0001').one().id
+    client.get(f'/purchase/order/approve/{order_id}')
+    assert dashboard_metrics()['total_pending'] == 1
+
+    draft_id = db.session.execute(db.text("SELECT id FROM voucher WHERE status = 'draft'")).scalar()
+    client.get(f'/voucher/approve/{draft_id}')
+    assert dashboard_metrics()['total_pending'] == 0
+
+    client.post('/expense/add', data={'amount': '66', 'expense_type': '办公费'})
+    cached = dashboard_metrics()
+    assert cached['total_pending'] == 1
+    assert cached == fresh_metrics()
+
+
+def test_expense_pay_updates_cached_totals(client, month):
+    client.get('/dashboard')
+    expense_id = Expense.query.filter_by(expense_number='EXP0001').one().id
+    client.get(f'/expense/pay/{expense_id}')
+
+    cached = dashboard_metrics()
+    assert cached['total_expense'] == Decimal('420.00')
+    assert cached == fresh_metrics()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试压测数据生成
+"""
+
+from datetime import date
+
+from app.models import db, CashFlowEntry, Voucher, VoucherEntry
+from app.utils.cash_flow import rebuild_cash_flow_entries
+from app.utils.datagen import DatasetProfile, generate_dataset
+from app.utils.ledger import balance_drift, unbalanced_vouchers
+
+TINY = DatasetProfile(vouchers=400, years=2, users=3, suppliers=5, customers=5, orders=40, expenses=20)
+
+
+def ledger_fingerprint():
+    return db.session.query(Voucher.voucher_number, Voucher.date, Voucher.status,
+                            VoucherEntry.account_code, VoucherEntry.debit, VoucherEntry.credit).join(
+        VoucherEntry, VoucherEntry.voucher_id == Voucher.id).order_by(VoucherEntry.id).all()
+
+
+def test_generated_ledger_is_consistent(app, accounts):
+    stats = generate_dataset(TINY, seed=7, end_date=date(2024, 6, 30))
+    assert stats['start_date'] == date(2022, 7, 2)
+    assert Voucher.query.count() == 400
+    assert stats['entries'] == VoucherEntry.query.count() > 400 * 3
+
+    numbers = [number for number, in db.session.query(Voucher.voucher_number)]
+    assert len(set(numbers)) == len(numbers)
+    assert unbalanced_vouchers() == []
+    assert balance_drift() == []
+    # 生成时写入的现金流量分类与过账时的分类规则一致
+    assert rebuild_cash_flow_entries() == stats['cash_flow_entries'] == CashFlowEntry.query.count()
+
+    # 再次生成时编号不与已有数据冲突
+    generate_dataset(TINY, seed=7, end_date=date(2024, 6, 30))
+    assert db.session.query(Voucher.voucher_number).distinct().count() == 800
+
+
+def test_same_seed_generates_same_data(app, accounts):
+    generate_dataset(TINY, seed=7, end_date=date(2024, 6, 30))
+    first = ledger_fingerprint()
+    db.drop_all()
+    db.create_all()
+    from app.views.company import generate_default_accounts
+    generate_default_accounts()
+    generate_dataset(TINY, seed=7, end_date=date(2024, 6, 30))
+    assert ledger_fingerprint() == first
+
+    db.session.query(VoucherEntry).delete()
+    db.session.query(CashFlowEntry).delete()
+    db.session.query(Voucher).delete()
+    generate_dataset(TINY, seed=8, end_date=date(2024, 6, 30))
+    assert ledger_fingerprint() != first
+
+
+def test_generate_command(app):
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=['db', 'generate', '--vouchers', '10'])
+    assert result.exit_code != 0
+    assert '请先完成企业初始化' in result.output
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试报表和科目明细账的流式导出
+"""
+
+import csv
+import io
+import re
+import zipfile
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from app.models import Account
+from app.utils.export import stream_csv, stream_xlsx
+from app.utils.ledger import general_ledger_entries
+
+
+def read_csv(response):
+    text = response.get_data(as_text=True)
+    assert text.startswith('﻿')
+    return list(csv.reader(io.StringIO(text[1:])))
+
+
+def read_xlsx_rows(data):
+    """解析XLSX工作表，返回每行单元格文本"""
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        assert archive.testzip() is None
+        sheet = archive.read('xl/worksheets/sheet1.xml').decode('utf-8')
+    rows = []
+    for row in re.findall(r'<row r="\d+">(.*?)</row>', sheet):
+        rows.append(re.findall(r'<(?:v|t)>(.*?)</(?:v|t)>', row))
+    return rows
+
+
+def test_general_ledger_csv_has_running_balance(client, ledger):
+    response = client.get('/report/general_ledger/export',
+                          query_string={'account_code': '1002', 'start_date': '2024-02-01', 'end_date': '2024-03-31'})
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert 'filename*=UTF-8' in response.headers['Content-Disposition']
+
+    rows = read_csv(response)
+    assert rows[0] == ['日期', '凭证编号', '摘要', '分录说明', '借方', '贷方', '余额']
+    assert rows[1][2] == '期初余额' and rows[1][6] == '100000.00'
+    assert [row[6] for row in rows[2:-1]] == ['105650.00', '75650.00']
+    assert rows[-1][2:] == ['本期合计', '', '5650.00', '30000.00', '75650.00']
+
+
+def test_general_ledger_entries_are_lazy(ledger):
+    account = Account.query.filter_by(code='1002').one()
+    entries = general_ledger_entries(account, batch_size=1)
+    assert next(entries)[2] == '期初余额'
+    assert [row[6] for row in entries][-1] == Decimal('75650.00')
+
+
+def test_general_ledger_xlsx(client, ledger):
+    response = client.get('/report/general_ledger/export',
+                          query_string={'account_code': '1001', 'format': 'xlsx'})
+    assert response.status_code == 200
+    rows = read_xlsx_rows(response.get_data())
+    assert rows[0][0] == '日期'
+    assert rows[2][-3:] == ['0.00', '1200.50', '-1200.50']
+
+
+def test_stream_xlsx_yields_bounded_chunks():
+    rows = ((i, f'摘要<{i}>&', Decimal('1.50')) for i in range(20000))
+    chunks = list(stream_xlsx(('序号', '摘要', '金额'), rows, sheet_name='明细/测试'))
+    assert len(chunks) > 2
+    assert max(len(chunk) for chunk in chunks[:-1]) < 256 * 1024
+    parsed = read_xlsx_rows(b''.join(chunks))
+    assert len(parsed) == 20001
+    assert parsed[-1] == ['19999', '摘要&lt;19999&gt;&amp;', '1.50']
+
+
+def test_stream_csv_escapes_formula_text():
+    rows = [('=HYPERLINK("http://x")', '@SUM(A1)', '+1', '-2', Decimal('-1200.50'), date(2024, 1, 5), '正常摘要')]
+    data = b''.join(stream_csv(('a', 'b', 'c', 'd', '金额', '日期', '摘要'), rows)).decode('utf-8-sig')
+    parsed = list(csv.reader(io.StringIO(data)))
+    assert parsed[1] == ["'=HYPERLINK(\"http://x\")", "'@SUM(A1)", "'+1", "'-2", '-1200.50', '2024-01-05', '正常摘要']
+
+
+@pytest.mark.parametrize('report, params', [
+    ('balance_sheet', {'report_date': '2024-01-31'}),
+    ('profit_statement', {'start_date': '2024-01-01', 'end_date': '2024-03-31'}),
+    ('cash_flow', {'start_date': '2024-01-01', 'end_date': '2024-03-31'}),
+    ('account_balance', {'report_date': '2024-03-31'}),
+])
+def test_report_exports(client, ledger, report, params):
+    response = client.get(f'/report/{report}/export', query_string=params)
+    assert response.status_code == 200
+    assert len(read_csv(response)) > 2
+
+    response = client.get(f'/report/{report}/export', query_string=dict(params, format='xlsx'))
+    assert response.status_code == 200
+    assert len(read_xlsx_rows(response.get_data())) > 2
+
+
+def test_balance_sheet_export_totals(client, ledger):
+    rows = read_csv(client.get('/report/balance_sheet/export', query_string={'report_date': '2024-01-31'}))
+    totals = {row[0]: row[3] for row in rows if not row[1]}
+    assert totals['资产合计'] == '98799.50'
+    assert totals['负债和所有者权益合计'] == '98799.50'
+
+
+def test_export_rejects_unknown_report_and_format(client, ledger):
+    assert client.get('/report/unknown/export').status_code == 404
+    assert client.get('/report/cash_flow/export?format=pdf').status_code == 400
+    assert client.get('/report/general_ledger/export?account_code=9999').status_code == 404
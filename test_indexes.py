@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试总账热点查询的索引使用情况
+捕获业务代码实际执行的SQL，用EXPLAIN QUERY PLAN验证每个索引都被使用
+"""
+
+from contextlib import contextmanager
+from datetime import date
+
+from sqlalchemy import event, inspect
+
+from app.models import db, Expense, PurchaseOrder, SalesOrder, Voucher, VoucherEntry
+from app.utils.chart import get_chart
+from app.utils.ledger import ledger_page, posted_entry_totals
+from app.utils.pagination import keyset_paginate, encode_cursor
+from app.utils.schema import upgrade_schema
+
+
+@contextmanager
+def captured_sql():
+    """记录代码块内执行的SQL语句及参数"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+
+def query_plan(run):
+    """执行run()并返回其最后一条SQL的查询计划"""
+    with captured_sql() as statements:
+        run()
+    statement, parameters = statements[-1]
+    cursor = db.session.connection().connection.cursor()
+    rows = cursor.execute('EXPLAIN QUERY PLAN ' + statement, parameters).fetchall()
+    plan = '\n'.join(row[-1] for row in rows)
+    print(f'{statement}\n{plan}\n')
+    return plan
+
+
+def test_report_aggregation_uses_voucher_and_entry_indexes(app):
+    plan = query_plan(lambda: posted_entry_totals(end_date=date(2024, 12, 31)))
+    assert 'SEARCH voucher USING INDEX ix_voucher_status_date (status=? AND date<?)' in plan
+    assert 'SEARCH voucher_entry USING COVERING INDEX ix_voucher_entry_voucher_account (voucher_id=?)' in plan
+
+
+def test_period_aggregation_uses_status_date_range(app):
+    plan = query_plan(lambda: posted_entry_totals(start_date=date(2024, 1, 1), end_date=date(2024, 1, 31)))
+    assert 'SEARCH voucher USING INDEX ix_voucher_status_date (status=? AND date>? AND date<?)' in plan
+
+
+def test_account_lookup_uses_account_index(app):
+    plan = query_plan(lambda: VoucherEntry.query.filter_by(account_code='1001', is_deleted=False).first())
+    assert 'USING INDEX ix_voucher_entry_account_voucher (account_code=?)' in plan
+
+
+def test_dashboard_counts_use_partial_status_indexes(app):
+    plan = query_plan(lambda: Voucher.query.filter_by(status='draft', is_deleted=False).count())
+    assert 'USING INDEX ix_voucher_status_date (status=?)' in plan
+    plan = query_plan(lambda: Expense.query.filter_by(status='pending', is_deleted=False).count())
+    assert 'USING INDEX ix_expense_status (status=?)' in plan
+    plan = query_plan(lambda: PurchaseOrder.query.filter_by(status='pending', is_deleted=False).count())
+    assert 'USING INDEX ix_purchase_order_status (status=?)' in plan
+    plan = query_plan(lambda: SalesOrder.query.filter_by(status='pending', is_deleted=False).count())
+    assert 'USING INDEX ix_sales_order_status (status=?)' in plan
+
+
+def test_recent_items_use_partial_create_time_indexes(app):
+    plan = query_plan(lambda: Voucher.query.filter_by(is_deleted=False)
+                      .order_by(Voucher.create_time.desc()).limit(5).all())
+    assert 'SCAN voucher USING INDEX ix_voucher_create_time' in plan
+    assert 'TEMP B-TREE' not in plan
+    plan = query_plan(lambda: Expense.query.filter_by(is_deleted=False)
+                      .order_by(Expense.create_time.desc()).limit(5).all())
+    assert 'SCAN expense USING INDEX ix_expense_create_time' in plan
+
+
+def test_upgrade_schema_adds_missing_indexes(app):
+    db.session.execute(db.text('DROP INDEX ix_voucher_status_date'))
+    db.session.execute(db.text('DROP INDEX ix_voucher_entry_voucher_account'))
+    db.session.commit()
+
+    created = upgrade_schema()
+    assert sorted(created) == ['ix_voucher_entry_voucher_account', 'ix_voucher_status_date']
+    index_names = {index['name'] for index in inspect(db.engine).get_indexes('voucher')}
+    assert 'ix_voucher_status_date' in index_names
+    assert upgrade_schema() == []
+
+
+def test_upgrade_schema_adds_missing_columns(app, accounts):
+    db.session.execute(db.text('ALTER TABLE account DROP COLUMN opening_balance'))
+    db.session.commit()
+
+    assert upgrade_schema() == ['account.opening_balance']
+    assert {row[0] for row in db.session.execute(db.text('SELECT opening_balance FROM account'))} == {0}
+
+
+def test_voucher_list_page_seeks_on_date_id(app):
+    cursor = encode_cursor([date(2024, 6, 30), 1000])
+    with app.test_request_context():
+        plan = query_plan(lambda: keyset_paginate(Voucher.query.filter_by(is_deleted=False),
+                                                  (Voucher.date, Voucher.id), after=cursor))
+        assert 'SEARCH voucher USING INDEX ix_voucher_date (date<?)' in plan
+        assert 'TEMP B-TREE' not in plan
+        plan = query_plan(lambda: keyset_paginate(Voucher.query.filter_by(is_deleted=False, status='posted'),
+                                                  (Voucher.date, Voucher.id), after=cursor))
+        assert 'SEARCH voucher USING INDEX ix_voucher_status_date (status=? AND date<?)' in plan
+        assert 'TEMP B-TREE' not in plan
+
+
+def test_account_ledger_page_seeks_on_date_voucher(app, accounts):
+    cursor = encode_cursor([date(2024, 6, 30), 1000, 5000])
+    account = get_chart().get('1002')
+    with app.test_request_context():
+        plan = query_plan(lambda: ledger_page(account, date(2024, 1, 1), date(2024, 12, 31), after=cursor))
+    assert 'SEARCH voucher USING INDEX ix_voucher_status_date (status=? AND date>? AND date<?)' in plan
+    assert 'ix_voucher_entry_account_voucher (account_code=? AND voucher_id=?)' in plan
+    assert 'TEMP B-TREE' not in plan
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试总账余额计算
+"""
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from app.models import db, Account, AccountPeriodBalance, Voucher
+from app.utils.ledger import (compute_balances, posted_entry_totals, unbalanced_vouchers,
+                              rebuild_period_balances, balances_as_of, post_vouchers)
+from app.utils.profiler import count_queries
+from conftest import make_voucher
+
+
+def test_posted_entry_totals_groups_by_account(ledger):
+    totals = posted_entry_totals()
+    assert totals['1002'] == (Decimal('105650.00'), Decimal('30000.00'))
+    assert totals['1122'] == (Decimal('5650.00'), Decimal('5650.00'))
+    # 未过账凭证不参与汇总
+    assert totals['6001'] == (Decimal('0.00'), Decimal('5000.00'))
+
+
+def test_compute_balances_applies_account_direction(ledger):
+    accounts = Account.query.all()
+    balances = compute_balances(accounts, end_date=date(2024, 2, 29))
+    assert balances['1002'] == Decimal('105650.00')
+    assert balances['1001'] == Decimal('-1200.50')
+    assert balances['4001'] == Decimal('100000.00')
+    assert balances['6001'] == Decimal('5000.00')
+    assert balances['6602'] == Decimal('1200.50')
+    assert balances['1601'] == Decimal('0.00')
+
+
+def test_unbalanced_vouchers(ledger, admin):
+    assert unbalanced_vouchers() == []
+    make_voucher(admin, date(2024, 3, 20), [('1001', 10, 0), ('6001', 0, 9)], number='BAD001')
+    assert [row[1] for row in unbalanced_vouchers()] == ['BAD001']
+
+
+def test_balance_sheet_uses_ledger_balances(client, ledger):
+    response = client.post('/report/balance_sheet', data={'report_date': '2024-01-31'})
+    assert response.status_code == 200
+    html = response.get_data(as_text=True)
+    assert '98799.50' in html  # 资产合计
+    assert '平衡' in html
+
+
+def test_rebuild_period_balances(ledger):
+    assert rebuild_period_balances() == 10
+    db.session.commit()
+    row = AccountPeriodBalance.query.filter_by(account_code='1002', period='202402').one()
+    assert row.opening_balance == Decimal('100000.00')
+    assert row.debit_total == Decimal('5650.00')
+    assert row.closing_balance == Decimal('105650.00')
+
+
+def test_balances_as_of_matches_full_replay(ledger):
+    rebuild_period_balances()
+    db.session.commit()
+    accounts = Account.query.all()
+    for as_of in (date(2023, 12, 31), date(2024, 1, 10), date(2024, 2, 29), date(2024, 3, 31), date(2025, 6, 1)):
+        assert balances_as_of(accounts, as_of) == compute_balances(accounts, end_date=as_of)
+
+
+def test_voucher_post_updates_period_balances(client, ledger, admin):
+    rebuild_period_balances()
+    db.session.commit()
+    # 补记一月份凭证，二月、三月快照的期初期末余额同步调整
+    voucher = make_voucher(admin, date(2024, 1, 25), [('1001', 500, 0), ('1002', 0, 500)], status='approved')
+    client.get(f'/voucher/post/{voucher.id}')
+
+    row = AccountPeriodBalance.query.filter_by(account_code='1002', period='202403').one()
+    assert row.opening_balance == Decimal('105150.00')
+    assert row.closing_balance == Decimal('75150.00')
+    accounts = Account.query.all()
+    assert balances_as_of(accounts, date(2024, 3, 31)) == compute_balances(accounts, end_date=date(2024, 3, 31))
+
+
+def test_rebuild_periods_command(app, ledger):
+    result = app.test_cli_runner().invoke(args=['ledger', 'rebuild-periods'])
+    assert result.exit_code == 0
+    assert AccountPeriodBalance.query.count() == 10
+
+
+def test_db_upgrade_builds_missing_period_balances(app, ledger, admin):
+    # 升级前的数据库：已有已过账凭证，没有期间余额快照
+    result = app.test_cli_runner().invoke(args=['db', 'upgrade'])
+    assert '已生成 10 条科目期间余额记录' in result.output
+    assert '期间余额' not in app.test_cli_runner().invoke(args=['db', 'upgrade']).output
+
+    # 之后过账只累加增量，不在过账时重建快照
+    voucher_id = Voucher.query.filter_by(status='approved').one().id
+    with count_queries() as counter:
+        post_vouchers(voucher_ids=[voucher_id])
+        db.session.commit()
+    assert not [sql for sql in counter.statements if sql.startswith('DELETE FROM account_period_balance')]
+    accounts = Account.query.all()
+    assert balances_as_of(accounts, date(2024, 3, 31)) == compute_balances(accounts, end_date=date(2024, 3, 31))
+
+
+def approved_vouchers(admin, count):
+    """一批待过账凭证"""
+    return [make_voucher(admin, date(2024, 3, 1 + i % 28), [('1122', 100 + i, 0), ('6001', 0, 100 + i)],
+                         status='approved').id
+            for i in range(count)]
+
+
+def test_post_vouchers_updates_each_account_once(ledger, admin):
+    rebuild_period_balances()
+    db.session.commit()
+    ids = approved_vouchers(admin, 30)
+    before = {account.code: account.balance for account in Account.query.all()}
+
+    with count_queries() as counter:
+        result = post_vouchers(voucher_ids=ids)
+        db.session.commit()
+    account_updates = [sql for sql in counter.statements if sql.startswith('UPDATE account ')]
+    assert len(account_updates) == 1  # 一条语句批量执行，每个科目一行
+
+    # 未指定的已审核凭证（3月15日的99元凭证）不过账
+    assert result.count == 30 and result.account_count == 2
+    assert Voucher.query.filter_by(status='approved').count() == 1
+    total = sum(Decimal(100 + i) for i in range(30))
+    after = {account.code: account.balance for account in Account.query.all()}
+    assert after['1122'] - before['1122'] == total
+    assert after['6001'] - before['6001'] == total
+    accounts = Account.query.all()
+    assert balances_as_of(accounts, date(2024, 3, 31)) == compute_balances(accounts, end_date=date(2024, 3, 31))
+
+
+def test_post_vouchers_rejects_unbalanced(ledger, admin):
+    make_voucher(admin, date(2024, 3, 20), [('1001', 10, 0), ('6001', 0, 9)], status='approved', number='BAD001')
+    with pytest.raises(ValueError, match='BAD001'):
+        post_vouchers(end_date=date(2024, 3, 31))
+    with pytest.raises(ValueError):
+        post_vouchers()
+
+
+def test_batch_post_endpoint_by_date_range(client, ledger, admin):
+    approved_vouchers(admin, 5)
+    response = client.post('/voucher/batch_post', data={'start_date': '2024-03-01', 'end_date': '2024-03-10'},
+                           follow_redirects=True)
+    assert '批量过账完成：5 张凭证' in response.get_data(as_text=True)
+    assert Voucher.query.filter_by(status='approved').count() == 1
+
+
+def test_post_command(app, ledger):
+    result = app.test_cli_runner().invoke(args=['ledger', 'post', '--start-date', '2024-03-01'])
+    assert result.exit_code == 0
+    assert '已过账 1 张凭证' in result.output
+    assert Voucher.query.filter_by(status='approved').count() == 0
+
+
+def test_rebuild_dry_run_lists_drift(app, ledger):
+    # 夹具凭证直接以已过账状态写入，科目余额仍为0
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=['ledger', 'rebuild', '--dry-run', '--from-account', '1001', '--to-account', '1999'])
+    assert result.exit_code == 0
+    assert '1002 银行存款: 存储余额 0.00 -> 凭证汇总 75650.00' in result.output
+    assert '4001' not in result.output
+    assert Account.query.filter_by(code='1002').one().balance == Decimal('0.00')
+
+
+def test_rebuild_fixes_balances_and_periods(app, ledger):
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=['ledger', 'rebuild'])
+    assert result.exit_code == 0
+    assert '重新生成 10 条期间余额记录' in result.output
+
+    accounts = Account.query.all()
+    computed = compute_balances(accounts)
+    assert {account.code: account.balance for account in accounts} == computed
+
+    result = runner.invoke(args=['ledger', 'rebuild', '--dry-run'])
+    assert '0 个科目余额不一致，0 条期间余额需要更新' in result.output
+
+
+def test_rebuild_keeps_opening_balances(client, ledger):
+    # 不经凭证录入的初始余额：新增科目时的初始余额
+    client.post('/account/add', data={'code': '1012', 'name': '其他货币资金', 'type': 'asset',
+                                      'parent_code': '', 'description': '', 'balance': '500.00'})
+    assert Account.query.filter_by(code='1012').one().opening_balance == Decimal('500.00')
+
+    runner = client.application.test_cli_runner()
+    runner.invoke(args=['ledger', 'rebuild'])
+    balances = {account.code: account.balance for account in Account.query.all()}
+    assert balances['1012'] == Decimal('500.00')
+    assert balances['1002'] == Decimal('75650.00')
+    assert '0 个科目余额不一致' in runner.invoke(args=['ledger', 'rebuild', '--dry-run']).output
+
+
+def test_rebuild_period_range_keeps_openings(ledger):
+    rebuild_period_balances()
+    db.session.commit()
+    AccountPeriodBalance.query.filter_by(period='202403').delete()
+    db.session.commit()
+
+    assert rebuild_period_balances(start_period='202403', end_period='202403') == 2
+    db.session.commit()
+    row = AccountPeriodBalance.query.filter_by(account_code='1002', period='202403').one()
+    assert row.opening_balance == Decimal('105650.00')
+    assert AccountPeriodBalance.query.count() == 10
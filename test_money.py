@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试金额解析、舍入和SQL精确合计
+"""
+
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import Numeric, column, func, select, text
+
+from app.models import db, Customer, SalesOrder, Voucher
+from app.utils.money import from_cents, money_sum, multiply, parse_decimal, parse_money, to_cents, to_money
+
+
+@pytest.mark.parametrize('text_value, expected', [
+    ('12.34', '12.34'),
+    (' 1,234.5 ', '1234.50'),
+    ('', '0.00'),
+    (None, '0.00'),
+    ('0.005', '0.01'),
+    ('2.675', '2.68'),
+    ('1e3', '1000.00'),
+])
+def test_parse_money_rounds_half_up_to_cents(text_value, expected):
+    assert parse_money(text_value) == Decimal(expected)
+
+
+@pytest.mark.parametrize('text_value, message', [
+    ('abc', '金额格式不正确'),
+    ('NaN', '金额格式不正确'),
+    ('Infinity', '金额格式不正确'),
+    ('-1', '金额不能为负数'),
+])
+def test_parse_money_rejects_invalid_input(text_value, message):
+    with pytest.raises(ValueError, match=message):
+        parse_money(text_value)
+
+
+def test_rounding_helpers():
+    assert parse_money('-3.2', allow_negative=True) == Decimal('-3.20')
+    assert parse_decimal('0.125', '税率', places=Decimal('0.001')) == Decimal('0.125')
+    assert to_money(0.1 + 0.2) == Decimal('0.30')
+    assert multiply('0.10', 3) == Decimal('0.30')
+    assert multiply('19.99', '0.13') == Decimal('2.60')
+    assert to_cents('1234.565') == 123457 and from_cents(123457) == Decimal('1234.57')
+
+
+def sum_generated(expression, entries):
+    """对SQLite递归生成的entries条金额求合计：12345678.91 ~ 12345678.97 循环"""
+    amounts = text(
+        'WITH RECURSIVE s(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM s WHERE i < :entries) '
+        'SELECT 12345678.91 + (i % 7) * 0.01 AS v FROM s'
+    ).bindparams(entries=entries).columns(column('v', Numeric(15, 2))).subquery()
+    return db.session.execute(select(expression(amounts.c.v))).scalar()
+
+
+def expected_total(entries):
+    cycles, rest = divmod(entries, 7)
+    return from_cents(1234567891 * entries + 21 * cycles + sum(range(1, rest + 1)))
+
+
+@pytest.mark.parametrize('entries', [1, 1000, 100000, 10000000])
+def test_money_sum_is_exact(app, entries):
+    assert sum_generated(money_sum, entries) == expected_total(entries)
+
+
+def test_plain_sum_drifts_on_sqlite(app):
+    # SQLite把DECIMAL存为浮点数，直接SUM已经不精确
+    assert sum_generated(func.sum, 1000000) != expected_total(1000000)
+
+
+def test_forms_parse_amounts_as_decimal(client, accounts):
+    client.post('/voucher/add', data={
+        'date': '2024-01-05', 'summary': '分次收款', 'entry_count': 4,
+        'account_code_0': '1002', 'debit_0': '0.10', 'credit_0': '',
+        'account_code_1': '1002', 'debit_1': '0.20', 'credit_1': '',
+        'account_code_2': '1002', 'debit_2': '1,000.004', 'credit_2': '',
+        'account_code_3': '6001', 'debit_3': '', 'credit_3': '1000.30',
+    })
+    voucher = Voucher.query.one()
+    assert sorted(entry.debit for entry in voucher.entries) == [
+        Decimal('0.00'), Decimal('0.10'), Decimal('0.20'), Decimal('1000.00')]
+
+    response = client.post('/voucher/add', data={
+        'date': '2024-01-05', 'summary': '格式错误', 'entry_count': 2,
+        'account_code_0': '1002', 'debit_0': '12元', 'credit_0': '',
+        'account_code_1': '6001', 'debit_1': '', 'credit_1': '12',
+    }, follow_redirects=True)
+    assert '第1行借方金额格式不正确' in response.get_data(as_text=True)
+    assert Voucher.query.count() == 1
+
+    customer = Customer(name='客户甲', contact='张三', phone='123')
+    db.session.add(customer)
+    db.session.commit()
+    client.post('/sales/order/add', data={
+        'customer_id': customer.id, 'tax_rate': '0.13', 'payment_method': 'cash',
+        'item_name[]': ['A', 'B', 'C'], 'quantity[]': ['3', '1', '1'], 'unit_price[]': ['0.10', '0.20', '19.99'],
+    })
+    order = SalesOrder.query.one()
+    assert order.total_amount == Decimal('20.49')
+    assert order.tax_amount == Decimal('2.66')
+    assert [item.amount for item in order.items] == [Decimal('0.30'), Decimal('0.20'), Decimal('19.99')]
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试请求性能记录：慢请求日志、调试面板和路由耗时分位数
+"""
+
+import json
+
+from app.utils.profiler import RouteMetrics
+
+
+def test_route_metrics_percentiles():
+    metrics = RouteMetrics(window=100)
+    for ms in range(1, 201):
+        metrics.record('GET /a', ms / 1000)
+    # 只保留最近100次：101~200毫秒
+    summary = metrics.summary()['GET /a']
+    assert summary == {'count': 100, 'p50_ms': 150.0, 'p95_ms': 195.0, 'p99_ms': 199.0, 'max_ms': 200.0}
+
+
+def test_slow_request_log(app, client, accounts):
+    app.config['SLOW_REQUEST_THRESHOLD'] = 0
+    client.get('/account/list')
+    client.get('/dashboard')
+
+    with open(app.config['SLOW_REQUEST_LOG'], encoding='utf-8') as log_file:
+        records = [json.loads(line) for line in log_file]
+    record = records[-1]
+    assert record['route'] == 'GET /dashboard'
+    assert record['status'] == 200
+    assert record['query_count'] > 0
+    assert record['render_ms'] > 0
+    assert record['total_ms'] >= record['sql_ms'] + record['render_ms']
+    assert len(record['slowest_queries']) <= 5
+    assert record['slowest_queries'][0]['statement'].startswith('SELECT')
+
+
+def test_profiler_panel(app, client, accounts):
+    assert 'profiler-panel' not in client.get('/dashboard').get_data(as_text=True)
+    app.config['PROFILER_PANEL'] = True
+    text = client.get('/dashboard').get_data(as_text=True)
+    assert 'id="profiler-panel"' in text
+    assert text.index('profiler-panel') < text.index('</body>')
+
+
+def test_admin_metrics(client, accounts):
+    for _ in range(3):
+        client.get('/dashboard')
+    client.get('/voucher/view/1')
+
+    routes = client.get('/admin/metrics').get_json()['routes']
+    dashboard = routes['GET /dashboard']
+    assert dashboard['count'] == 3
+    assert dashboard['p50_ms'] <= dashboard['p95_ms'] <= dashboard['p99_ms'] <= dashboard['max_ms']
+    assert 'GET /voucher/view/<int:id>' in routes
+
+    assert client.get('/admin/metrics?reset=1').status_code == 200
+    assert 'GET /dashboard' not in client.get('/admin/metrics').get_json()['routes']
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试利润表的分组汇总及逐月对比列
+"""
+
+from datetime import date
+from decimal import Decimal
+
+from app.utils.chart import get_chart
+from app.utils.ledger import month_periods, monthly_entry_totals
+from app.utils.profiler import count_queries
+from app.views.report import build_profit_statement
+from conftest import make_voucher
+
+
+def test_month_periods():
+    assert month_periods(date(2023, 11, 15), date(2024, 2, 1)) == ['202311', '202312', '202401', '202402']
+    assert month_periods(date(2024, 3, 1), date(2024, 3, 31)) == ['202403']
+
+
+def test_monthly_entry_totals(ledger):
+    totals = monthly_entry_totals(date(2024, 1, 1), date(2024, 3, 31), account_codes=['1002', '6001'])
+    assert totals == {
+        ('1002', '202401'): (Decimal('100000.00'), Decimal('0.00')),
+        ('1002', '202402'): (Decimal('5650.00'), Decimal('0.00')),
+        ('1002', '202403'): (Decimal('0.00'), Decimal('30000.00')),
+        ('6001', '202402'): (Decimal('0.00'), Decimal('5000.00')),
+    }
+
+
+def test_profit_statement_monthly_columns(ledger, admin):
+    # 期末结转凭证不计入利润表
+    make_voucher(admin, date(2024, 2, 29), [('6001', 5000, 0), ('4103', 0, 5000)], number='CLOS202402')
+
+    get_chart()
+    with count_queries() as counter:
+        data = build_profit_statement(date(2024, 1, 1), date(2024, 3, 31), monthly=True)
+    assert counter.count == 2  # 科目取自科目表缓存：报表缓存的总账版本一次，发生额汇总一次
+
+    assert data['periods'] == ['202401', '202402', '202403']
+    assert data['monthly_movements']['6001'] == {
+        '202401': Decimal('0.00'), '202402': Decimal('5000.00'), '202403': Decimal('0.00')}
+    assert data['period_totals']['net_profit'] == {
+        '202401': Decimal('-1200.50'), '202402': Decimal('5000.00'), '202403': Decimal('0.00')}
+    assert data['total_income'] == Decimal('5000.00')
+    assert data['net_profit'] == Decimal('3799.50')
+    assert data['account_movements']['6602'] == Decimal('1200.50')
+
+
+def test_profit_statement_page_and_export(client, ledger):
+    response = client.post('/report/profit_statement',
+                           data={'start_date': '2024-01-01', 'end_date': '2024-03-31', 'monthly': '1'})
+    text = response.get_data(as_text=True)
+    assert response.status_code == 200
+    assert '2024-02' in text and '3799.50' in text
+
+    response = client.get('/report/profit_statement/export',
+                          query_string={'start_date': '2024-01-01', 'end_date': '2024-03-31', 'monthly': '1'})
+    text = response.get_data(as_text=True)
+    header, *rows = text[1:].splitlines()
+    assert header == '项目,科目编码,科目名称,2024-01,2024-02,2024-03,本期金额'
+    assert rows[-1] == '净利润,,,-1200.50,5000.00,0.00,3799.50'
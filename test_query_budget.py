@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试页面的SQL查询预算
+列表和详情页的查询数不随记录数增长（无N+1查询）
+"""
+
+from datetime import date
+
+import pytest
+
+from app.models import (db, User, Customer, Supplier, PurchaseOrder, PurchaseOrderItem,
+                        SalesOrder, SalesOrderItem)
+from app.utils.profiler import query_budget, count_queries, QueryBudgetExceeded
+from conftest import make_voucher
+
+
+@pytest.fixture
+def orders(admin):
+    """每张订单对应不同的供应商/客户，每张订单两条明细"""
+    for i in range(10):
+        supplier = Supplier(name=f'供应商{i}', contact='张三', phone='13800000000')
+        customer = Customer(name=f'客户{i}', contact='李四', phone='13900000000')
+        purchase = PurchaseOrder(order_number=f'PO{i:04d}', supplier=supplier, total_amount=200,
+                                 tax_rate=13, tax_amount=26, payment_method='bank',
+                                 status='pending', user_id=admin.id)
+        sales = SalesOrder(order_number=f'SO{i:04d}', customer=customer, total_amount=200,
+                           tax_rate=13, tax_amount=26, payment_method='bank',
+                           status='pending', user_id=admin.id)
+        for n in range(2):
+            purchase.items.append(PurchaseOrderItem(item_name=f'物料{n}', quantity=1, unit_price=100, amount=100))
+            sales.items.append(SalesOrderItem(item_name=f'商品{n}', quantity=1, unit_price=100, amount=100))
+        db.session.add_all([purchase, sales])
+    db.session.commit()
+    db.session.expunge_all()
+
+
+def test_query_budget_raises_when_exceeded(app, accounts):
+    with pytest.raises(QueryBudgetExceeded):
+        with query_budget(1):
+            db.session.execute(db.text('SELECT 1'))
+            db.session.execute(db.text('SELECT 2'))
+    with count_queries() as counter:
+        db.session.execute(db.text('SELECT 1'))
+    assert counter.count == 1
+
+
+@pytest.mark.parametrize('url', ['/purchase/order/list', '/sales/order/list'])
+def test_order_list_loads_partners_in_one_query(client, orders, url):
+    with query_budget(1):
+        response = client.get(url)
+    assert response.status_code == 200
+    assert '供应商9' in response.get_data(as_text=True) or '客户9' in response.get_data(as_text=True)
+    assert response.headers['X-Query-Count'] == '1'
+
+
+def test_order_view_batches_items(client, orders):
+    order_id = PurchaseOrder.query.filter_by(order_number='PO0003').one().id
+    db.session.expunge_all()
+    with query_budget(2):
+        response = client.get(f'/purchase/order/view/{order_id}')
+    assert '物料1' in response.get_data(as_text=True)
+
+    order_id = SalesOrder.query.filter_by(order_number='SO0003').one().id
+    db.session.expunge_all()
+    with query_budget(2):
+        response = client.get(f'/sales/order/view/{order_id}')
+    assert '商品1' in response.get_data(as_text=True)
+
+
+def test_voucher_view_loads_entries_with_accounts(client, admin, accounts):
+    voucher_id = make_voucher(admin, date(2024, 1, 5), [('1002', 100, 0), ('6001', 0, 60), ('6051', 0, 40)]).id
+    db.session.expunge_all()
+    with query_budget(2):
+        response = client.get(f'/voucher/view/{voucher_id}')
+    assert '其他业务收入' in response.get_data(as_text=True)
+
+
+def test_dashboard_query_count_is_constant(client, admin, accounts):
+    today = date.today()
+    make_voucher(admin, today, [('1002', 100, 0), ('6001', 0, 100)])
+    db.session.expunge_all()
+    baseline = int(client.get('/dashboard').headers['X-Query-Count'])
+
+    admin = User.query.filter_by(username='admin').one()
+    for _ in range(5):
+        make_voucher(admin, today, [('6602', 10, 0), ('1001', 0, 10)])
+    db.session.expunge_all()
+    with query_budget(baseline):
+        client.get('/dashboard')
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试报表结果缓存：按日期范围内的总账版本失效、LRU淘汰和命中统计
+"""
+
+from datetime import date
+from decimal import Decimal
+
+from app.models import db, Voucher
+from app.utils.chart import get_chart
+from app.utils.ledger import post_vouchers, rebuild_period_balances
+from app.utils.profiler import count_queries
+from app.utils.report_cache import ReportCache, get_report_cache, ledger_version
+from app.views.report import build_balance_sheet, build_profit_statement
+from conftest import make_voucher
+
+
+def test_posting_invalidates_only_covering_reports(app, admin, ledger):
+    rebuild_period_balances()
+    db.session.commit()
+    cache = get_report_cache()
+    january = build_balance_sheet(date(2024, 1, 31))
+    march = build_balance_sheet(date(2024, 3, 31))
+    february = build_profit_statement(date(2024, 2, 1), date(2024, 2, 29))
+    get_chart()
+
+    # 参数相同（含默认值）时直接返回缓存的报表，只查询一次总账版本
+    with count_queries() as counter:
+        assert build_balance_sheet(report_date=date(2024, 1, 31), level=None) is january
+    assert counter.count == 1
+    assert cache.stats()['hits'] == 1
+
+    # 过账3月10日的凭证：只影响范围包含该日期的报表
+    voucher_id = Voucher.query.filter_by(status='approved').one().id
+    version = ledger_version(None, date(2024, 2, 29))
+    post_vouchers(voucher_ids=[voucher_id])
+    db.session.commit()
+    assert ledger_version(None, date(2024, 2, 29)) == version
+    assert ledger_version(date(2024, 3, 15), date(2024, 3, 15)) > version
+
+    assert build_balance_sheet(date(2024, 1, 31)) is january
+    assert build_profit_statement(date(2024, 2, 1), date(2024, 2, 29)) is february
+    updated = build_balance_sheet(date(2024, 3, 31))
+    assert updated is not march
+    assert updated['total_assets'] == march['total_assets'] - Decimal('99.00')
+
+    # 直接通过ORM写入的已过账凭证同样使缓存失效
+    make_voucher(admin, date(2024, 1, 15), [('1001', 10, 0), ('4001', 0, 10)])
+    assert build_balance_sheet(date(2024, 1, 31))['total_assets'] == january['total_assets'] + Decimal('10.00')
+    assert build_profit_statement(date(2024, 2, 1), date(2024, 2, 29)) is february
+
+    # 重建期间余额后全部失效
+    app.test_cli_runner().invoke(args=['ledger', 'rebuild'])
+    assert build_profit_statement(date(2024, 2, 1), date(2024, 2, 29)) is not february
+
+
+def test_lru_eviction_and_size_limits():
+    cache = ReportCache(max_entries=2, max_bytes=100)
+    cache.set('a', 1, 10)
+    cache.set('b', 2, 10)
+    assert cache.get('a') == 1
+    cache.set('c', 3, 10)  # 淘汰最久未使用的b
+    assert cache.get('b') is None and cache.get('a') == 1 and cache.get('c') == 3
+    cache.set('d', 4, 95)  # 超过字节数上限，淘汰a、c
+    assert cache.get('a') is None and cache.get('c') is None and cache.get('d') == 4
+    cache.set('e', 5, 101)  # 单个报表超过上限，不缓存
+    assert cache.get('e') is None
+    assert cache.stats() == {'entries': 1, 'bytes': 95, 'max_entries': 2, 'max_bytes': 100, 'hits': 4,
+                             'misses': 4, 'hit_rate': 0.5, 'evictions': 3}
+
+
+def test_metrics_expose_cache_stats(client, ledger):
+    for _ in range(2):
+        client.post('/report/balance_sheet', data={'report_date': '2024-03-31'})
+    stats = client.get('/admin/metrics').get_json()['report_cache']
+    assert stats['entries'] == 1 and stats['hits'] == 1 and stats['misses'] == 1
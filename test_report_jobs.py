@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试报表后台任务：线程池生成、结果保存、轮询、超时中断和取消
+"""
+
+import threading
+import time
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from app.models import db, ReportJob
+from app.utils.report_jobs import REPORT_BUILDERS, ReportJobQueue, dumps, job_result, loads, report_job
+from app.views.report import build_balance_sheet
+
+
+def wait_for(job_id, statuses=('done', 'failed', 'cancelled', 'timeout'), timeout=10):
+    """等待任务进入指定状态（其他线程写入），返回最新的任务记录"""
+    deadline = time.monotonic() + timeout
+    while True:
+        db.session.rollback()
+        job = db.session.get(ReportJob, job_id)
+        if job.status in statuses or time.monotonic() > deadline:
+            return job
+        time.sleep(0.05)
+
+
+@pytest.fixture
+def test_reports():
+    """测试用报表：一直等待事件的报表和执行长时间SQL的报表"""
+    release = threading.Event()
+
+    @report_job('blocking')
+    def blocking():
+        release.wait(10)
+        return {'ok': True}
+
+    @report_job('slow_sql')
+    def slow_sql():
+        count = db.session.execute(db.text(
+            'WITH RECURSIVE s(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM s WHERE i < 1000000000) '
+            'SELECT count(*) FROM s')).scalar()
+        return {'count': count}
+
+    yield release
+    release.set()
+    REPORT_BUILDERS.pop('blocking')
+    REPORT_BUILDERS.pop('slow_sql')
+
+
+def test_result_codec_keeps_types(app, ledger):
+    data = build_balance_sheet(date(2024, 3, 31), level=1)
+    decoded = loads(dumps(data))
+    assert decoded['report_date'] == date(2024, 3, 31)
+    assert decoded['total_assets'] == data['total_assets'] and isinstance(decoded['total_assets'], Decimal)
+    assert [line['code'] for line in decoded['assets']] == [line.code for line in data['assets']]
+
+
+def test_background_balance_sheet(client, ledger):
+    response = client.post('/report/balance_sheet', data={'report_date': '2024-03-31', 'background': '1'})
+    job_url = response.headers['Location']
+    job_id = int(job_url.rstrip('/').rsplit('/', 1)[-1])
+
+    job = wait_for(job_id)
+    assert job.status == 'done' and job.duration_ms is not None
+    assert job_result(job)['total_assets'] == build_balance_sheet(date(2024, 3, 31))['total_assets']
+
+    status = client.get(f'/report/job/{job_id}/status').get_json()
+    assert status['finished'] and status['status_label'] == '已完成'
+    html = client.get(f'/report/job/{job_id}').get_data(as_text=True)
+    assert f'后台任务 #{job_id}' in html and '资产合计' in html and '2024年03月31日' in html
+    assert client.post(f'/report/job/{job_id}/cancel', follow_redirects=True).status_code == 200
+    assert db.session.get(ReportJob, job_id).status == 'done'
+
+
+def test_timeout_interrupts_running_query(app, test_reports):
+    queue = ReportJobQueue(app, workers=1, queue_size=5, timeout=0.3)
+    started = time.monotonic()
+    job = wait_for(queue.submit('slow_sql', {}).id)
+    assert job.status == 'timeout' and '超过' in job.error
+    assert time.monotonic() - started < 5
+    queue.shutdown()
+
+
+def test_queue_depth_and_cancel(app, test_reports):
+    queue = ReportJobQueue(app, workers=1, queue_size=1, timeout=30)
+    running = queue.submit('blocking', {})
+    assert wait_for(running.id, statuses=('running',)).status == 'running'
+    queued = queue.submit('blocking', {})
+    with pytest.raises(ValueError, match='排队已满'):
+        queue.submit('blocking', {})
+    with pytest.raises(ValueError, match='不支持后台生成'):
+        queue.submit('unknown', {})
+
+    assert queue.cancel(queued)
+    test_reports.set()
+    assert wait_for(running.id).status == 'done'
+    assert wait_for(queued.id).status == 'cancelled'
+    assert not queue.cancel(db.session.get(ReportJob, running.id))
+    queue.shutdown()
+
+
+def test_without_workers_jobs_run_in_request(app, ledger):
+    job = ReportJobQueue(app, workers=0, queue_size=0, timeout=30).submit(
+        'profit_statement', {'start_date': date(2024, 1, 1), 'end_date': date(2024, 3, 31), 'monthly': True})
+    assert job.status == 'done'
+    assert job_result(job)['net_profit'] == Decimal('3799.50')
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试生产环境SQLite连接配置：PRAGMA、连接池，以及过账期间读写互不阻塞
+"""
+
+import threading
+import time
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.pool import QueuePool
+
+from app import create_app
+from app.models import db, Voucher
+from app.utils.database import sqlite_pragmas
+from app.utils.ledger import post_vouchers, posted_entry_totals
+
+
+@pytest.fixture
+def app(tmp_path):
+    """使用生产环境配置和临时数据库的应用实例（覆盖conftest中的同名夹具）"""
+    app = create_app('production')
+    app.config.update(
+        TESTING=True,
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'test.db'}",
+        SLOW_REQUEST_LOG=None,
+    )
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+def bank_totals():
+    return posted_entry_totals(account_codes=['1002'])['1002']
+
+
+def test_production_connections_are_tuned(app):
+    assert not app.debug and not app.config['TEMPLATES_AUTO_RELOAD']
+    assert isinstance(db.engine.pool, QueuePool)
+    with db.engine.connect() as connection:
+        pragmas = sqlite_pragmas(connection.connection)
+    assert pragmas == {'journal_mode': 'wal', 'synchronous': 1, 'busy_timeout': 10000,
+                       'cache_size': -65536, 'mmap_size': 268435456}
+
+
+def test_reports_read_while_posting_is_in_progress(app, ledger):
+    """过账事务未提交时，其他线程的报表查询立即返回过账前的数据"""
+    voucher_id = Voucher.query.filter_by(status='approved').one().id
+    posted, release = threading.Event(), threading.Event()
+
+    def post():
+        with app.app_context():
+            post_vouchers(voucher_ids=[voucher_id])
+            db.session.flush()
+            posted.set()
+            release.wait(10)
+            db.session.commit()
+            db.session.remove()
+
+    writer = threading.Thread(target=post)
+    writer.start()
+    try:
+        assert posted.wait(10)
+        started = time.perf_counter()
+        assert bank_totals() == (Decimal('105650.00'), Decimal('30000.00'))
+        assert time.perf_counter() - started < 1
+    finally:
+        release.set()
+        writer.join()
+    assert bank_totals() == (Decimal('105650.00'), Decimal('30099.00'))
+
+
+def test_posting_commits_while_a_long_report_is_reading(app, ledger):
+    """长时间运行的报表持有读事务时，过账仍能提交；报表读到的是一致的快照"""
+    voucher_id = Voucher.query.filter_by(status='approved').one().id
+    reading, committed = threading.Event(), threading.Event()
+    posted_count = db.text("SELECT COUNT(*) FROM voucher WHERE status = 'posted'")
+    snapshots = []
+
+    def report():
+        with app.app_context():
+            connection = db.engine.connect()
+            transaction = connection.begin()
+            connection.exec_driver_sql('BEGIN')  # pysqlite遇到SELECT不会开始事务，显式开始读事务
+            try:
+                snapshots.append(connection.execute(posted_count).scalar())
+                reading.set()
+                committed.wait(10)
+                snapshots.append(connection.execute(posted_count).scalar())
+            finally:
+                transaction.rollback()
+                connection.close()
+
+    reader = threading.Thread(target=report)
+    reader.start()
+    try:
+        assert reading.wait(10)
+        started = time.perf_counter()
+        post_vouchers(voucher_ids=[voucher_id])
+        db.session.commit()
+        # 回滚日志模式下提交需要等待读事务结束，超过busy_timeout后报“database is locked”
+        assert time.perf_counter() - started < 1
+    finally:
+        committed.set()
+        reader.join()
+    assert snapshots == [5, 5]
+    assert Voucher.query.filter_by(status='posted').count() == 6
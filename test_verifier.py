@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+测试试算平衡定时校验
+"""
+
+import time
+from decimal import Decimal
+
+from app.models import db, Account, TrialBalanceRun
+from app.utils.profiler import count_queries
+from app.utils.verifier import TrialBalanceScheduler, trial_balance_snapshot, verify_trial_balance
+
+
+def test_snapshot_compares_balances_in_one_query(app, ledger):
+    app.test_cli_runner().invoke(args=['ledger', 'rebuild'])
+
+    with count_queries() as counter:
+        snapshot = trial_balance_snapshot()
+    assert counter.count == 1
+    assert snapshot['drift'] == []
+    assert snapshot['total_debit'] == snapshot['total_credit'] == Decimal('142500.50')
+    assert snapshot['account_count'] == len(ledger)
+
+    Account.query.filter_by(code='1002').update({Account.balance: Decimal('75000.00')})
+    db.session.commit()
+    assert trial_balance_snapshot()['drift'] == [
+        {'account_code': '1002', 'account_name': '银行存款', 'stored': '75000.00', 'computed': '75650.00'}]
+
+
+def test_company_init_opening_capital_passes(app):
+    app.test_client().post('/company/init', data={
+        'name': '测试公司', 'registered_capital': '500000', 'industry': '制造业',
+        'accounting_period': 'month', 'currency': 'CNY', 'modules': ['expense']})
+    assert Account.query.filter_by(code='4001').one().balance == Decimal('500000.00')
+
+    run = verify_trial_balance(trigger='manual')
+    assert run.ok and run.drift_count == 0
+
+
+def test_verify_stores_runs_and_exposes_them(client, ledger):
+    app = client.application
+    result = app.test_cli_runner().invoke(args=['ledger', 'verify'])
+    assert result.exit_code == 1 and '1002 银行存款: 存储余额 0.00，凭证汇总 75650.00' in result.output
+
+    app.test_cli_runner().invoke(args=['ledger', 'rebuild'])
+    assert app.test_cli_runner().invoke(args=['ledger', 'verify']).exit_code == 0
+
+    data = client.get('/admin/trial-balance').get_json()
+    assert data['ok'] is True and data['latest']['trigger'] == 'manual'
+    assert [run['ok'] for run in data['runs']] == [True, False]
+    assert data['runs'][1]['drift_count'] == 7 and data['runs'][1]['drift'][0]['account_code'] == '1001'
+
+    # 只保留最近的校验记录
+    for _ in range(3):
+        verify_trial_balance(keep=2)
+    assert TrialBalanceRun.query.count() == 2
+
+
+def test_scheduler_runs_in_background_and_skips_recent_runs(app, ledger):
+    scheduler = TrialBalanceScheduler(app, interval=60)
+    run = scheduler.run_once()
+    assert run is not None and not run.ok and run.trigger == 'schedule'
+    # 其他进程刚刚校验过，本次跳过
+    assert scheduler.run_once() is None
+
+    scheduler = TrialBalanceScheduler(app, interval=0.05)
+    scheduler.start()
+    try:
+        deadline = time.monotonic() + 5
+        while TrialBalanceRun.query.count() < 3 and time.monotonic() < deadline:
+            time.sleep(0.05)
+            db.session.remove()
+    finally:
+        scheduler.stop(timeout=5)
+    assert TrialBalanceRun.query.count() >= 3
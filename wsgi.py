@@ -0,0 +1,10 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WSGI入口：gunicorn wsgi:app
+flask 命令在项目根目录下运行时也会自动使用本文件中的应用
+"""
+
+from app import create_app
+
+app = create_app()